@@ -0,0 +1,142 @@
+import re
+from collections import Counter
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import bindparam, delete, event, inspect, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import (Curator, GroupChatAttachFile, LectureFile, StoredBlob, Student, Subject, SubjectChatAttachFile,
+                        SubjectIcon, SubjectInstructionFiles, SubjectItem, Teacher, TestAnswer, TestQuestion)
+
+BLOB_PATH_PATTERN = re.compile(r"static/blobs/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(?:\.\w+)?")
+
+BLOB_REFERENCE_COLUMNS = (
+    Student.image_path,
+    Teacher.image_path,
+    Curator.image_path,
+    Subject.image_path,
+    Subject.logo_path,
+    SubjectIcon.icon_path,
+    SubjectInstructionFiles.file_path,
+    LectureFile.file_path,
+    TestQuestion.image_path,
+    TestAnswer.image_path,
+    GroupChatAttachFile.file_path,
+    SubjectChatAttachFile.file_path
+)
+
+BLOB_REFERENCE_TEXT_COLUMNS = (
+    SubjectItem.text,
+)
+
+
+def get_blob_references(value, text: bool) -> List[str]:
+    if not value:
+        return []
+    if text:
+        return BLOB_PATH_PATTERN.findall(value)
+    return [value] if BLOB_PATH_PATTERN.fullmatch(value) else []
+
+
+def get_reference_columns():
+    columns = {}
+    for text, references in ((False, BLOB_REFERENCE_COLUMNS), (True, BLOB_REFERENCE_TEXT_COLUMNS)):
+        for column in references:
+            columns.setdefault(column.class_, []).append((column.key, text))
+    return columns
+
+
+def count_blob_reference_changes(session: Session, columns) -> Counter:
+    changes = Counter()
+    for instance in [*session.new, *session.dirty, *session.deleted]:
+        for key, text in columns.get(type(instance), ()):
+            if instance in session.new:
+                changes.update(get_blob_references(getattr(instance, key), text))
+            elif instance in session.deleted:
+                getattr(instance, key)
+                history = inspect(instance).attrs[key].history
+                for value in history.deleted or history.unchanged:
+                    changes.subtract(get_blob_references(value, text))
+            else:
+                history = inspect(instance).attrs[key].history
+                for value in history.deleted:
+                    changes.subtract(get_blob_references(value, text))
+                for value in history.added:
+                    changes.update(get_blob_references(value, text))
+    return changes
+
+
+def track_blob_references(session_class):
+    columns = get_reference_columns()
+
+    def keep_old_value(target, value, oldvalue, initiator):
+        return value
+
+    for column in (*BLOB_REFERENCE_COLUMNS, *BLOB_REFERENCE_TEXT_COLUMNS):
+        event.listen(column, "set", keep_old_value, active_history=True)
+
+    @event.listens_for(session_class, "before_flush")
+    def before_flush(session, flush_context, instances):
+        session.info["blob_reference_changes"] = count_blob_reference_changes(session, columns)
+
+    @event.listens_for(session_class, "after_flush")
+    def after_flush(session, flush_context):
+        changes = session.info.pop("blob_reference_changes", None)
+        rows = [{"blob_path": path, "change": change} for path, change in (changes or {}).items() if change]
+        if rows:
+            session.connection().execute(
+                update(StoredBlob)
+                .where(StoredBlob.path == bindparam("blob_path"))
+                .values(ref_count=StoredBlob.ref_count + bindparam("change")),
+                rows
+            )
+
+
+async def acquire_blob_db(db: AsyncSession, checksum: str, path: str, size: int) -> str:
+    now = datetime.utcnow()
+    row = {"checksum": checksum, "path": path, "size": size, "ref_count": 0, "created_at": now, "acquired_at": now}
+    dialect = db.bind.dialect.name
+
+    if dialect == "mysql":
+        statement = mysql.insert(StoredBlob).values(row)
+        statement = statement.on_duplicate_key_update(acquired_at=now)
+    else:
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        statement = insert(StoredBlob).values(row)
+        statement = statement.on_conflict_do_update(index_elements=["checksum"], set_={"acquired_at": now})
+
+    await db.execute(statement)
+    result = await db.execute(select(StoredBlob.path).filter(StoredBlob.checksum == checksum))
+    return result.scalar_one()
+
+
+async def delete_unreferenced_blob_db(db: AsyncSession, path: str, acquired_before: datetime) -> bool:
+    result = await db.execute(
+        delete(StoredBlob)
+        .where(StoredBlob.path == path, StoredBlob.ref_count <= 0, StoredBlob.acquired_at < acquired_before)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+async def select_unreferenced_blobs_db(db: AsyncSession, acquired_before: datetime, limit: int) -> List[str]:
+    result = await db.execute(
+        select(StoredBlob.path)
+        .where(StoredBlob.ref_count <= 0, StoredBlob.acquired_at < acquired_before)
+        .order_by(StoredBlob.acquired_at)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+
+def lock_blob_db(db: Session, path: str) -> bool:
+    result = db.execute(
+        update(StoredBlob)
+        .where(StoredBlob.path == path)
+        .values(acquired_at=StoredBlob.acquired_at)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
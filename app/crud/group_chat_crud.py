@@ -1,72 +1,77 @@
 from datetime import datetime
 from typing import Dict, List
 
-from sqlalchemy import desc, select
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import DateTime, and_, desc, literal, or_, select, tuple_, union
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from sqlalchemy.sql.expression import func
 
 from app.enums import MessageTypeOption, UserTypeOption
-from app.models import (Curator, Group, GroupChat, GroupChatAnswer, GroupChatAttachFile, MessageRecipient, Moder,
-                        Student, User, UserType)
-
-
-def select_student_in_group_db(db: Session, group_id: int):
-    students = db.query(
-        User.id,
-        User.is_active,
-        User.username,
-        UserType.type,
-        Student.name,
-        Student.surname,
-        Student.image_path
-    )\
-        .select_from(Group)\
-        .join(Student, Student.group_id == Group.id)\
-        .join(User, User.id == Student.user_id)\
-        .join(UserType, UserType.id == User.user_type_id)\
-        .filter(Group.id == group_id)\
-        .all()
-
-    return students
-
-
-def select_moder_db(db: Session):
-    moderators = db.query(
-        User.id,
-        User.is_active,
-        User.username,
-        UserType.type
-    )\
-        .select_from(Moder)\
-        .join(User, User.id == Moder.user_id)\
-        .join(UserType, UserType.id == User.user_type_id)\
-        .all()
-
-    return moderators
-
-
-def select_curator_in_group_db(db: Session, group_id: int):
-    curator = db.query(
-        User.id,
-        User.is_active,
-        User.username,
-        UserType.type,
-        Curator.name,
-        Curator.surname,
-        Curator.image_path
-    )\
-        .select_from(Group)\
-        .join(Curator, Curator.id == Group.curator_id)\
-        .join(User, User.id == Curator.user_id)\
-        .join(UserType, UserType.id == User.user_type_id)\
-        .filter(Group.id == group_id)\
-        .all()
-
-    return curator
-
-
-def create_group_chat_massage(
-        db: Session,
+from app.models import (Curator, Group, GroupChat, GroupChatAnswer, GroupChatAttachFile, GroupChatReadReceipt,
+                        MessageRecipient, Moder, Student, User, UserType)
+
+
+async def select_student_in_group_db(db: AsyncSession, group_id: int):
+    result = await db.execute(
+        select(
+            User.id,
+            User.is_active,
+            User.username,
+            UserType.type,
+            Student.name,
+            Student.surname,
+            Student.image_path
+        )
+        .select_from(Group)
+        .join(Student, Student.group_id == Group.id)
+        .join(User, User.id == Student.user_id)
+        .join(UserType, UserType.id == User.user_type_id)
+        .filter(Group.id == group_id)
+    )
+
+    return result.all()
+
+
+async def select_moder_db(db: AsyncSession):
+    result = await db.execute(
+        select(
+            User.id,
+            User.is_active,
+            User.username,
+            UserType.type
+        )
+        .select_from(Moder)
+        .join(User, User.id == Moder.user_id)
+        .join(UserType, UserType.id == User.user_type_id)
+    )
+
+    return result.all()
+
+
+async def select_curator_in_group_db(db: AsyncSession, group_id: int):
+    result = await db.execute(
+        select(
+            User.id,
+            User.is_active,
+            User.username,
+            UserType.type,
+            Curator.name,
+            Curator.surname,
+            Curator.image_path
+        )
+        .select_from(Group)
+        .join(Curator, Curator.id == Group.curator_id)
+        .join(User, User.id == Curator.user_id)
+        .join(UserType, UserType.id == User.user_type_id)
+        .filter(Group.id == group_id)
+    )
+
+    return result.all()
+
+
+async def create_group_chat_massage(
+        db: AsyncSession,
         message: str,
         fixed: bool,
         sender_id: int,
@@ -86,13 +91,13 @@ def create_group_chat_massage(
     )
 
     db.add(new_message)
-    db.commit()
-    db.refresh(new_message)
+    await db.commit()
+    await db.refresh(new_message)
     return new_message
 
 
-def create_group_chat_answer(
-        db: Session,
+async def create_group_chat_answer(
+        db: AsyncSession,
         message: str,
         group_chat_id: int,
         sender_id: int,
@@ -107,13 +112,13 @@ def create_group_chat_answer(
         deleted=False
     )
     db.add(new_answer)
-    db.commit()
-    db.refresh(new_answer)
+    await db.commit()
+    await db.refresh(new_answer)
     return new_answer
 
 
-def create_attach_file_db(
-        db: Session,
+async def create_attach_file_db(
+        db: AsyncSession,
         attach_files: List[Dict[str, str]],
         chat_answer: int = None,
         chat_message: int = None
@@ -143,13 +148,13 @@ def create_attach_file_db(
         db.add(attach_file_obj)
         attach_file_objs.append(attach_file_obj)
 
-    db.commit()
+    await db.commit()
     for attach_file_obj in attach_file_objs:
-        db.refresh(attach_file_obj)
+        await db.refresh(attach_file_obj)
 
 
-def create_recipient_db(
-        db: Session,
+async def create_recipient_db(
+        db: AsyncSession,
         group_chat_id: int,
         recipient: List[int] or int
 ):
@@ -160,8 +165,8 @@ def create_recipient_db(
                 recipient_id=rec
             )
             db.add(rec_obj)
-            db.commit()
-            db.refresh(rec_obj)
+            await db.commit()
+            await db.refresh(rec_obj)
         return
     else:
         recipient_obj = MessageRecipient(
@@ -169,251 +174,363 @@ def create_recipient_db(
             recipient_id=recipient
         )
         db.add(recipient_obj)
-        db.commit()
-        db.refresh(recipient_obj)
+        await db.commit()
+        await db.refresh(recipient_obj)
         return
 
 
-def select_last_messages_db(
-        db: Session,
+def select_visible_messages_query(
         group_id: int,
         recipient_id: int,
-        limit: int = 10
+        last_message_id: int | None,
+        limit: int
 ):
-
-    query_everyone = db.query(GroupChat)\
+    cursor = []
+    if last_message_id is not None:
+        last_datetime = select(GroupChat.datetime_message).filter(GroupChat.id == last_message_id).scalar_subquery()
+        cursor.append(or_(
+            tuple_(GroupChat.datetime_message, GroupChat.id) < tuple_(last_datetime, last_message_id),
+            and_(last_datetime.is_(None), GroupChat.id < last_message_id)
+        ))
+
+    query_everyone = select(GroupChat.id, GroupChat.datetime_message)\
         .filter(GroupChat.group_id == group_id)\
         .filter(GroupChat.message_type == "everyone")\
-        .order_by(desc(GroupChat.datetime_message))\
-        .limit(limit)\
-        .options(joinedload(GroupChat.group_chat_answer))\
-        .options(joinedload(GroupChat.attach_file))
-    messages_everyone = query_everyone.all()
+        .filter(*cursor)
 
-    query_personal = db.query(GroupChat)\
+    query_personal = select(GroupChat.id, GroupChat.datetime_message)\
         .join(MessageRecipient, GroupChat.id == MessageRecipient.group_chat_id)\
         .filter(GroupChat.group_id == group_id)\
         .filter(MessageRecipient.recipient_id == recipient_id)\
         .filter(GroupChat.message_type.in_(["alone", "several"]))\
-        .order_by(desc(GroupChat.datetime_message))\
-        .limit(limit)\
-        .options(joinedload(GroupChat.group_chat_answer))\
-        .options(joinedload(GroupChat.attach_file))
-    messages_personal = query_personal.all()
-
-    query_sent_personal = db.query(GroupChat) \
-        .filter(GroupChat.group_id == group_id) \
-        .filter(GroupChat.sender_id == recipient_id) \
-        .filter(GroupChat.message_type.in_(["alone", "several"])) \
-        .order_by(desc(GroupChat.datetime_message)) \
-        .limit(limit) \
-        .options(joinedload(GroupChat.group_chat_answer)) \
-        .options(joinedload(GroupChat.attach_file))
-    messages_sent_personal = query_sent_personal.all()
-
-    all_messages = messages_everyone + messages_personal + messages_sent_personal
-    all_messages.sort(key=lambda x: x.datetime_message, reverse=True)
-    selected_messages = all_messages[:limit]
-
-    return selected_messages
-
-
-def select_messages_by_pagination_db(
-        db: Session,
+        .filter(*cursor)
+
+    query_sent_personal = select(GroupChat.id, GroupChat.datetime_message)\
+        .filter(GroupChat.group_id == group_id)\
+        .filter(GroupChat.sender_id == recipient_id)\
+        .filter(GroupChat.message_type.in_(["alone", "several"]))\
+        .filter(*cursor)
+
+    branches = [
+        select(query.order_by(desc(GroupChat.datetime_message), desc(GroupChat.id)).limit(limit).subquery())
+        for query in (query_everyone, query_personal, query_sent_personal)
+    ]
+    return union(*branches).subquery()
+
+
+async def select_last_messages_db(
+        db: AsyncSession,
+        group_id: int,
+        recipient_id: int,
+        limit: int = 10
+):
+    return await select_messages_by_pagination_db(
+        db=db,
+        group_id=group_id,
+        recipient_id=recipient_id,
+        last_message_id=None,
+        limit=limit
+    )
+
+
+async def select_messages_by_pagination_db(
+        db: AsyncSession,
         group_id: int,
         recipient_id: int,
-        last_message_id: int,
+        last_message_id: int | None,
         limit: int = 10
 ):
-    query_everyone = db.query(GroupChat) \
-        .filter(GroupChat.group_id == group_id) \
-        .filter(GroupChat.message_type == "everyone") \
-        .filter(GroupChat.id < last_message_id) \
-        .order_by(desc(GroupChat.datetime_message)) \
-        .limit(limit) \
-        .options(joinedload(GroupChat.group_chat_answer)) \
-        .options(joinedload(GroupChat.attach_file))
-    messages_everyone = query_everyone.all()
-
-    query_personal = db.query(GroupChat) \
-        .join(MessageRecipient, GroupChat.id == MessageRecipient.group_chat_id) \
-        .filter(GroupChat.group_id == group_id) \
-        .filter(MessageRecipient.recipient_id == recipient_id) \
-        .filter(GroupChat.id < last_message_id) \
-        .filter(GroupChat.message_type.in_(["alone", "several"])) \
-        .order_by(desc(GroupChat.datetime_message)) \
-        .limit(limit) \
-        .options(joinedload(GroupChat.group_chat_answer)) \
-        .options(joinedload(GroupChat.attach_file))
-    messages_personal = query_personal.all()
-
-    query_sent_personal = db.query(GroupChat) \
-        .filter(GroupChat.group_id == group_id) \
-        .filter(GroupChat.sender_id == recipient_id) \
-        .filter(GroupChat.message_type.in_(["alone", "several"])) \
-        .filter(GroupChat.id < last_message_id) \
-        .order_by(desc(GroupChat.datetime_message)) \
-        .limit(limit) \
-        .options(joinedload(GroupChat.group_chat_answer)) \
-        .options(joinedload(GroupChat.attach_file))
-    messages_sent_personal = query_sent_personal.all()
-
-    all_messages = messages_everyone + messages_personal + messages_sent_personal
-    all_messages.sort(key=lambda x: x.datetime_message, reverse=True)
-    selected_messages = all_messages[:limit]
-
-    return selected_messages
-
-
-def select_message_by_id_db(db: Session, message_id: int):
-    return db.query(GroupChat).filter(GroupChat.id == message_id).first()
-
-
-def select_answer_by_id_db(db: Session, answer_id: int):
-    return db.query(GroupChatAnswer).filter(GroupChatAnswer.id == answer_id).first()
-
-
-def select_recipient_by_message_id(db: Session, message_id: int):
-    return db.query(MessageRecipient).filter(MessageRecipient.group_chat_id == message_id).all()
-
-
-def get_last_message_db(db: Session, group_id: int, sender_id: int):
+    visible = select_visible_messages_query(
+        group_id=group_id,
+        recipient_id=recipient_id,
+        last_message_id=last_message_id,
+        limit=limit
+    )
+
+    result = await db.execute(
+        select(GroupChat)
+        .join(visible, visible.c.id == GroupChat.id)
+        .order_by(desc(GroupChat.datetime_message), desc(GroupChat.id))
+        .limit(limit)
+        .options(selectinload(GroupChat.group_chat_answer).selectinload(GroupChatAnswer.attach_file))
+        .options(selectinload(GroupChat.group_chat_answer).selectinload(GroupChatAnswer.read_receipt))
+        .options(selectinload(GroupChat.attach_file), selectinload(GroupChat.read_receipt))
+    )
+    return result.scalars().all()
+
+
+async def select_message_by_id_db(db: AsyncSession, message_id: int):
+    result = await db.execute(
+        select(GroupChat)
+        .options(
+            selectinload(GroupChat.group_chat_answer).selectinload(GroupChatAnswer.attach_file),
+            selectinload(GroupChat.group_chat_answer).selectinload(GroupChatAnswer.read_receipt),
+            selectinload(GroupChat.attach_file),
+            selectinload(GroupChat.recipient),
+            selectinload(GroupChat.read_receipt)
+        )
+        .filter(GroupChat.id == message_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+async def select_answer_by_id_db(db: AsyncSession, answer_id: int):
+    result = await db.execute(
+        select(GroupChatAnswer)
+        .options(
+            selectinload(GroupChatAnswer.attach_file),
+            selectinload(GroupChatAnswer.read_receipt),
+            selectinload(GroupChatAnswer.group_chat).selectinload(GroupChat.recipient)
+        )
+        .filter(GroupChatAnswer.id == answer_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+async def select_recipient_by_message_id(db: AsyncSession, message_id: int):
+    result = await db.execute(select(MessageRecipient).filter(MessageRecipient.group_chat_id == message_id))
+    return result.scalars().all()
+
+
+async def get_last_message_db(db: AsyncSession, group_id: int, sender_id: int):
     subquery = (select(GroupChat.id)
                 .filter(GroupChat.sender_id == sender_id, GroupChat.group_id == group_id))
 
-    message_obj = db.query(
-        GroupChat.id,
-        GroupChat.message,
-        GroupChat.datetime_message,
-        GroupChat.fixed,
-        GroupChat.message_type,
-        GroupChat.group_id,
-        GroupChat.sender_id,
-        GroupChat.sender_type,
-        GroupChat.deleted,
-        GroupChat.read_by,
-        func.group_concat(GroupChatAttachFile.id).label("fileIds"),
-        func.group_concat(GroupChatAttachFile.file_path).label("filePaths"),
-        func.group_concat(GroupChatAttachFile.mime_type).label("mimeTypes"),
-        func.group_concat(GroupChatAttachFile.filename).label("fileNames"),
-        func.group_concat(GroupChatAttachFile.size).label("fileSizes")
-    ) \
-        .join(GroupChatAttachFile, GroupChatAttachFile.chat_message == GroupChat.id, isouter=True) \
-        .filter(GroupChat.id.in_(subquery.scalar_subquery())) \
+    result = await db.execute(
+        select(
+            GroupChat.id,
+            GroupChat.message,
+            GroupChat.datetime_message,
+            GroupChat.fixed,
+            GroupChat.message_type,
+            GroupChat.group_id,
+            GroupChat.sender_id,
+            GroupChat.sender_type,
+            GroupChat.deleted,
+            func.group_concat(GroupChatAttachFile.id).label("fileIds"),
+            func.group_concat(GroupChatAttachFile.file_path).label("filePaths"),
+            func.group_concat(GroupChatAttachFile.mime_type).label("mimeTypes"),
+            func.group_concat(GroupChatAttachFile.filename).label("fileNames"),
+            func.group_concat(GroupChatAttachFile.size).label("fileSizes")
+        )
+        .join(GroupChatAttachFile, GroupChatAttachFile.chat_message == GroupChat.id, isouter=True)
+        .filter(GroupChat.id.in_(subquery.scalar_subquery()))
         .group_by(
-        GroupChat.id,
-        GroupChat.message,
-        GroupChat.datetime_message,
-        GroupChat.fixed,
-        GroupChat.message_type,
-        GroupChat.group_id,
-        GroupChat.sender_id,
-        GroupChat.sender_type
-    ) \
-        .order_by(desc(GroupChat.datetime_message)) \
-        .limit(1) \
-        .first()
-
-    return message_obj
-
-
-def get_last_answer_db(db: Session, sender_id: int):
+            GroupChat.id,
+            GroupChat.message,
+            GroupChat.datetime_message,
+            GroupChat.fixed,
+            GroupChat.message_type,
+            GroupChat.group_id,
+            GroupChat.sender_id,
+            GroupChat.sender_type
+        )
+        .order_by(desc(GroupChat.datetime_message))
+        .limit(1)
+    )
+
+    return result.first()
+
+
+async def get_last_answer_db(db: AsyncSession, sender_id: int):
     subquery = select(GroupChatAnswer.id).filter(GroupChatAnswer.sender_id == sender_id)
 
-    answer_obj = db.query(
-        GroupChatAnswer,
-        func.group_concat(GroupChatAttachFile.id).label("fileIds"),
-        func.group_concat(GroupChatAttachFile.file_path).label("filePaths"),
-        func.group_concat(GroupChatAttachFile.mime_type).label("mimeTypes"),
-        func.group_concat(GroupChatAttachFile.filename).label("fileNames"),
-        func.group_concat(GroupChatAttachFile.size).label("fileSizes")
-    )\
-        .join(GroupChatAttachFile, GroupChatAttachFile.chat_answer == GroupChatAnswer.id, isouter=True) \
-        .filter(GroupChatAnswer.id.in_(subquery.scalar_subquery())) \
-        .group_by(GroupChatAnswer.id) \
-        .order_by(desc(GroupChatAnswer.datetime_message)) \
-        .limit(1) \
-        .first()
-
-    return answer_obj
-
-
-def update_message_read_by_db(db: Session, message_id: int, user_id: int):
-    message = db.query(GroupChat).filter(GroupChat.id == message_id).first()
-    if message.read_by is not None:
-        read_by_list = list(map(int, message.read_by.split(", ")))
-        read_by_list.append(user_id)
-        read_by_str = ", ".join(map(str, read_by_list))
-        message.read_by = read_by_str
-        db.commit()
-        db.refresh(message)
-        return message
-    message.read_by = str(user_id)
-    db.commit()
-    db.refresh(message)
-    return message
+    result = await db.execute(
+        select(
+            GroupChatAnswer,
+            func.group_concat(GroupChatAttachFile.id).label("fileIds"),
+            func.group_concat(GroupChatAttachFile.file_path).label("filePaths"),
+            func.group_concat(GroupChatAttachFile.mime_type).label("mimeTypes"),
+            func.group_concat(GroupChatAttachFile.filename).label("fileNames"),
+            func.group_concat(GroupChatAttachFile.size).label("fileSizes")
+        )
+        .join(GroupChatAttachFile, GroupChatAttachFile.chat_answer == GroupChatAnswer.id, isouter=True)
+        .filter(GroupChatAnswer.id.in_(subquery.scalar_subquery()))
+        .group_by(GroupChatAnswer.id)
+        .order_by(desc(GroupChatAnswer.datetime_message))
+        .limit(1)
+    )
 
+    return result.first()
 
-def update_answer_read_by_db(db: Session, answer_id: int, user_id: int):
-    answer = db.query(GroupChatAnswer).filter(GroupChatAnswer.id == answer_id).first()
-    if answer.read_by is not None:
-        read_by_list = list(map(int, answer.read_by.split(", ")))
-        read_by_list.append(user_id)
-        read_by_str = ", ".join(map(str, read_by_list))
-        answer.read_by = read_by_str
-        db.commit()
-        db.refresh(answer)
-        return answer
-    answer.read_by = str(user_id)
-    db.commit()
-    db.refresh(answer)
-    return answer
+
+def visible_message_filter(user_id: int):
+    return or_(
+        GroupChat.message_type == "everyone",
+        GroupChat.sender_id == user_id,
+        GroupChat.id.in_(select(MessageRecipient.group_chat_id).filter(MessageRecipient.recipient_id == user_id))
+    )
+
+
+async def select_read_receipt_users_db(db: AsyncSession, message_id: int = None, answer_id: int = None):
+    query = select(GroupChatReadReceipt.user_id).order_by(GroupChatReadReceipt.id)
+    if message_id is not None:
+        query = query.filter(GroupChatReadReceipt.group_chat_id == message_id)
+    else:
+        query = query.filter(GroupChatReadReceipt.group_chat_answer_id == answer_id)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+def insert_read_receipts(db: AsyncSession, columns: List[str], rows):
+    dialect = db.bind.dialect.name
+    if dialect == "mysql":
+        return mysql.insert(GroupChatReadReceipt).from_select(columns, rows).prefix_with("IGNORE")
+    insert_receipts = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    return insert_receipts(GroupChatReadReceipt).from_select(columns, rows).on_conflict_do_nothing()
+
+
+async def create_read_receipt_db(db: AsyncSession, user_id: int, message_id: int = None, answer_id: int = None):
+    read_at = literal(datetime.utcnow(), DateTime)
+    if message_id is not None:
+        column = "group_chat_id"
+        rows = select(literal(user_id), GroupChat.id, read_at).filter(GroupChat.id == message_id)
+    else:
+        column = "group_chat_answer_id"
+        rows = select(literal(user_id), GroupChatAnswer.id, read_at).filter(GroupChatAnswer.id == answer_id)
+
+    result = await db.execute(rows.with_only_columns(rows.selected_columns[1]))
+    if result.scalar() is None:
+        return False
+
+    await db.execute(insert_read_receipts(db, ["user_id", column, "read_at"], rows))
+    await db.commit()
+    return True
+
+
+async def create_message_read_receipt_db(db: AsyncSession, message_id: int, user_id: int):
+    if not await create_read_receipt_db(db=db, user_id=user_id, message_id=message_id):
+        return None
+    read_by = await select_read_receipt_users_db(db=db, message_id=message_id)
+    return {"messageId": message_id, "readBy": read_by}
+
+
+async def create_answer_read_receipt_db(db: AsyncSession, answer_id: int, user_id: int):
+    if not await create_read_receipt_db(db=db, user_id=user_id, answer_id=answer_id):
+        return None
+    read_by = await select_read_receipt_users_db(db=db, answer_id=answer_id)
+    return {"answerId": answer_id, "readBy": read_by}
+
+
+async def mark_messages_read_db(db: AsyncSession, group_id: int, user_id: int, last_message_id: int):
+    last_datetime = select(GroupChat.datetime_message).filter(GroupChat.id == last_message_id).scalar_subquery()
+    read_at = literal(datetime.utcnow(), DateTime)
+
+    messages = select(GroupChat.id)\
+        .filter(GroupChat.group_id == group_id)\
+        .filter(visible_message_filter(user_id))\
+        .filter(tuple_(GroupChat.datetime_message, GroupChat.id) <= tuple_(last_datetime, last_message_id))
+
+    message_receipt = select(GroupChatReadReceipt.id)\
+        .filter(GroupChatReadReceipt.user_id == user_id)\
+        .filter(GroupChatReadReceipt.group_chat_id == GroupChat.id)\
+        .exists()
+    answer_receipt = select(GroupChatReadReceipt.id)\
+        .filter(GroupChatReadReceipt.user_id == user_id)\
+        .filter(GroupChatReadReceipt.group_chat_answer_id == GroupChatAnswer.id)\
+        .exists()
+
+    await db.execute(
+        insert_read_receipts(
+            db,
+            ["user_id", "group_chat_id", "read_at"],
+            select(literal(user_id), GroupChat.id, read_at)
+            .filter(GroupChat.id.in_(messages))
+            .filter(GroupChat.sender_id != user_id)
+            .filter(~message_receipt)
+        )
+    )
+    await db.execute(
+        insert_read_receipts(
+            db,
+            ["user_id", "group_chat_answer_id", "read_at"],
+            select(literal(user_id), GroupChatAnswer.id, read_at)
+            .filter(GroupChatAnswer.group_chat_id.in_(messages))
+            .filter(GroupChatAnswer.sender_id != user_id)
+            .filter(~answer_receipt)
+        )
+    )
+    await db.commit()
+
+
+async def select_unread_count_db(db: AsyncSession, group_id: int, user_id: int):
+    message_receipt = select(GroupChatReadReceipt.id)\
+        .filter(GroupChatReadReceipt.user_id == user_id)\
+        .filter(GroupChatReadReceipt.group_chat_id == GroupChat.id)\
+        .exists()
+    answer_receipt = select(GroupChatReadReceipt.id)\
+        .filter(GroupChatReadReceipt.user_id == user_id)\
+        .filter(GroupChatReadReceipt.group_chat_answer_id == GroupChatAnswer.id)\
+        .exists()
+
+    messages = await db.execute(
+        select(func.count(GroupChat.id))
+        .filter(GroupChat.group_id == group_id)
+        .filter(visible_message_filter(user_id))
+        .filter(GroupChat.sender_id != user_id)
+        .filter(GroupChat.deleted.isnot(True))
+        .filter(~message_receipt)
+    )
+    answers = await db.execute(
+        select(func.count(GroupChatAnswer.id))
+        .join(GroupChat, GroupChat.id == GroupChatAnswer.group_chat_id)
+        .filter(GroupChat.group_id == group_id)
+        .filter(visible_message_filter(user_id))
+        .filter(GroupChatAnswer.sender_id != user_id)
+        .filter(GroupChatAnswer.deleted.isnot(True))
+        .filter(~answer_receipt)
+    )
+    return {"unreadMessages": messages.scalar(), "unreadAnswers": answers.scalar()}
 
 
-def delete_message_db(db: Session, message: GroupChat):
+async def delete_message_db(db: AsyncSession, message: GroupChat):
     message.deleted = True
-    db.commit()
-    db.refresh(message)
+    await db.commit()
+    await db.refresh(message)
     return message
 
 
-def delete_answer_db(db: Session, answer: GroupChatAnswer):
+async def delete_answer_db(db: AsyncSession, answer: GroupChatAnswer):
     answer.deleted = True
-    db.commit()
-    db.refresh(answer)
+    await db.commit()
+    await db.refresh(answer)
     return answer
 
 
-def update_message_text_and_fixed_db(db: Session, new_text: str, fixed: bool, message: GroupChat):
+async def update_message_text_and_fixed_db(db: AsyncSession, new_text: str, fixed: bool, message: GroupChat):
     message.message = new_text
     message.fixed = fixed
-    db.commit()
-    db.refresh(message)
+    await db.commit()
+    await db.refresh(message)
     return message
 
 
-def update_message_type_db(db: Session, message_type: str, recipients: List[int], message: GroupChat):
-    db_recipients = db.query(MessageRecipient).filter(MessageRecipient.group_chat_id == message.id).all()
+async def update_message_type_db(db: AsyncSession, message_type: str, recipients: List[int], message: GroupChat):
+    result = await db.execute(select(MessageRecipient).filter(MessageRecipient.group_chat_id == message.id))
+    db_recipients = result.scalars().all()
     for recipient in db_recipients:
-        db.delete(recipient)
-        db.commit()
+        await db.delete(recipient)
+        await db.commit()
 
     message.message_type = message_type
-    db.commit()
-    db.refresh(message)
+    await db.commit()
+    await db.refresh(message)
 
-    create_recipient_db(db=db, group_chat_id=message.id, recipient=recipients)
+    await create_recipient_db(db=db, group_chat_id=message.id, recipient=recipients)
     return message
 
 
-def update_answer_text_db(db: Session, answer_text: str, answer: GroupChatAnswer):
+async def update_answer_text_db(db: AsyncSession, answer_text: str, answer: GroupChatAnswer):
     answer.message = answer_text
-    db.commit()
-    db.refresh(answer)
+    await db.commit()
+    await db.refresh(answer)
     return answer
 
 
-def delete_attached_file_db(db: Session, file_id: int):
-    attach_file = db.query(GroupChatAttachFile).filter(GroupChatAttachFile.id == file_id).first()
-    db.delete(attach_file)
-    db.commit()
+async def delete_attached_file_db(db: AsyncSession, file_id: int):
+    result = await db.execute(select(GroupChatAttachFile).filter(GroupChatAttachFile.id == file_id))
+    attach_file = result.scalars().first()
+    await db.delete(attach_file)
+    await db.commit()
@@ -1,64 +1,72 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Curator, Group, ParticipantComment, Student, User
 from app.schemas.group_schemas import GroupCreate, GroupUpdate
 
 
-def create_group_db(db: Session, group_data: GroupCreate):
+async def create_group_db(db: AsyncSession, group_data: GroupCreate):
     new_group = Group(**group_data.dict())
     db.add(new_group)
-    db.commit()
-    db.refresh(new_group)
+    await db.commit()
+    await db.refresh(new_group)
     return new_group
 
 
-def select_groups_db(db: Session):
-    return db.query(Group).all()
+async def select_groups_db(db: AsyncSession):
+    result = await db.execute(select(Group))
+    return result.scalars().all()
 
 
-def select_group_by_name_db(db: Session, group_name: str):
-    return db.query(Group.id).filter(Group.group_name == group_name).scalar()
+async def select_group_by_name_db(db: AsyncSession, group_name: str):
+    result = await db.execute(select(Group.id).filter(Group.group_name == group_name))
+    return result.scalar()
 
 
-def select_group_by_id_db(db: Session, group_id: int):
-    return db.query(Group).filter(Group.id == group_id).first()
+async def select_group_by_id_db(db: AsyncSession, group_id: int):
+    result = await db.execute(select(Group).filter(Group.id == group_id))
+    return result.scalars().first()
 
 
-def select_groups_by_curator_id_db(db: Session, curator_id: int):
-    return db.query(Group).filter(Group.curator_id == curator_id).all()
+async def select_groups_by_curator_id_db(db: AsyncSession, curator_id: int):
+    result = await db.execute(select(Group).filter(Group.curator_id == curator_id))
+    return result.scalars().all()
 
 
-def select_groups_by_specialization_id_db(db: Session, specialization_id: int):
-    return db.query(Group).filter(Group.specialization_id == specialization_id).all()
+async def select_groups_by_specialization_id_db(db: AsyncSession, specialization_id: int):
+    result = await db.execute(select(Group).filter(Group.specialization_id == specialization_id))
+    return result.scalars().all()
 
 
-def update_group_db(db: Session, group: Group, group_data: GroupUpdate):
+async def update_group_db(db: AsyncSession, group: Group, group_data: GroupUpdate):
     for field, value in group_data:
         if value:
             setattr(group, field, value)
 
-    db.commit()
-    db.refresh(group)
+    await db.commit()
+    await db.refresh(group)
 
 
-def delete_group_db(db: Session, group: Group):
-    db.delete(group)
-    db.commit()
+async def delete_group_db(db: AsyncSession, group: Group):
+    await db.delete(group)
+    await db.commit()
 
 
-def select_group_curator_db(db: Session, group_id: int):
-    curator_data = db.query(
-        Curator.id,
-        Curator.name,
-        Curator.surname,
-        Curator.email,
-        Curator.image_path,
-        User.last_active
-    )\
-        .join(Group, Group.curator_id == Curator.id)\
-        .join(User, Curator.user_id == User.id)\
-        .filter(Group.id == group_id)\
-        .first()
+async def select_group_curator_db(db: AsyncSession, group_id: int):
+    result = await db.execute(
+        select(
+            Curator.id,
+            Curator.name,
+            Curator.surname,
+            Curator.email,
+            Curator.image_path,
+            User.last_active
+        )
+        .join(Group, Group.curator_id == Curator.id)
+        .join(User, Curator.user_id == User.id)
+        .filter(Group.id == group_id)
+    )
+    curator_data = result.first()
 
     fields = ['id', 'name', 'surname', 'email', 'image_path', 'last_active']
     curator = dict(zip(fields, curator_data))
@@ -66,36 +74,36 @@ def select_group_curator_db(db: Session, group_id: int):
     return curator
 
 
-def select_group_students_db(db: Session, group_id: int, subject_id: int):
-    students = db.query(
-        Student.id,
-        Student.name,
-        Student.surname,
-        Student.email,
-        Student.image_path,
-        User.last_active
-    )\
-        .join(User, Student.user_id == User.id)\
-        .filter(Student.group_id == group_id)\
-        .all()
-
-    students_list = []
-
-    for student in students:
-        participant_comment = db.query(ParticipantComment).\
-            filter(ParticipantComment.student_id == student.id and
-                   ParticipantComment.student_id == subject_id).first()
-
-        student_data = {
+async def select_group_students_db(db: AsyncSession, group_id: int, subject_id: int):
+    result = await db.execute(
+        select(
+            Student.id,
+            Student.name,
+            Student.surname,
+            Student.email,
+            Student.image_path,
+            User.last_active,
+            ParticipantComment.comment
+        )
+        .join(User, Student.user_id == User.id)
+        .outerjoin(ParticipantComment, and_(
+            ParticipantComment.student_id == Student.id,
+            ParticipantComment.subject_id == subject_id
+        ))
+        .filter(Student.group_id == group_id)
+        .order_by(Student.id, ParticipantComment.id)
+    )
+
+    students = {}
+    for student in result.all():
+        students.setdefault(student.id, {
             "id": student.id,
             "name": student.name,
             "surname": student.surname,
             "email": student.email,
             "image_path": student.image_path,
             "last_active": student.last_active,
-            "participant_comment": participant_comment.comment if participant_comment else None
-        }
-
-        students_list.append(student_data)
+            "participant_comment": student.comment
+        })
 
-    return students_list
+    return list(students.values())
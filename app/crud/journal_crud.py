@@ -0,0 +1,86 @@
+from typing import Dict, Iterable, List
+
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import Lecture, Lesson, SubjectJournal, TestLesson
+
+
+def select_lessons_and_subjects_by_lecture_ids_db(db: Session, lecture_ids: Iterable[int]) -> Dict:
+    result = db.query(
+        Lecture.id.label("lecture_id"),
+        Lesson.subject_id.label("subject_id"),
+        Lesson.id.label("lesson_id")
+    )\
+        .join(Lesson, Lesson.id == Lecture.lesson_id)\
+        .filter(Lecture.id.in_(set(lecture_ids)))\
+        .all()
+    return {row.lecture_id: row for row in result}
+
+
+def select_lessons_and_subjects_by_test_ids_db(db: Session, test_ids: Iterable[int]) -> Dict:
+    result = db.query(
+        TestLesson.id.label("test_id"),
+        Lesson.subject_id.label("subject_id"),
+        Lesson.id.label("lesson_id")
+    )\
+        .join(Lesson, Lesson.id == TestLesson.lesson_id)\
+        .filter(TestLesson.id.in_(set(test_ids)))\
+        .all()
+    return {row.test_id: row for row in result}
+
+
+def upsert_journal_rows_db(db: Session, rows: List[Dict], update_score: bool):
+    if not rows:
+        return
+
+    dialect = db.get_bind().dialect.name
+    key = ["subject_id", "lesson_id", "student_id"]
+
+    if dialect == "mysql":
+        statement = mysql.insert(SubjectJournal).values(rows)
+        if update_score:
+            statement = statement.on_duplicate_key_update(score=statement.inserted.score)
+        else:
+            statement = statement.prefix_with("IGNORE")
+    else:
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        statement = insert(SubjectJournal).values(rows)
+        if update_score:
+            statement = statement.on_conflict_do_update(index_elements=key, set_={"score": statement.excluded.score})
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=key)
+
+    db.execute(statement)
+
+
+def write_journal_events_db(db: Session, events: List[Dict]):
+    lectures = select_lessons_and_subjects_by_lecture_ids_db(
+        db=db,
+        lecture_ids=[event["lecture_id"] for event in events if event["type"] == "lecture"]
+    )
+    tests = select_lessons_and_subjects_by_test_ids_db(
+        db=db,
+        test_ids=[event["test_id"] for event in events if event["type"] == "test"]
+    )
+
+    viewed = {}
+    scores = {}
+    for event in events:
+        if event["type"] == "lecture":
+            data = lectures.get(event["lecture_id"])
+        else:
+            data = tests.get(event["test_id"])
+        if data is None:
+            continue
+
+        row = {"subject_id": data.subject_id, "lesson_id": data.lesson_id, "student_id": event["student_id"]}
+        key = (data.subject_id, data.lesson_id, event["student_id"])
+        if event["type"] == "lecture":
+            viewed[key] = {**row, "absent": True}
+        else:
+            scores[key] = {**row, "score": event["score"]}
+
+    upsert_journal_rows_db(db=db, rows=list(scores.values()), update_score=True)
+    upsert_journal_rows_db(db=db, rows=[row for key, row in viewed.items() if key not in scores], update_score=False)
+    db.commit()
@@ -1,23 +1,40 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.enums import LectureAttributeType
-from app.models import Lecture, LectureAttribute, LectureFile, LectureLink, StudentLecture
+from app.models import Lecture, LectureAttribute, LectureFile, LectureLink, Lesson, Module, StudentLecture
 
 
-def create_lecture_db(db: Session, lesson_id: int) -> object:
+async def create_lecture_db(db: AsyncSession, lesson_id: int) -> object:
     new_lecture = Lecture(lesson_id=lesson_id)
     db.add(new_lecture)
-    db.commit()
-    db.refresh(new_lecture)
+    await db.commit()
+    await db.refresh(new_lecture)
     return new_lecture
 
 
-def get_lecture_db(db: Session, lesson_id: int):
-    return db.query(Lecture).filter(Lecture.lesson_id == lesson_id).first()
+async def select_lecture_page_db(db: AsyncSession, lesson_id: int):
+    result = await db.execute(
+        select(Lesson)
+        .options(
+            joinedload(Lesson.lecture).joinedload(Lecture.attributes).options(
+                selectinload(LectureAttribute.lecture_file),
+                selectinload(LectureAttribute.lecture_link)
+            )
+        )
+        .filter(Lesson.id == lesson_id)
+    )
+    return result.unique().scalars().first()
+
+
+async def select_lecture_lesson_id_db(db: AsyncSession, lecture_id: int):
+    result = await db.execute(select(Lecture.lesson_id).filter(Lecture.id == lecture_id))
+    return result.scalar()
 
 
-def create_attribute_base_db(
-        db: Session,
+async def create_attribute_base_db(
+        db: AsyncSession,
         lecture_id: int,
         attr_type: LectureAttributeType,
         attr_title: str,
@@ -34,13 +51,13 @@ def create_attribute_base_db(
         lecture_id=lecture_id
     )
     db.add(attribute)
-    db.commit()
-    db.refresh(attribute)
+    await db.commit()
+    await db.refresh(attribute)
     return attribute
 
 
-def update_attribute_db(
-        db: Session,
+async def update_attribute_db(
+        db: AsyncSession,
         attribute: LectureAttribute,
         title: str = None,
         text: str = None,
@@ -56,18 +73,18 @@ def update_attribute_db(
     if hided is not None:
         attribute.hided = hided
 
-    db.commit()
-    db.refresh(attribute)
+    await db.commit()
+    await db.refresh(attribute)
     return attribute
 
 
-def delete_attribute_db(db: Session, attribute: LectureAttribute):
-    db.delete(attribute)
-    db.commit()
+async def delete_attribute_db(db: AsyncSession, attribute: LectureAttribute):
+    await db.delete(attribute)
+    await db.commit()
 
 
-def create_attribute_file_db(
-        db: Session,
+async def create_attribute_file_db(
+        db: AsyncSession,
         attribute_id: int,
         filename: str,
         file_path: str,
@@ -82,12 +99,12 @@ def create_attribute_file_db(
         lecture_attribute_id=attribute_id
     )
     db.add(file)
-    db.commit()
-    db.refresh(file)
+    await db.commit()
+    await db.refresh(file)
 
 
-def create_attribute_file_with_description_db(
-        db: Session,
+async def create_attribute_file_with_description_db(
+        db: AsyncSession,
         attribute_id: int,
         filename: str,
         file_path: str,
@@ -104,12 +121,12 @@ def create_attribute_file_with_description_db(
         lecture_attribute_id=attribute_id
     )
     db.add(file)
-    db.commit()
-    db.refresh(file)
+    await db.commit()
+    await db.refresh(file)
 
 
-def update_attribute_file_db(
-        db: Session,
+async def update_attribute_file_db(
+        db: AsyncSession,
         file: LectureFile,
         file_path: str = None,
         filename: str = None,
@@ -124,90 +141,108 @@ def update_attribute_file_db(
         file.file_size = file_size
     if download_allowed is not None:
         file.download_allowed = download_allowed
-    db.commit()
-    db.refresh(file)
+    await db.commit()
+    await db.refresh(file)
 
 
-def get_attribute_file_by_path_db(db: Session, file_path: str):
-    return db.query(LectureFile).filter(LectureFile.file_path == file_path).first()
+async def get_attribute_file_by_path_db(db: AsyncSession, file_path: str):
+    result = await db.execute(select(LectureFile).filter(LectureFile.file_path == file_path))
+    return result.scalars().first()
 
 
-def delete_attribute_file_db(db: Session, file: LectureFile):
-    db.delete(file)
-    db.commit()
+async def delete_attribute_file_db(db: AsyncSession, file: LectureFile):
+    await db.delete(file)
+    await db.commit()
 
 
-def create_attribute_link_db(db: Session, attribute_id: int, link: str, anchor: str):
+async def create_attribute_link_db(db: AsyncSession, attribute_id: int, link: str, anchor: str):
     link = LectureLink(link=link, anchor=anchor, lecture_attribute_id=attribute_id)
     db.add(link)
-    db.commit()
-    db.refresh(link)
+    await db.commit()
+    await db.refresh(link)
 
 
-def update_attribute_link_db(db: Session, attr_link: LectureLink, link: str = None, anchor: str = None):
+async def update_attribute_link_db(db: AsyncSession, attr_link: LectureLink, link: str = None, anchor: str = None):
     if link is not None:
         attr_link.link = link
     if anchor is not None:
         attr_link.anchor = anchor
-    db.commit()
-    db.refresh(link)
-
-
-def delete_attribute_link_db(db: Session, link: LectureLink):
-    db.delete(link)
-    db.commit()
+    await db.commit()
+    await db.refresh(attr_link)
 
 
-def get_lecture_attributes_db(db: Session, lecture_id: int):
-    return db.query(LectureAttribute).filter(LectureAttribute.lecture_id == lecture_id).all()
+async def delete_attribute_link_db(db: AsyncSession, link: LectureLink):
+    await db.delete(link)
+    await db.commit()
 
 
-def get_lecture_text_attribute_db(db: Session, lecture_id: int):
-    result = db.query(
-        LectureAttribute.id.label("attributeId"),
-        LectureAttribute.attr_type.label("attributeType"),
-        LectureAttribute.attr_number.label("attributeNumber"),
-        LectureAttribute.attr_title.label("attributeTitle"),
-        LectureAttribute.attr_text.label("attributeText"),
-        LectureAttribute.hided.label("hided")
-    )\
-        .filter(LectureAttribute.lecture_id == lecture_id) \
-        .all()
+async def get_lecture_attributes_db(db: AsyncSession, lecture_id: int):
+    result = await db.execute(
+        select(LectureAttribute)
+        .options(selectinload(LectureAttribute.lecture_file), selectinload(LectureAttribute.lecture_link))
+        .filter(LectureAttribute.lecture_id == lecture_id)
+    )
+    return result.scalars().all()
+
+
+async def get_lecture_text_attribute_db(db: AsyncSession, lecture_id: int):
+    result = await db.execute(
+        select(
+            LectureAttribute.id.label("attributeId"),
+            LectureAttribute.attr_type.label("attributeType"),
+            LectureAttribute.attr_number.label("attributeNumber"),
+            LectureAttribute.attr_title.label("attributeTitle"),
+            LectureAttribute.attr_text.label("attributeText"),
+            LectureAttribute.hided.label("hided")
+        )
+        .filter(LectureAttribute.lecture_id == lecture_id)
+    )
 
-    return result
+    return result.all()
 
 
-def get_attribute_db(db: Session, attr_id: int):
-    return db.query(LectureAttribute).filter(LectureAttribute.id == attr_id).first()
+async def get_attribute_db(db: AsyncSession, attr_id: int):
+    result = await db.execute(
+        select(LectureAttribute)
+        .options(selectinload(LectureAttribute.lecture_file), selectinload(LectureAttribute.lecture_link))
+        .filter(LectureAttribute.id == attr_id)
+    )
+    return result.scalars().first()
 
 
-def get_attribute_file_db(db: Session, file_id: int):
-    return db.query(LectureFile).filter(LectureFile.id == file_id).first()
+async def get_attribute_file_db(db: AsyncSession, file_id: int):
+    result = await db.execute(select(LectureFile).filter(LectureFile.id == file_id))
+    return result.scalars().first()
 
 
-def get_attribute_link_db(db: Session, link_id: int):
-    return db.query(LectureLink).filter(LectureLink.id == link_id).first()
+async def get_attribute_link_db(db: AsyncSession, link_id: int):
+    result = await db.execute(select(LectureLink).filter(LectureLink.id == link_id))
+    return result.scalars().first()
 
 
-def check_lecture_db(db: Session, student_id: int, lecture_id: int):
+async def check_lecture_db(db: AsyncSession, student_id: int, lecture_id: int):
     new_row = StudentLecture(
         check=True,
         student_id=student_id,
         lecture_id=lecture_id
     )
     db.add(new_row)
-    db.commit()
-    db.refresh(new_row)
+    await db.commit()
+    await db.refresh(new_row)
     return new_row
 
 
-def select_student_lecture(db: Session, student_id: int, lecture_id: int):
-    result = db.query(
-        StudentLecture.id.label("id"),
-        StudentLecture.check.label("check")
-    )\
+async def select_viewed_lecture_lessons_db(db: AsyncSession, student_id: int, subject_id: int):
+    result = await db.execute(
+        select(Lecture.lesson_id)
+        .join(StudentLecture, StudentLecture.lecture_id == Lecture.id)
+        .join(Lesson, Lesson.id == Lecture.lesson_id)
+        .join(Module, Module.id == Lesson.module_id)
         .filter(
-        StudentLecture.student_id == student_id,
-        StudentLecture.lecture_id == lecture_id)\
-        .first()
-    return result
+            Module.subject_id == subject_id,
+            StudentLecture.student_id == student_id,
+            StudentLecture.check.is_(True)
+        )
+        .distinct()
+    )
+    return set(result.scalars().all())
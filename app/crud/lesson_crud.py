@@ -1,12 +1,13 @@
 from datetime import datetime
 
-from sqlalchemy.orm import Session
+from sqlalchemy import case, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Lesson, Module, Subject
+from app.models import Lesson, Module, StudentAdditionalSubject, Subject
 from app.schemas.lesson_schemas import LessonSchemas, LessonUpdate
 
 
-def create_new_lesson_db(db: Session, lesson_data: LessonSchemas):
+async def create_new_lesson_db(db: AsyncSession, lesson_data: LessonSchemas):
     new_lesson = Lesson(
         number=lesson_data.number,
         title=lesson_data.title,
@@ -21,94 +22,138 @@ def create_new_lesson_db(db: Session, lesson_data: LessonSchemas):
     )
 
     db.add(new_lesson)
-    db.commit()
-    db.refresh(new_lesson)
+    await db.commit()
+    await db.refresh(new_lesson)
     return new_lesson
 
 
-def update_lesson_db(db: Session, lesson: Lesson, lesson_data: LessonUpdate):
+async def update_lesson_db(db: AsyncSession, lesson: Lesson, lesson_data: LessonUpdate):
     for filed, value in lesson_data:
         if value:
             setattr(lesson, filed, value)
 
-    db.commit()
-    db.refresh(lesson)
+    await db.commit()
+    await db.refresh(lesson)
     return lesson
 
 
-def select_all_lessons_db(db: Session):
-    return db.query(Lesson).all()
+async def select_all_lessons_db(db: AsyncSession):
+    result = await db.execute(select(Lesson))
+    return result.scalars().all()
 
 
-def select_lesson_by_id_db(db: Session, lesson_id: int):
-    return db.query(Lesson).filter(Lesson.id == lesson_id).first()
+async def select_lesson_by_id_db(db: AsyncSession, lesson_id: int):
+    result = await db.execute(select(Lesson).filter(Lesson.id == lesson_id))
+    return result.scalars().first()
 
 
-def select_lesson_by_module_db(db: Session, module_id: int):
-    return db.query(Lesson).filter(Lesson.module_id == module_id).all()
+async def select_lesson_by_module_db(db: AsyncSession, module_id: int):
+    result = await db.execute(select(Lesson).filter(Lesson.module_id == module_id))
+    return result.scalars().all()
 
 
-def select_lesson_by_subject_db(db: Session, subject_id: int):
-    return db.query(Lesson).filter(Lesson.subject_id == subject_id).all()
+async def select_lesson_by_subject_db(db: AsyncSession, subject_id: int):
+    result = await db.execute(select(Lesson).filter(Lesson.subject_id == subject_id))
+    return result.scalars().all()
 
 
-def select_published_lesson_db(db: Session):
-    return db.query(Lesson).filter(Lesson.is_published == 1).all()
+async def select_published_lesson_db(db: AsyncSession):
+    result = await db.execute(select(Lesson).filter(Lesson.is_published == 1))
+    return result.scalars().all()
 
 
-def select_lesson_by_type_db(db: Session, lesson_type: str):
-    return db.query(Lesson).filter(Lesson.lesson_type == lesson_type).all()
+async def select_lesson_by_type_db(db: AsyncSession, lesson_type: str):
+    result = await db.execute(select(Lesson).filter(Lesson.lesson_type == lesson_type))
+    return result.scalars().all()
 
 
-def delete_lesson_db(db: Session, lesson: Lesson):
-    db.delete(lesson)
-    db.commit()
+async def delete_lesson_db(db: AsyncSession, lesson: Lesson):
+    await db.delete(lesson)
+    await db.commit()
 
 
-def select_three_next_lesson_db(db: Session, subject_id: int):
+async def select_upcoming_lessons_db(db: AsyncSession, subject_id: int):
     today = datetime.today()
 
-    result = db.query(
-        Lesson.lesson_date.label("lesson_date"),
-        Lesson.lesson_type.label("lesson_type")
-    )\
-        .join(Subject, Lesson.subject_id == Subject.id)\
-        .filter(Subject.id == subject_id, Lesson.lesson_date >= today)\
-        .order_by(Lesson.lesson_date).limit(3)\
-        .all()
-
-    return result
-
-
-def get_lessons_by_subject_id_db(db: Session, subject_id: int):
-    query_result = db.query(
-        Module.id.label("module_id"),
-        Module.name.label("module_name"),
-        Module.number.label("module_number"),
-        Module.description.label("module_desc"),
-        Lesson.id.label("lesson_id"),
-        Lesson.lesson_type.label("lesson_type"),
-        Lesson.number.label("lesson_number"),
-        Lesson.title.label("lesson_title"),
-        Lesson.description.label("lesson_desc"),
-        Lesson.lesson_date.label("lesson_date"),
-        Lesson.lesson_end.label("lesson_end")
-    )\
-        .outerjoin(Lesson, Lesson.module_id == Module.id) \
-        .filter(Module.subject_id == subject_id) \
-        .all()
+    result = await db.execute(
+        select(
+            Lesson.lesson_date.label("lesson_date"),
+            Lesson.lesson_type.label("lesson_type")
+        )
+        .join(Subject, Lesson.subject_id == Subject.id)
+        .filter(Subject.id == subject_id, Lesson.lesson_date >= today)
+        .order_by(Lesson.lesson_date)
+    )
+
+    return result.all()
+
+
+async def get_lessons_by_subject_id_db(db: AsyncSession, subject_id: int):
+    query_result = await db.execute(
+        select(
+            Module.id.label("module_id"),
+            Module.name.label("module_name"),
+            Module.number.label("module_number"),
+            Module.description.label("module_desc"),
+            Lesson.id.label("lesson_id"),
+            Lesson.lesson_type.label("lesson_type"),
+            Lesson.number.label("lesson_number"),
+            Lesson.title.label("lesson_title"),
+            Lesson.description.label("lesson_desc"),
+            Lesson.lesson_date.label("lesson_date"),
+            Lesson.lesson_end.label("lesson_end")
+        )
+        .outerjoin(Lesson, Lesson.module_id == Module.id)
+        .filter(Module.subject_id == subject_id)
+    )
 
-    return query_result
+    return query_result.all()
 
 
-def get_lesson_info_db(db: Session, lesson_id: int):
-    result = db.query(
-        Lesson.title.label("lessonTitle"),
-        Lesson.description.label("lessonDescription"),
-        Lesson.lesson_date.label("lessonDate"),
-        Lesson.lesson_end.label("lessonEnd"),
+async def get_lesson_info_db(db: AsyncSession, lesson_id: int):
+    result = await db.execute(
+        select(
+            Lesson.title.label("lessonTitle"),
+            Lesson.description.label("lessonDescription"),
+            Lesson.lesson_date.label("lessonDate"),
+            Lesson.lesson_end.label("lessonEnd"),
+        )
+        .filter(Lesson.id == lesson_id)
+    )
+
+    return result.first()
+
+
+def student_register_query(group_id: int, student_id: int):
+    additional_subjects = select(StudentAdditionalSubject.subject_id)\
+        .filter(StudentAdditionalSubject.student_id == student_id)
+    is_additional = case((Subject.group_id == group_id, False), else_=True)
+
+    return select(
+        Subject.id.label("subject_id"),
+        Subject.title.label("subject_title"),
+        is_additional.label("is_additional"),
+        Lesson.id,
+        Lesson.number,
+        Lesson.title,
+        Lesson.is_published,
+        Lesson.lesson_date,
+        Lesson.lesson_end,
+        Lesson.lesson_type,
+        Lesson.module_id,
+        Lesson.teacher_id
     )\
-        .filter(Lesson.id == lesson_id)\
-        .first()
+        .outerjoin(Lesson, Lesson.subject_id == Subject.id)\
+        .filter(or_(Subject.group_id == group_id, Subject.id.in_(additional_subjects)))\
+        .order_by(is_additional, Subject.id, Lesson.id)
+
+
+async def select_student_register_db(db: AsyncSession, group_id: int, student_id: int):
+    result = await db.execute(student_register_query(group_id=group_id, student_id=student_id))
+    return result.all()
+
 
-    return result
+async def stream_student_register_db(db: AsyncSession, group_id: int, student_id: int):
+    result = await db.stream(student_register_query(group_id=group_id, student_id=student_id))
+    async for row in result:
+        yield row
@@ -1,10 +1,11 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Module
 from app.schemas.module_schemas import CreateModule, UpdateModule
 
 
-def create_module_db(db: Session, module: CreateModule):
+async def create_module_db(db: AsyncSession, module: CreateModule):
     new_module = Module(
         number=module.number,
         name=module.name,
@@ -13,33 +14,36 @@ def create_module_db(db: Session, module: CreateModule):
     )
 
     db.add(new_module)
-    db.commit()
-    db.refresh(new_module)
+    await db.commit()
+    await db.refresh(new_module)
     return new_module
 
 
-def update_module_db(db: Session, module: Module, module_data: UpdateModule):
+async def update_module_db(db: AsyncSession, module: Module, module_data: UpdateModule):
     for field, value in module_data:
         if value:
             setattr(module, field, value)
 
-    db.commit()
-    db.refresh(module)
+    await db.commit()
+    await db.refresh(module)
     return module
 
 
-def select_modules_db(db: Session):
-    return db.query(Module).all()
+async def select_modules_db(db: AsyncSession):
+    result = await db.execute(select(Module))
+    return result.scalars().all()
 
 
-def select_module_by_id_db(db: Session, module_id: int):
-    return db.query(Module).filter(Module.id == module_id).first()
+async def select_module_by_id_db(db: AsyncSession, module_id: int):
+    result = await db.execute(select(Module).filter(Module.id == module_id))
+    return result.scalars().first()
 
 
-def select_modules_by_subject_id_db(db: Session, subject_id):
-    return db.query(Module).filter(Module.subject_id == subject_id).all()
+async def select_modules_by_subject_id_db(db: AsyncSession, subject_id):
+    result = await db.execute(select(Module).filter(Module.subject_id == subject_id))
+    return result.scalars().all()
 
 
-def delete_module_db(db: Session, module: Module):
-    db.delete(module)
-    db.commit()
+async def delete_module_db(db: AsyncSession, module: Module):
+    await db.delete(module)
+    await db.commit()
@@ -0,0 +1,46 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Group, Lesson, Student, StudentAdditionalSubject, Subject, Teacher
+
+
+async def select_schedule_db(
+        db: AsyncSession,
+        start: datetime,
+        end: datetime,
+        student_id: Optional[int] = None,
+        teacher_id: Optional[int] = None
+):
+    query = select(
+        Lesson.id.label("lesson_id"),
+        Lesson.subject_id,
+        Subject.title.label("subject_name"),
+        Lesson.title.label("lesson_name"),
+        Lesson.lesson_type,
+        Lesson.lesson_date,
+        Lesson.lesson_end,
+        Teacher.name.label("teacher_name"),
+        Teacher.surname.label("teacher_surname"),
+        Group.group_name
+    )\
+        .join(Subject, Subject.id == Lesson.subject_id)\
+        .outerjoin(Teacher, Teacher.id == Lesson.teacher_id)\
+        .outerjoin(Group, Group.id == Subject.group_id)\
+        .filter(Lesson.lesson_date >= start, Lesson.lesson_date < end)\
+        .order_by(Lesson.lesson_date, Lesson.id)
+
+    if student_id is not None:
+        group_id = select(Student.group_id).filter(Student.id == student_id).scalar_subquery()
+        subject_ids = select(Subject.id).filter(Subject.group_id == group_id).union(
+            select(StudentAdditionalSubject.subject_id).filter(StudentAdditionalSubject.student_id == student_id)
+        )
+        query = query.filter(Lesson.subject_id.in_(subject_ids))
+
+    if teacher_id is not None:
+        query = query.filter(Lesson.teacher_id == teacher_id)
+
+    result = await db.execute(query)
+    return result.all()
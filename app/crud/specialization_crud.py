@@ -1,35 +1,39 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Specialization
 from app.schemas.specialization_schemas import SpecializationCreate
 
 
-def create_specialization_db(db: Session, data: SpecializationCreate):
+async def create_specialization_db(db: AsyncSession, data: SpecializationCreate):
     specialization = Specialization(title=data.title, course_id=data.course_id)
     db.add(specialization)
-    db.commit()
-    db.refresh(specialization)
+    await db.commit()
+    await db.refresh(specialization)
     return specialization
 
 
-def update_specialization_title_db(db: Session, title: str, specialization: Specialization):
+async def update_specialization_title_db(db: AsyncSession, title: str, specialization: Specialization):
     specialization.title = title
-    db.commit()
-    db.refresh(specialization)
+    await db.commit()
+    await db.refresh(specialization)
 
 
-def select_specialization_by_id_db(db: Session, spec_id: int):
-    return db.query(Specialization).filter(Specialization.id == spec_id).first()
+async def select_specialization_by_id_db(db: AsyncSession, spec_id: int):
+    result = await db.execute(select(Specialization).filter(Specialization.id == spec_id))
+    return result.scalars().first()
 
 
-def select_specializations_by_course_id_db(db: Session, course_id: int):
-    return db.query(Specialization).filter(Specialization.course_id == course_id).all()
+async def select_specializations_by_course_id_db(db: AsyncSession, course_id: int):
+    result = await db.execute(select(Specialization).filter(Specialization.course_id == course_id))
+    return result.scalars().all()
 
 
-def select_specializations_db(db: Session):
-    return db.query(Specialization).all()
+async def select_specializations_db(db: AsyncSession):
+    result = await db.execute(select(Specialization))
+    return result.scalars().all()
 
 
-def delete_specialization_db(db: Session, specialization: Specialization):
-    db.delete(specialization)
-    db.commit()
+async def delete_specialization_db(db: AsyncSession, specialization: Specialization):
+    await db.delete(specialization)
+    await db.commit()
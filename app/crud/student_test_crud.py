@@ -1,9 +1,12 @@
-from sqlalchemy.orm import Session
+from typing import Dict, List
 
-from app.models import StudentTest, StudentTestAnswer, StudentTestMatching, TestAnswer, TestMatchingLeft
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models import StudentTest, StudentTestAnswer, StudentTestMatching, TestAnswer, TestMatchingLeft, TestQuestion
 
-def create_student_test_db(db: Session, test_id: int, student_id: int):
+
+async def create_student_test_db(db: AsyncSession, test_id: int, student_id: int):
     student_test = StudentTest(
         score=0,
         number_attempt=1,
@@ -11,102 +14,64 @@ def create_student_test_db(db: Session, test_id: int, student_id: int):
         student_id=student_id
     )
     db.add(student_test)
-    db.commit()
-    db.refresh(student_test)
+    await db.commit()
+    await db.refresh(student_test)
     return student_test
 
 
-def select_student_test_db(db: Session, student_id: id, test_id: int):
-    return db.query(StudentTest).filter(
+async def select_student_test_db(db: AsyncSession, student_id: id, test_id: int):
+    result = await db.execute(select(StudentTest).filter(
         StudentTest.student_id == student_id,
         StudentTest.test_id == test_id
-    ).first()
-
-
-def update_student_test_score_db(db: Session, student_test: StudentTest, score: int):
-    student_test.score = score
-    db.commit()
-    db.refresh(student_test)
-    return student_test
+    ))
+    return result.scalars().first()
 
 
-def update_student_attempt_db(db: Session, student_test: StudentTest):
+async def update_student_attempt_db(db: AsyncSession, student_test: StudentTest):
     student_test.number_attempt += 1
-    db.commit()
-    db.refresh(student_test)
+    await db.commit()
+    await db.refresh(student_test)
     return student_test
 
 
-def select_correct_answer_db(db: Session, question_id: int):
-    correct_answer_id = db.query(TestAnswer.id.label("id")).filter(
-        TestAnswer.is_correct == 1,
-        TestAnswer.question_id == question_id
-    ).first()
-    return correct_answer_id.id
-
-
-def select_correct_answers_db(db: Session, question_id: int):
-    answers_id = db.query(TestAnswer.id.label("id")).filter(
-        TestAnswer.is_correct == 1,
-        TestAnswer.question_id == question_id
-    ).all()
-    correct_answers_ids = [answer.id for answer in answers_id]
-    return correct_answers_ids
-
-
-def create_student_test_answer_db(
-        db: Session,
-        score: int,
-        student_id: int,
-        question_id: int,
-        answer_id: int,
-        student_test_id: int
-):
-    student_test_answer = StudentTestAnswer(
-        score=score,
-        student_id=student_id,
-        question_id=question_id,
-        answer_id=answer_id,
-        student_test_id=student_test_id
+async def select_test_answer_key_db(db: AsyncSession, test_id: int):
+    answers = await db.execute(
+        select(
+            TestQuestion.id.label("question_id"),
+            TestQuestion.question_score,
+            TestAnswer.id.label("answer_id"),
+            TestAnswer.is_correct
+        )
+        .join(TestAnswer, TestAnswer.question_id == TestQuestion.id, isouter=True)
+        .filter(TestQuestion.test_lesson_id == test_id)
+        .order_by(TestQuestion.id, TestAnswer.id)
     )
-
-    db.add(student_test_answer)
-    db.commit()
-    db.refresh(student_test_answer)
+    matchings = await db.execute(
+        select(
+            TestMatchingLeft.question_id,
+            TestMatchingLeft.id.label("left_id"),
+            TestMatchingLeft.right_id
+        )
+        .join(TestQuestion, TestQuestion.id == TestMatchingLeft.question_id)
+        .filter(TestQuestion.test_lesson_id == test_id)
+        .order_by(TestMatchingLeft.id)
+    )
+    return answers.all(), matchings.all()
 
 
-def create_student_test_matching_db(
-        db: Session,
+async def create_student_test_results_db(
+        db: AsyncSession,
+        student_test: StudentTest,
         score: int,
-        student_id: int,
-        question_id: int,
-        left_option_id: int,
-        right_option_id: int,
-        student_test_id: int
+        answers: List[Dict],
+        matchings: List[Dict]
 ):
-    student_test_matching = StudentTestMatching(
-        score=score,
-        student_id=student_id,
-        question_id=question_id,
-        left_option_id=left_option_id,
-        right_option_id=right_option_id,
-        student_test_id=student_test_id
-    )
-
-    db.add(student_test_matching)
-    db.commit()
-    db.refresh(student_test_matching)
+    if answers:
+        await db.execute(insert(StudentTestAnswer), answers)
+    if matchings:
+        await db.execute(insert(StudentTestMatching), matchings)
 
-
-def select_count_correct_answers_db(db: Session, question_id: int):
-    count_correct_answers = db.query(TestAnswer).filter(
-        TestAnswer.question_id == question_id,
-        TestAnswer.is_correct == 1
-    ).count()
-    return count_correct_answers
-
-
-def select_correct_right_option_db(db: Session, left_option_id: int):
-    right_option = db.query(TestMatchingLeft.right_id.label("right_id")).filter(
-        TestMatchingLeft.id == left_option_id).first()
-    return right_option.right_id
+    student_test.score = score
+    await db.commit()
+    await db.refresh(student_test)
+    return student_test
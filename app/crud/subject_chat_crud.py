@@ -1,17 +1,19 @@
 from datetime import datetime
 from typing import Dict, List
 
-from sqlalchemy import desc, select
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import DateTime, and_, desc, literal, or_, select, tuple_, union
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from sqlalchemy.sql.expression import func
 
 from app.enums import MessageTypeOption, UserTypeOption
-from app.models import (Student, Subject, SubjectChat, SubjectChatAnswer, SubjectChatAttachFile, SubjectRecipient,
-                        SubjectTeacherAssociation, Teacher, User, UserType)
+from app.models import (Student, Subject, SubjectChat, SubjectChatAnswer, SubjectChatAttachFile, SubjectChatReadReceipt,
+                        SubjectRecipient, SubjectTeacherAssociation, Teacher, User, UserType)
 
 
-def select_students_for_subject_db(db: Session, subject_id: int):
-    students = db.query(
+async def select_students_for_subject_db(db: AsyncSession, subject_id: int):
+    result = await db.execute(select(
         User.id,
         User.is_active,
         User.username,
@@ -23,13 +25,14 @@ def select_students_for_subject_db(db: Session, subject_id: int):
         Student, Student.group_id == Subject.group_id).join(
         User, User.id == Student.user_id).join(
         UserType, UserType.id == User.user_type_id).filter(
-        Subject.id == subject_id).all()
+        Subject.id == subject_id))
+    students = result.all()
 
     return students
 
 
-def select_teachers_for_subject_db(db: Session, subject_id: int):
-    teachers = db.query(
+async def select_teachers_for_subject_db(db: AsyncSession, subject_id: int):
+    result = await db.execute(select(
         User.id,
         User.is_active,
         User.username,
@@ -42,13 +45,14 @@ def select_teachers_for_subject_db(db: Session, subject_id: int):
         Teacher, Teacher.id == SubjectTeacherAssociation.teacher_id).join(
         User, User.id == Teacher.user_id).join(
         UserType, UserType.id == User.user_type_id).filter(
-        Subject.id == subject_id).all()
+        Subject.id == subject_id))
+    teachers = result.all()
 
     return teachers
 
 
-def create_subject_chat_message(
-        db: Session,
+async def create_subject_chat_message(
+        db: AsyncSession,
         message: str,
         fixed: bool,
         sender_id: int,
@@ -68,13 +72,13 @@ def create_subject_chat_message(
     )
 
     db.add(new_message)
-    db.commit()
-    db.refresh(new_message)
+    await db.commit()
+    await db.refresh(new_message)
     return new_message
 
 
-def create_subject_chat_answer(
-        db: Session,
+async def create_subject_chat_answer(
+        db: AsyncSession,
         message: str,
         subject_chat_id: int,
         sender_id: int,
@@ -90,13 +94,13 @@ def create_subject_chat_answer(
     )
 
     db.add(new_answer)
-    db.commit()
-    db.refresh(new_answer)
+    await db.commit()
+    await db.refresh(new_answer)
     return new_answer
 
 
-def create_subject_attach_file_db(
-    db: Session,
+async def create_subject_attach_file_db(
+    db: AsyncSession,
     attach_files: List[Dict[str, str]],
     subject_chat_answer: int = None,
     subject_chat_message: int = None
@@ -127,14 +131,14 @@ def create_subject_attach_file_db(
         db.add(attach_file_obj)
         attach_file_objs.append(attach_file_obj)
 
-    db.commit()
+    await db.commit()
 
     for attach_file_obj in attach_file_objs:
-        db.refresh(attach_file_obj)
+        await db.refresh(attach_file_obj)
 
 
-def create_subject_recipient_db(
-        db: Session,
+async def create_subject_recipient_db(
+        db: AsyncSession,
         subject_chat_id: int,
         recipient: List[int] or int
 ):
@@ -145,8 +149,8 @@ def create_subject_recipient_db(
                 recipient_id=recip
             )
             db.add(rec_obj)
-            db.commit()
-            db.refresh(rec_obj)
+            await db.commit()
+            await db.refresh(rec_obj)
         return
 
     else:
@@ -155,253 +159,366 @@ def create_subject_recipient_db(
             recipient_id=recipient
         )
         db.add(recipient_obj)
-        db.commit()
-        db.refresh(recipient_obj)
+        await db.commit()
+        await db.refresh(recipient_obj)
         return
 
 
-def get_last_messages_for_subject_chat_db(
-        db: Session,
+def select_visible_messages_query(
         subject_id: int,
         recipient_id: int,
-        limit: int = 10
+        last_message_id: int | None,
+        limit: int
 ):
-
-    query_everyone = db.query(SubjectChat)\
+    cursor = []
+    if last_message_id is not None:
+        last_datetime = select(SubjectChat.datetime_message).filter(SubjectChat.id == last_message_id).scalar_subquery()
+        cursor.append(or_(
+            tuple_(SubjectChat.datetime_message, SubjectChat.id) < tuple_(last_datetime, last_message_id),
+            and_(last_datetime.is_(None), SubjectChat.id < last_message_id)
+        ))
+
+    query_everyone = select(SubjectChat.id, SubjectChat.datetime_message)\
         .filter(SubjectChat.subject_id == subject_id)\
         .filter(SubjectChat.message_type == "everyone")\
-        .order_by(desc(SubjectChat.datetime_message))\
-        .limit(limit)\
-        .options(joinedload(SubjectChat.subject_chat_answer))\
-        .options(joinedload(SubjectChat.attach_file))
-    messages_everyone = query_everyone.all()
+        .filter(*cursor)
 
-    query_personal = db.query(SubjectChat)\
+    query_personal = select(SubjectChat.id, SubjectChat.datetime_message)\
         .join(SubjectRecipient, SubjectChat.id == SubjectRecipient.subject_chat_id)\
         .filter(SubjectChat.subject_id == subject_id)\
         .filter(SubjectRecipient.recipient_id == recipient_id)\
         .filter(SubjectChat.message_type.in_(["alone", "several"]))\
-        .order_by(desc(SubjectChat.datetime_message))\
-        .limit(limit)\
-        .options(joinedload(SubjectChat.subject_chat_answer))\
-        .options(joinedload(SubjectChat.attach_file))
-    messages_personal = query_personal.all()
-
-    query_sent_personal = db.query(SubjectChat) \
-        .filter(SubjectChat.subject_id == subject_id) \
-        .filter(SubjectChat.sender_id == recipient_id) \
-        .filter(SubjectChat.message_type.in_(["alone", "several"])) \
-        .order_by(desc(SubjectChat.datetime_message)) \
-        .limit(limit) \
-        .options(joinedload(SubjectChat.subject_chat_answer)) \
-        .options(joinedload(SubjectChat.attach_file))
-    messages_sent_personal = query_sent_personal.all()
-
-    all_messages = messages_everyone + messages_personal + messages_sent_personal
-    all_messages.sort(key=lambda x: x.datetime_message, reverse=True)
-    selected_messages = all_messages[:limit]
-
-    return selected_messages
-
-
-def get_messages_for_subject_chat_by_pagination_db(
-        db: Session,
+        .filter(*cursor)
+
+    query_sent_personal = select(SubjectChat.id, SubjectChat.datetime_message)\
+        .filter(SubjectChat.subject_id == subject_id)\
+        .filter(SubjectChat.sender_id == recipient_id)\
+        .filter(SubjectChat.message_type.in_(["alone", "several"]))\
+        .filter(*cursor)
+
+    branches = [
+        select(query.order_by(desc(SubjectChat.datetime_message), desc(SubjectChat.id)).limit(limit).subquery())
+        for query in (query_everyone, query_personal, query_sent_personal)
+    ]
+    return union(*branches).subquery()
+
+
+async def get_last_messages_for_subject_chat_db(
+        db: AsyncSession,
         subject_id: int,
         recipient_id: int,
-        last_message_id: int,
         limit: int = 10
 ):
-    query_everyone = db.query(SubjectChat) \
-        .filter(SubjectChat.subject_id == subject_id) \
-        .filter(SubjectChat.message_type == "everyone") \
-        .filter(SubjectChat.id < last_message_id) \
-        .order_by(desc(SubjectChat.datetime_message)) \
-        .limit(limit) \
-        .options(joinedload(SubjectChat.subject_chat_answer)) \
-        .options(joinedload(SubjectChat.attach_file))
-    messages_everyone = query_everyone.all()
-
-    query_personal = db.query(SubjectChat) \
-        .join(SubjectRecipient, SubjectChat.id == SubjectRecipient.subject_chat_id) \
-        .filter(SubjectChat.subject_id == subject_id) \
-        .filter(SubjectRecipient.recipient_id == recipient_id) \
-        .filter(SubjectChat.id < last_message_id) \
-        .filter(SubjectChat.message_type.in_(["alone", "several"])) \
-        .order_by(desc(SubjectChat.datetime_message)) \
-        .limit(limit) \
-        .options(joinedload(SubjectChat.subject_chat_answer)) \
-        .options(joinedload(SubjectChat.attach_file))
-    messages_personal = query_personal.all()
-
-    query_sent_personal = db.query(SubjectChat) \
-        .filter(SubjectChat.subject_id == subject_id) \
-        .filter(SubjectChat.sender_id == recipient_id) \
-        .filter(SubjectChat.message_type.in_(["alone", "several"])) \
-        .filter(SubjectChat.id < last_message_id) \
-        .order_by(desc(SubjectChat.datetime_message)) \
-        .limit(limit) \
-        .options(joinedload(SubjectChat.subject_chat_answer)) \
-        .options(joinedload(SubjectChat.attach_file))
-    messages_sent_personal = query_sent_personal.all()
-
-    all_messages = messages_everyone + messages_personal + messages_sent_personal
-    all_messages.sort(key=lambda x: x.datetime_message, reverse=True)
-    selected_messages = all_messages[:limit]
-
-    return selected_messages
-
-
-def select_message_by_id_db(db: Session, message_id: int):
-    return db.query(SubjectChat).filter(SubjectChat.id == message_id).first()
-
-
-def select_answer_by_id_db(db: Session, answer_id: int):
-    return db.query(SubjectChatAnswer).filter(SubjectChatAnswer.id == answer_id).first()
-
-
-def select_recipient_by_message_id(db: Session, message_id: int):
-    return db.query(SubjectRecipient).filter(SubjectRecipient.subject_chat_id == message_id).all()
-
-
-def select_last_message_db(db: Session, subject_id: int, sender_id: int):
+    return await get_messages_for_subject_chat_by_pagination_db(
+        db=db,
+        subject_id=subject_id,
+        recipient_id=recipient_id,
+        last_message_id=None,
+        limit=limit
+    )
+
+
+async def get_messages_for_subject_chat_by_pagination_db(
+        db: AsyncSession,
+        subject_id: int,
+        recipient_id: int,
+        last_message_id: int | None,
+        limit: int = 10
+):
+    visible = select_visible_messages_query(
+        subject_id=subject_id,
+        recipient_id=recipient_id,
+        last_message_id=last_message_id,
+        limit=limit
+    )
+
+    result = await db.execute(
+        select(SubjectChat)
+        .join(visible, visible.c.id == SubjectChat.id)
+        .order_by(desc(SubjectChat.datetime_message), desc(SubjectChat.id))
+        .limit(limit)
+        .options(selectinload(SubjectChat.subject_chat_answer).selectinload(SubjectChatAnswer.attach_file))
+        .options(selectinload(SubjectChat.subject_chat_answer).selectinload(SubjectChatAnswer.read_receipt))
+        .options(selectinload(SubjectChat.attach_file), selectinload(SubjectChat.read_receipt))
+    )
+    return result.scalars().all()
+
+
+async def select_message_by_id_db(db: AsyncSession, message_id: int):
+    result = await db.execute(
+        select(SubjectChat)
+        .options(
+            selectinload(SubjectChat.subject_chat_answer).selectinload(SubjectChatAnswer.attach_file),
+            selectinload(SubjectChat.subject_chat_answer).selectinload(SubjectChatAnswer.read_receipt),
+            selectinload(SubjectChat.attach_file),
+            selectinload(SubjectChat.subject_recipient),
+            selectinload(SubjectChat.read_receipt)
+        )
+        .filter(SubjectChat.id == message_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+async def select_answer_by_id_db(db: AsyncSession, answer_id: int):
+    result = await db.execute(
+        select(SubjectChatAnswer)
+        .options(
+            selectinload(SubjectChatAnswer.attach_file),
+            selectinload(SubjectChatAnswer.read_receipt),
+            selectinload(SubjectChatAnswer.subject_chat).selectinload(SubjectChat.subject_recipient)
+        )
+        .filter(SubjectChatAnswer.id == answer_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
+async def select_recipient_by_message_id(db: AsyncSession, message_id: int):
+    result = await db.execute(select(SubjectRecipient).filter(SubjectRecipient.subject_chat_id == message_id))
+    return result.scalars().all()
+
+
+async def select_last_message_db(db: AsyncSession, subject_id: int, sender_id: int):
     subquery = select(SubjectChat.id).filter(
         SubjectChat.sender_id == sender_id,
         SubjectChat.subject_id == subject_id
     )
 
-    message_obj = db.query(
-        SubjectChat.id,
-        SubjectChat.message,
-        SubjectChat.datetime_message,
-        SubjectChat.fixed,
-        SubjectChat.message_type,
-        SubjectChat.subject_id,
-        SubjectChat.sender_id,
-        SubjectChat.sender_type,
-        SubjectChat.read_by,
-        func.group_concat(SubjectChatAttachFile.id).label("fileIds"),
-        func.group_concat(SubjectChatAttachFile.file_path).label("filePaths"),
-        func.group_concat(SubjectChatAttachFile.mime_type).label("mimeTypes"),
-        func.group_concat(SubjectChatAttachFile.filename).label("fileNames"),
-        func.group_concat(SubjectChatAttachFile.size).label("fileSizes")
-    ) \
-        .join(SubjectChatAttachFile, SubjectChatAttachFile.chat_message == SubjectChat.id, isouter=True) \
-        .filter(SubjectChat.id.in_(subquery.scalar_subquery())) \
+    result = await db.execute(
+        select(
+            SubjectChat.id,
+            SubjectChat.message,
+            SubjectChat.datetime_message,
+            SubjectChat.fixed,
+            SubjectChat.message_type,
+            SubjectChat.subject_id,
+            SubjectChat.sender_id,
+            SubjectChat.sender_type,
+            SubjectChat.deleted,
+            func.group_concat(SubjectChatAttachFile.id).label("fileIds"),
+            func.group_concat(SubjectChatAttachFile.file_path).label("filePaths"),
+            func.group_concat(SubjectChatAttachFile.mime_type).label("mimeTypes"),
+            func.group_concat(SubjectChatAttachFile.filename).label("fileNames"),
+            func.group_concat(SubjectChatAttachFile.size).label("fileSizes")
+        )
+        .join(SubjectChatAttachFile, SubjectChatAttachFile.chat_message == SubjectChat.id, isouter=True)
+        .filter(SubjectChat.id.in_(subquery.scalar_subquery()))
         .group_by(
-        SubjectChat.id,
-        SubjectChat.message,
-        SubjectChat.datetime_message,
-        SubjectChat.fixed,
-        SubjectChat.message_type,
-        SubjectChat.subject_id,
-        SubjectChat.sender_id,
-        SubjectChat.sender_type
-    ) \
-        .order_by(desc(SubjectChat.datetime_message)) \
-        .limit(1) \
-        .first()
-
-    return message_obj
-
-
-def select_last_answer_db(db: Session, sender_id: int):
+            SubjectChat.id,
+            SubjectChat.message,
+            SubjectChat.datetime_message,
+            SubjectChat.fixed,
+            SubjectChat.message_type,
+            SubjectChat.subject_id,
+            SubjectChat.sender_id,
+            SubjectChat.sender_type
+        )
+        .order_by(desc(SubjectChat.datetime_message))
+        .limit(1)
+    )
+
+    return result.first()
+
+
+async def select_last_answer_db(db: AsyncSession, sender_id: int):
     subquery = select(SubjectChatAnswer.id).filter(SubjectChatAnswer.sender_id == sender_id)
 
-    answer_obj = db.query(
-        SubjectChatAnswer,
-        func.group_concat(SubjectChatAttachFile.id).label("fileIds"),
-        func.group_concat(SubjectChatAttachFile.file_path).label("filePaths"),
-        func.group_concat(SubjectChatAttachFile.mime_type).label("mimeTypes"),
-        func.group_concat(SubjectChatAttachFile.filename).label("fileNames"),
-        func.group_concat(SubjectChatAttachFile.size).label("fileSizes")
-    ) \
-        .join(SubjectChatAttachFile, SubjectChatAttachFile.chat_answer == SubjectChatAnswer.id, isouter=True) \
-        .filter(SubjectChatAnswer.id.in_(subquery.scalar_subquery())) \
-        .group_by(SubjectChatAnswer.id) \
-        .order_by(desc(SubjectChatAnswer.datetime_message)) \
-        .limit(1) \
-        .first()
-
-    return answer_obj
-
-
-def update_read_by_for_message_db(db: Session, message_id: int, user_id: int):
-    message = db.query(SubjectChat).filter(SubjectChat.id == message_id).first()
-    if message.read_by is not None:
-        read_by_list = list(map(int, message.read_by.split(", ")))
-        read_by_list.append(user_id)
-        read_by_str = ", ".join(map(str, read_by_list))
-        message.read_by = read_by_str
-        db.commit()
-        db.refresh(message)
-        return message
-    message.read_by = str(user_id)
-    db.commit()
-    db.refresh(message)
-    return message
+    result = await db.execute(
+        select(
+            SubjectChatAnswer,
+            func.group_concat(SubjectChatAttachFile.id).label("fileIds"),
+            func.group_concat(SubjectChatAttachFile.file_path).label("filePaths"),
+            func.group_concat(SubjectChatAttachFile.mime_type).label("mimeTypes"),
+            func.group_concat(SubjectChatAttachFile.filename).label("fileNames"),
+            func.group_concat(SubjectChatAttachFile.size).label("fileSizes")
+        )
+        .join(SubjectChatAttachFile, SubjectChatAttachFile.chat_answer == SubjectChatAnswer.id, isouter=True)
+        .filter(SubjectChatAnswer.id.in_(subquery.scalar_subquery()))
+        .group_by(SubjectChatAnswer.id)
+        .order_by(desc(SubjectChatAnswer.datetime_message))
+        .limit(1)
+    )
 
+    return result.first()
 
-def update_read_by_for_answer_db(db: Session, answer_id: int, user_id: int):
-    answer = db.query(SubjectChatAnswer).filter(SubjectChatAnswer.id == answer_id).first()
-    if answer.read_by is not None:
-        read_by_list = list(map(int, answer.read_by.split(", ")))
-        read_by_list.append(user_id)
-        read_by_str = ", ".join(map(str, read_by_list))
-        answer.read_by = read_by_str
-        db.commit()
-        db.refresh(answer)
-        return answer
-    answer.read_by = str(user_id)
-    db.commit()
-    db.refresh(answer)
-    return answer
+
+def visible_message_filter(user_id: int):
+    return or_(
+        SubjectChat.message_type == "everyone",
+        SubjectChat.sender_id == user_id,
+        SubjectChat.id.in_(select(SubjectRecipient.subject_chat_id).filter(SubjectRecipient.recipient_id == user_id))
+    )
+
+
+async def select_read_receipt_users_db(db: AsyncSession, message_id: int = None, answer_id: int = None):
+    query = select(SubjectChatReadReceipt.user_id).order_by(SubjectChatReadReceipt.id)
+    if message_id is not None:
+        query = query.filter(SubjectChatReadReceipt.subject_chat_id == message_id)
+    else:
+        query = query.filter(SubjectChatReadReceipt.subject_chat_answer_id == answer_id)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+def insert_read_receipts(db: AsyncSession, columns: List[str], rows):
+    dialect = db.bind.dialect.name
+    if dialect == "mysql":
+        return mysql.insert(SubjectChatReadReceipt).from_select(columns, rows).prefix_with("IGNORE")
+    insert_receipts = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    return insert_receipts(SubjectChatReadReceipt).from_select(columns, rows).on_conflict_do_nothing()
+
+
+async def create_read_receipt_db(db: AsyncSession, user_id: int, message_id: int = None, answer_id: int = None):
+    read_at = literal(datetime.utcnow(), DateTime)
+    if message_id is not None:
+        column = "subject_chat_id"
+        rows = select(literal(user_id), SubjectChat.id, read_at).filter(SubjectChat.id == message_id)
+    else:
+        column = "subject_chat_answer_id"
+        rows = select(literal(user_id), SubjectChatAnswer.id, read_at).filter(SubjectChatAnswer.id == answer_id)
+
+    result = await db.execute(rows.with_only_columns(rows.selected_columns[1]))
+    if result.scalar() is None:
+        return False
+
+    await db.execute(insert_read_receipts(db, ["user_id", column, "read_at"], rows))
+    await db.commit()
+    return True
+
+
+async def create_message_read_receipt_db(db: AsyncSession, message_id: int, user_id: int):
+    if not await create_read_receipt_db(db=db, user_id=user_id, message_id=message_id):
+        return None
+    read_by = await select_read_receipt_users_db(db=db, message_id=message_id)
+    return {"messageId": message_id, "readBy": read_by}
+
+
+async def create_answer_read_receipt_db(db: AsyncSession, answer_id: int, user_id: int):
+    if not await create_read_receipt_db(db=db, user_id=user_id, answer_id=answer_id):
+        return None
+    read_by = await select_read_receipt_users_db(db=db, answer_id=answer_id)
+    return {"answerId": answer_id, "readBy": read_by}
+
+
+async def mark_messages_read_db(db: AsyncSession, subject_id: int, user_id: int, last_message_id: int):
+    last_datetime = select(SubjectChat.datetime_message).filter(SubjectChat.id == last_message_id).scalar_subquery()
+    read_at = literal(datetime.utcnow(), DateTime)
+
+    messages = select(SubjectChat.id)\
+        .filter(SubjectChat.subject_id == subject_id)\
+        .filter(visible_message_filter(user_id))\
+        .filter(tuple_(SubjectChat.datetime_message, SubjectChat.id) <= tuple_(last_datetime, last_message_id))
+
+    message_receipt = select(SubjectChatReadReceipt.id)\
+        .filter(SubjectChatReadReceipt.user_id == user_id)\
+        .filter(SubjectChatReadReceipt.subject_chat_id == SubjectChat.id)\
+        .exists()
+    answer_receipt = select(SubjectChatReadReceipt.id)\
+        .filter(SubjectChatReadReceipt.user_id == user_id)\
+        .filter(SubjectChatReadReceipt.subject_chat_answer_id == SubjectChatAnswer.id)\
+        .exists()
+
+    await db.execute(
+        insert_read_receipts(
+            db,
+            ["user_id", "subject_chat_id", "read_at"],
+            select(literal(user_id), SubjectChat.id, read_at)
+            .filter(SubjectChat.id.in_(messages))
+            .filter(SubjectChat.sender_id != user_id)
+            .filter(~message_receipt)
+        )
+    )
+    await db.execute(
+        insert_read_receipts(
+            db,
+            ["user_id", "subject_chat_answer_id", "read_at"],
+            select(literal(user_id), SubjectChatAnswer.id, read_at)
+            .filter(SubjectChatAnswer.subject_chat_id.in_(messages))
+            .filter(SubjectChatAnswer.sender_id != user_id)
+            .filter(~answer_receipt)
+        )
+    )
+    await db.commit()
+
+
+async def select_unread_count_db(db: AsyncSession, subject_id: int, user_id: int):
+    message_receipt = select(SubjectChatReadReceipt.id)\
+        .filter(SubjectChatReadReceipt.user_id == user_id)\
+        .filter(SubjectChatReadReceipt.subject_chat_id == SubjectChat.id)\
+        .exists()
+    answer_receipt = select(SubjectChatReadReceipt.id)\
+        .filter(SubjectChatReadReceipt.user_id == user_id)\
+        .filter(SubjectChatReadReceipt.subject_chat_answer_id == SubjectChatAnswer.id)\
+        .exists()
+
+    messages = await db.execute(
+        select(func.count(SubjectChat.id))
+        .filter(SubjectChat.subject_id == subject_id)
+        .filter(visible_message_filter(user_id))
+        .filter(SubjectChat.sender_id != user_id)
+        .filter(SubjectChat.deleted.isnot(True))
+        .filter(~message_receipt)
+    )
+    answers = await db.execute(
+        select(func.count(SubjectChatAnswer.id))
+        .join(SubjectChat, SubjectChat.id == SubjectChatAnswer.subject_chat_id)
+        .filter(SubjectChat.subject_id == subject_id)
+        .filter(visible_message_filter(user_id))
+        .filter(SubjectChatAnswer.sender_id != user_id)
+        .filter(SubjectChatAnswer.deleted.isnot(True))
+        .filter(~answer_receipt)
+    )
+    return {"unreadMessages": messages.scalar(), "unreadAnswers": answers.scalar()}
 
 
-def delete_attached_file_db(db: Session, file_id: int):
-    attach_file = db.query(SubjectChatAttachFile).filter(SubjectChatAttachFile.id == file_id).first()
-    db.delete(attach_file)
-    db.commit()
+async def delete_attached_file_db(db: AsyncSession, file_id: int):
+    result = await db.execute(select(SubjectChatAttachFile).filter(SubjectChatAttachFile.id == file_id))
+    attach_file = result.scalars().first()
+    await db.delete(attach_file)
+    await db.commit()
 
 
-def update_message_text_and_fixed_db(db: Session, new_text: str, fixed: bool, message: SubjectChat):
+async def update_message_text_and_fixed_db(db: AsyncSession, new_text: str, fixed: bool, message: SubjectChat):
     message.message = new_text
     message.fixed = fixed
-    db.commit()
-    db.refresh(message)
+    await db.commit()
+    await db.refresh(message)
     return message
 
 
-def update_message_type_and_recipient_db(db: Session, message_type: MessageTypeOption,
-                                         recipients: List[int], message: SubjectChat):
-    db_recipients = db.query(SubjectRecipient).filter(SubjectRecipient.subject_chat_id == message.id).all()
+async def update_message_type_and_recipient_db(db: AsyncSession, message_type: MessageTypeOption,
+                                               recipients: List[int], message: SubjectChat):
+    result = await db.execute(select(SubjectRecipient).filter(SubjectRecipient.subject_chat_id == message.id))
+    db_recipients = result.scalars().all()
     for recipient in db_recipients:
-        db.delete(recipient)
-        db.commit()
+        await db.delete(recipient)
+        await db.commit()
 
     message.message_type = message_type
-    db.commit()
-    db.refresh(message)
+    await db.commit()
+    await db.refresh(message)
 
-    create_subject_recipient_db(db=db, subject_chat_id=message.id, recipient=recipients)
+    await create_subject_recipient_db(db=db, subject_chat_id=message.id, recipient=recipients)
     return message
 
 
-def update_answer_text_db(db: Session, answer_text: str, answer: SubjectChatAnswer):
+async def update_answer_text_db(db: AsyncSession, answer_text: str, answer: SubjectChatAnswer):
     answer.message = answer_text
-    db.commit()
-    db.refresh(answer)
+    await db.commit()
+    await db.refresh(answer)
     return answer
 
 
-def delete_message_db(db: Session, message: SubjectChat):
+async def delete_message_db(db: AsyncSession, message: SubjectChat):
     message.deleted = True
-    db.commit()
-    db.refresh(message)
+    await db.commit()
+    await db.refresh(message)
     return message
 
 
-def delete_answer_db(db: Session, answer: SubjectChatAnswer):
+async def delete_answer_db(db: AsyncSession, answer: SubjectChatAnswer):
     answer.deleted = True
-    db.commit()
-    db.refresh(answer)
+    await db.commit()
+    await db.refresh(answer)
     return answer
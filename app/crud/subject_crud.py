@@ -1,12 +1,12 @@
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import (Group, Lecture, Lesson, ParticipantComment, StudentAdditionalSubject, Subject, SubjectIcon,
-                        SubjectItem, SubjectJournal, SubjectTeacherAssociation, Teacher, TestLesson, User)
+from app.models import (Group, ParticipantComment, StudentAdditionalSubject, Subject, SubjectIcon, SubjectItem,
+                        SubjectTeacherAssociation, Teacher, User)
 from app.schemas.subject_schemas import SubjectCreate, SubjectUpdate
 
 
-def create_new_subject_db(db: Session, subject: SubjectCreate):
+async def create_new_subject_db(db: AsyncSession, subject: SubjectCreate):
     is_published = subject.is_published if subject.is_published is not None else False
     exam_date = subject.exam_date if subject.exam_date is not None else None
 
@@ -26,24 +26,24 @@ def create_new_subject_db(db: Session, subject: SubjectCreate):
     )
 
     db.add(new_subject)
-    db.commit()
-    db.refresh(new_subject)
+    await db.commit()
+    await db.refresh(new_subject)
     return new_subject
 
 
-def create_subject_item_db(db: Session, subject_id: int, item: str):
+async def create_subject_item_db(db: AsyncSession, subject_id: int, item: str):
     new_item = SubjectItem(
         text=item,
         subject_id=subject_id
     )
     db.add(new_item)
-    db.commit()
-    db.refresh(new_item)
+    await db.commit()
+    await db.refresh(new_item)
     return new_item
 
 
-def create_subject_icon_db(
-        db: Session,
+async def create_subject_icon_db(
+        db: AsyncSession,
         subject_id: int | None,
         is_default: bool,
         icon_path: str
@@ -55,39 +55,33 @@ def create_subject_icon_db(
     )
 
     db.add(new_icon)
-    db.commit()
-    db.refresh(new_icon)
+    await db.commit()
+    await db.refresh(new_icon)
     return new_icon
 
 
-def select_all_subjects_db(db: Session):
-    return db.query(Subject).all()
+async def select_all_subjects_db(db: AsyncSession):
+    result = await db.execute(select(Subject))
+    return result.scalars().all()
 
 
-def select_subject_by_id_db(db: Session, subject_id: int):
-    return db.query(Subject).filter(Subject.id == subject_id).first()
+async def select_subject_by_id_db(db: AsyncSession, subject_id: int):
+    result = await db.execute(select(Subject).filter(Subject.id == subject_id))
+    return result.scalars().first()
 
 
-def select_subjects_by_specialization_db(db: Session, specialization_id: int):
-    return db.query(Subject).filter(Subject.specialization_id == specialization_id).all()
+async def select_subjects_by_specialization_db(db: AsyncSession, specialization_id: int):
+    result = await db.execute(select(Subject).filter(Subject.specialization_id == specialization_id))
+    return result.scalars().all()
 
 
-def select_subjects_by_course_db(db: Session, course_id: int):
-    return db.query(Subject).filter(Subject.course_id == course_id).all()
+async def select_subjects_by_course_db(db: AsyncSession, course_id: int):
+    result = await db.execute(select(Subject).filter(Subject.course_id == course_id))
+    return result.scalars().all()
 
 
-def select_subject_by_group_id_db(db: Session, group_id: int):
-    query = db.query(
-        Subject.id.label("subject_id"),
-        Subject.title.label("subject_title")
-    )\
-        .join(Group, Group.id == Subject.group_id)\
-        .filter(Group.id == group_id)
-    return query.all()
-
-
-def select_subjects_by_group_db(db: Session, group_name: str):
-    query = db.query(
+async def select_subjects_by_group_db(db: AsyncSession, group_name: str):
+    query = select(
         Subject.id,
         Subject.title,
         Subject.image_path
@@ -95,22 +89,23 @@ def select_subjects_by_group_db(db: Session, group_name: str):
         .join(Group, Group.specialization_id == Subject.specialization_id)\
         .filter(Group.group_name == group_name)
 
-    return query.all()
+    result = await db.execute(query)
+    return result.all()
 
 
-def update_subject_image_path_db(db: Session, subject: Subject, new_path: str):
+async def update_subject_image_path_db(db: AsyncSession, subject: Subject, new_path: str):
     subject.image_path = new_path
-    db.commit()
-    db.refresh(subject)
+    await db.commit()
+    await db.refresh(subject)
 
 
-def update_subject_logo_path_db(db: Session, subject: Subject, new_path: str):
+async def update_subject_logo_path_db(db: AsyncSession, subject: Subject, new_path: str):
     subject.logo_path = new_path
-    db.commit()
-    db.refresh(subject)
+    await db.commit()
+    await db.refresh(subject)
 
 
-def update_subject_info_db(db: Session, subject: Subject, subject_data: SubjectUpdate):
+async def update_subject_info_db(db: AsyncSession, subject: Subject, subject_data: SubjectUpdate):
     if subject_data.is_published is None:
         subject_data.is_published = True
 
@@ -118,42 +113,51 @@ def update_subject_info_db(db: Session, subject: Subject, subject_data: SubjectU
         if value is not None:
             setattr(subject, field, value)
 
-    db.commit()
-    db.refresh(subject)
+    await db.commit()
+    await db.refresh(subject)
     return subject
 
 
-def update_subject_item_text_db(db: Session, subject_item: SubjectItem, text: str):
+async def update_subject_item_text_db(db: AsyncSession, subject_item: SubjectItem, text: str):
     subject_item.text = text
-    db.commit()
-    db.refresh(subject_item)
+    await db.commit()
+    await db.refresh(subject_item)
     return subject_item
 
 
-def delete_subject_db(db: Session, subject: Subject):
-    db.delete(subject)
-    db.commit()
+async def delete_subject_db(db: AsyncSession, subject: Subject):
+    await db.delete(subject)
+    await db.commit()
 
 
-def set_teacher_for_subject_db(db: Session, teacher_id: int, subject_id: int):
+async def set_teacher_for_subject_db(db: AsyncSession, teacher_id: int, subject_id: int):
     new_association = SubjectTeacherAssociation(
         teacher_id=teacher_id,
         subject_id=subject_id
     )
 
     db.add(new_association)
-    db.commit()
-    db.refresh(new_association)
+    await db.commit()
+    await db.refresh(new_association)
+
+
+async def select_teacher_subject_ids_db(db: AsyncSession, teacher_id: int):
+    result = await db.execute(
+        select(SubjectTeacherAssociation.subject_id).filter(SubjectTeacherAssociation.teacher_id == teacher_id)
+    )
+    return result.scalars().all()
 
 
-def select_teachers_for_subject_db(db: Session, subject_id: int):
-    teachers = db.query(
-        Teacher.id, Teacher.name, Teacher.surname,
-        Teacher.email, Teacher.image_path, User.last_active) \
-        .join(SubjectTeacherAssociation, SubjectTeacherAssociation.teacher_id == Teacher.id) \
-        .join(User, Teacher.user_id == User.id) \
-        .filter(SubjectTeacherAssociation.subject_id == subject_id) \
-        .all()
+async def select_teachers_for_subject_db(db: AsyncSession, subject_id: int):
+    result = await db.execute(
+        select(
+            Teacher.id, Teacher.name, Teacher.surname,
+            Teacher.email, Teacher.image_path, User.last_active)
+        .join(SubjectTeacherAssociation, SubjectTeacherAssociation.teacher_id == Teacher.id)
+        .join(User, Teacher.user_id == User.id)
+        .filter(SubjectTeacherAssociation.subject_id == subject_id)
+    )
+    teachers = result.all()
 
     teachers_list = []
 
@@ -171,75 +175,83 @@ def select_teachers_for_subject_db(db: Session, subject_id: int):
     return teachers_list
 
 
-def sign_student_for_addition_subject_db(db: Session, subject_id: int, student_id: int):
+async def sign_student_for_addition_subject_db(db: AsyncSession, subject_id: int, student_id: int):
     student_addition_subject = StudentAdditionalSubject(
         subject_id=subject_id,
         student_id=student_id
     )
 
     db.add(student_addition_subject)
-    db.commit()
-    db.refresh(student_addition_subject)
+    await db.commit()
+    await db.refresh(student_addition_subject)
     return student_addition_subject
 
 
-def select_dop_subjects(db: Session, student_id: int):
-    subjects = db.query(
-        Subject.id,
-        Subject.title,
-        Subject.image_path
-    )\
-        .join(StudentAdditionalSubject, StudentAdditionalSubject.subject_id == Subject.id)\
-        .filter(StudentAdditionalSubject.student_id == student_id)\
-        .all()
+async def select_dop_subjects(db: AsyncSession, student_id: int):
+    result = await db.execute(
+        select(
+            Subject.id,
+            Subject.title,
+            Subject.image_path
+        )
+        .join(StudentAdditionalSubject, StudentAdditionalSubject.subject_id == Subject.id)
+        .filter(StudentAdditionalSubject.student_id == student_id)
+    )
 
-    return subjects
+    return result.all()
 
 
-def select_subject_exam_date(db: Session, subject_id: int):
-    exam_date = db.query(Subject.exam_date).filter(Subject.id == subject_id).scalar()
+async def select_subject_exam_date(db: AsyncSession, subject_id: int):
+    result = await db.execute(select(Subject.exam_date).filter(Subject.id == subject_id))
+    exam_date = result.scalar()
     return exam_date.strftime('%Y-%m-%d')
 
 
-def select_subject_item_db(db: Session, subject_id: int):
-    return db.query(SubjectItem).filter(SubjectItem.subject_id == subject_id).first()
+async def select_subject_item_db(db: AsyncSession, subject_id: int):
+    result = await db.execute(select(SubjectItem).filter(SubjectItem.subject_id == subject_id))
+    return result.scalars().first()
 
 
-def select_subject_icons_db(db: Session, subject_id: int):
-    icons = db.query(SubjectIcon).filter(
-        or_(
-            SubjectIcon.is_default,
-            SubjectIcon.subject_id == subject_id
+async def select_subject_icons_db(db: AsyncSession, subject_id: int):
+    result = await db.execute(
+        select(SubjectIcon).filter(
+            or_(
+                SubjectIcon.is_default,
+                SubjectIcon.subject_id == subject_id
+            )
         )
-    ).all()
+    )
 
-    return icons
+    return result.scalars().all()
 
 
-def select_subject_icon_db(db: Session, icon_path: str):
-    icon = db.query(SubjectIcon).filter(SubjectIcon.icon_path == icon_path).first()
-    return icon
+async def select_subject_icon_db(db: AsyncSession, icon_path: str):
+    result = await db.execute(select(SubjectIcon).filter(SubjectIcon.icon_path == icon_path))
+    return result.scalars().first()
 
 
-def delete_subject_icon_db(db: Session, subject_icon: SubjectIcon):
-    db.delete(subject_icon)
-    db.commit()
+async def delete_subject_icon_db(db: AsyncSession, subject_icon: SubjectIcon):
+    await db.delete(subject_icon)
+    await db.commit()
 
 
-def create_or_update_participant_comment_db(
-        db: Session,
+async def create_or_update_participant_comment_db(
+        db: AsyncSession,
         subject_id: int,
         student_id: int,
         comment: str
 ):
-    part_comment = db.query(ParticipantComment).filter(
-        ParticipantComment.subject_id == subject_id,
-        ParticipantComment.student_id == student_id).first()
+    result = await db.execute(
+        select(ParticipantComment).filter(
+            ParticipantComment.subject_id == subject_id,
+            ParticipantComment.student_id == student_id)
+    )
+    part_comment = result.scalars().first()
 
     if part_comment:
         part_comment.comment = comment
-        db.commit()
-        db.refresh(part_comment)
+        await db.commit()
+        await db.refresh(part_comment)
         return part_comment
     else:
         new_comment = ParticipantComment(
@@ -248,69 +260,6 @@ def create_or_update_participant_comment_db(
             comment=comment
         )
         db.add(new_comment)
-        db.commit()
-        db.refresh(new_comment)
+        await db.commit()
+        await db.refresh(new_comment)
         return new_comment
-
-
-def select_lesson_id_and_subject_id_by_test_id_db(db: Session, test_id: int):
-    result = db.query(
-        Lesson.subject_id.label("subject_id"),
-        Lesson.id.label("lesson_id")
-    )\
-        .select_from(TestLesson)\
-        .join(Lesson, Lesson.id == TestLesson.lesson_id)\
-        .filter(TestLesson.id == test_id)\
-        .first()
-    return result
-
-
-def select_lesson_id_and_subject_id_by_lecture_id_db(db: Session, lecture_id: int):
-    result = db.query(
-        Lesson.subject_id.label("subject_id"),
-        Lesson.id.label("lesson_id")
-    )\
-        .select_from(Lecture)\
-        .join(Lesson, Lesson.id == Lecture.lesson_id)\
-        .filter(Lecture.id == lecture_id)\
-        .first()
-    return result
-
-
-def filling_journal(
-        db: Session,
-        subject_id: int,
-        lesson_id: int,
-        student_id: int,
-        score: int = None,
-        absent: int = None
-):
-    new_row = SubjectJournal(
-        score=score,
-        absent=absent,
-        subject_id=subject_id,
-        lesson_id=lesson_id,
-        student_id=student_id
-    )
-    db.add(new_row)
-    db.commit()
-    db.refresh(new_row)
-    return new_row
-
-
-def select_journal_row(db: Session, lesson_id: int, student_id: int, subject_id: int):
-    result = db.query(
-        SubjectJournal
-    ).filter(
-        SubjectJournal.lesson_id == lesson_id,
-        SubjectJournal.subject_id == subject_id,
-        SubjectJournal.student_id == student_id
-    ).first()
-    return result
-
-
-def update_score_to_journal(db: Session, journal_row: SubjectJournal, score: int):
-    journal_row.score = score
-    db.commit()
-    db.refresh(journal_row)
-    return journal_row
@@ -1,4 +1,6 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.models import SubjectInstruction, SubjectInstructionCategory, SubjectInstructionFiles, SubjectInstructionLink
 from app.schemas.subject_instruction_schemas import (SubjectInstructionAttachFile, SubjectInstructionAttachLink,
@@ -8,28 +10,27 @@ from app.utils.instruction import set_instruction, set_instruction_category, set
 from app.utils.save_images import delete_file
 
 
-def create_subject_instruction_category_db(
-        db: Session,
+async def create_subject_instruction_category_db(
+        db: AsyncSession,
         subject_category: SubjectInstructionCategoryCreate
 ):
     new_category = SubjectInstructionCategory(**subject_category.dict())
     db.add(new_category)
-    db.commit()
-    db.refresh(new_category)
+    await db.commit()
+    await db.refresh(new_category)
     return new_category
 
 
-def select_subject_instruction_category_db(db: Session, instruction_category_id: int):
-    res = db.query(
-        SubjectInstructionCategory
-    )\
-        .filter(SubjectInstructionCategory.id == instruction_category_id)\
-        .first()
-    return res
+async def select_subject_instruction_category_db(db: AsyncSession, instruction_category_id: int):
+    res = await db.execute(
+        select(SubjectInstructionCategory)
+        .filter(SubjectInstructionCategory.id == instruction_category_id)
+    )
+    return res.scalars().first()
 
 
-def update_subject_instruction_category_db(
-        db: Session,
+async def update_subject_instruction_category_db(
+        db: AsyncSession,
         instruction_category: SubjectInstructionCategory,
         instruction_category_data: SubjectInstructionCategoryUpdate
 ):
@@ -37,79 +38,78 @@ def update_subject_instruction_category_db(
         if value is not None:
             setattr(instruction_category, field, value)
 
-    db.commit()
-    db.refresh(instruction_category)
+    await db.commit()
+    await db.refresh(instruction_category)
     return instruction_category
 
 
-def create_subject_instruction_db(
-        db: Session,
+async def create_subject_instruction_db(
+        db: AsyncSession,
         instruction_data: SubjectInstructionCreate
 ):
     new_instruction = SubjectInstruction(**instruction_data.dict())
     db.add(new_instruction)
-    db.commit()
-    db.refresh(new_instruction)
+    await db.commit()
+    await db.refresh(new_instruction)
     return new_instruction
 
 
-def create_subject_instruction_file_db(
-        db: Session,
+async def create_subject_instruction_file_db(
+        db: AsyncSession,
         file_data: SubjectInstructionAttachFile
 ):
     new_instruction_file = SubjectInstructionFiles(**file_data.dict())
     db.add(new_instruction_file)
-    db.commit()
-    db.refresh(new_instruction_file)
+    await db.commit()
+    await db.refresh(new_instruction_file)
     return new_instruction_file
 
 
-def select_subject_instruction_db(instruction_id: int, db: Session):
-    instruction = db.query(SubjectInstruction).filter(SubjectInstruction.id == instruction_id).first()
+async def select_subject_instruction_db(instruction_id: int, db: AsyncSession):
+    result = await db.execute(select(SubjectInstruction).filter(SubjectInstruction.id == instruction_id))
+    instruction = result.scalars().first()
     return instruction
 
 
-def select_subject_instruction_file_db(db: Session, file_id: int):
-    instruction_file = db.query(
-        SubjectInstructionFiles
-    )\
-        .filter(SubjectInstructionFiles.id == file_id)\
-        .first()
+async def select_subject_instruction_file_db(db: AsyncSession, file_id: int):
+    result = await db.execute(select(SubjectInstructionFiles).filter(SubjectInstructionFiles.id == file_id))
+    instruction_file = result.scalars().first()
     return instruction_file
 
 
-def delete_subject_instruction_file_db(db: Session, file_path: str):
-    instruction_file = db.query(
-        SubjectInstructionFiles
-    )\
-        .filter(SubjectInstructionFiles.file_path == file_path)\
-        .first()
-    db.delete(instruction_file)
-    db.commit()
+async def delete_subject_instruction_file_db(db: AsyncSession, file_path: str):
+    result = await db.execute(select(SubjectInstructionFiles).filter(SubjectInstructionFiles.file_path == file_path))
+    instruction_file = result.scalars().first()
+    await db.delete(instruction_file)
+    await db.commit()
 
 
-def select_subject_instructions_db(subject_id: int, db: Session):
-    instruction_categories = (
-        db.query(
+async def select_subject_instructions_db(subject_id: int, db: AsyncSession):
+    categories_result = await db.execute(
+        select(
             SubjectInstructionCategory.id,
             SubjectInstructionCategory.category_name,
             SubjectInstructionCategory.is_view,
             SubjectInstructionCategory.number
         )
         .filter(SubjectInstructionCategory.subject_id == subject_id)
-        .all()
     )
+    instruction_categories = categories_result.all()
 
     result = []
 
     for category in instruction_categories:
         subject_instructions = set_instruction_category(category=category)
 
-        instructions = db.query(
-            SubjectInstruction
-        )\
-            .filter(SubjectInstruction.subject_category_id == category.id)\
-            .all()
+        instructions_result = await db.execute(
+            select(SubjectInstruction)
+            .options(
+                selectinload(SubjectInstruction.subject_instruction_files),
+                selectinload(SubjectInstruction.subject_instruction_link)
+            )
+            .filter(SubjectInstruction.subject_category_id == category.id)
+        )
+        instructions = instructions_result.scalars().all()
 
         for instruction in instructions:
             instruction_dict = set_instruction(instruction=instruction)
@@ -129,8 +129,8 @@ def select_subject_instructions_db(subject_id: int, db: Session):
     return result
 
 
-def update_subject_instruction_db(
-        db: Session,
+async def update_subject_instruction_db(
+        db: AsyncSession,
         instruction: SubjectInstruction,
         instruction_data: SubjectInstructionUpdate
 ):
@@ -138,51 +138,52 @@ def update_subject_instruction_db(
         if value is not None:
             setattr(instruction, field, value)
 
-    db.commit()
-    db.refresh(instruction)
+    await db.commit()
+    await db.refresh(instruction)
     return instruction
 
 
-def delete_subject_instruction_db(db: Session, instruction: SubjectInstruction):
-    instruction_files = db.query(
-        SubjectInstructionFiles
-    )\
-        .filter(SubjectInstructionFiles.subject_instruction_id == instruction.id)\
-        .all()
+async def delete_subject_instruction_db(db: AsyncSession, instruction: SubjectInstruction):
+    result = await db.execute(
+        select(SubjectInstructionFiles)
+        .filter(SubjectInstructionFiles.subject_instruction_id == instruction.id)
+    )
+    instruction_files = result.scalars().all()
 
     if instruction_files is not None:
         for file in instruction_files:
-            delete_file(file_path=file.file)
-            db.delete(file)
-            db.commit()
+            await delete_file(file_path=file.file_path)
+            await db.delete(file)
+            await db.commit()
 
-    db.delete(instruction)
-    db.commit()
+    await db.delete(instruction)
+    await db.commit()
 
 
-def delete_subject_instruction_category_db(db: Session, instruction_category: SubjectInstructionCategory):
-    instructions = db.query(
-        SubjectInstruction
-    )\
-        .filter(SubjectInstruction.subject_category_id == instruction_category.id)\
-        .all()
+async def delete_subject_instruction_category_db(db: AsyncSession, instruction_category: SubjectInstructionCategory):
+    result = await db.execute(
+        select(SubjectInstruction)
+        .filter(SubjectInstruction.subject_category_id == instruction_category.id)
+    )
+    instructions = result.scalars().all()
 
     for instruction in instructions:
-        delete_subject_instruction_db(db=db, instruction=instruction)
+        await delete_subject_instruction_db(db=db, instruction=instruction)
 
-    db.delete(instruction_category)
-    db.commit()
+    await db.delete(instruction_category)
+    await db.commit()
 
 
-def create_subject_instruction_link_db(db: Session, link_data: SubjectInstructionAttachLink):
+async def create_subject_instruction_link_db(db: AsyncSession, link_data: SubjectInstructionAttachLink):
     new_link = SubjectInstructionLink(**link_data.dict())
     db.add(new_link)
-    db.commit()
-    db.refresh(new_link)
+    await db.commit()
+    await db.refresh(new_link)
     return new_link
 
 
-def delete_subject_instruction_link_db(db: Session, link_id: int):
-    instruction_link = db.query(SubjectInstructionLink).filter(SubjectInstructionLink.id == link_id).first()
-    db.delete(instruction_link)
-    db.commit()
+async def delete_subject_instruction_link_db(db: AsyncSession, link_id: int):
+    result = await db.execute(select(SubjectInstructionLink).filter(SubjectInstructionLink.id == link_id))
+    instruction_link = result.scalars().first()
+    await db.delete(instruction_link)
+    await db.commit()
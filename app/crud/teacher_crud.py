@@ -1,13 +1,12 @@
-from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from sqlalchemy.orm import Session
-
-from app.models import Group, Lesson, Subject, SubjectTeacherAssociation, Teacher, TeacherTemplate
+from app.models import Group, Subject, SubjectTeacherAssociation, Teacher, TeacherTemplate
 from app.schemas.teacher_schemas import TeacherTemplateSchemas
 
 
-def get_teacher_info_db(db: Session, user_id: int):
-    teacher_info = db.query(
+async def get_teacher_info_db(db: AsyncSession, user_id: int):
+    result = await db.execute(select(
         Teacher.id,
         Teacher.name,
         Teacher.surname,
@@ -15,13 +14,14 @@ def get_teacher_info_db(db: Session, user_id: int):
         Teacher.email
     ).filter(
         Teacher.user_id == user_id
-    ).first()
+    ))
+    teacher_info = result.first()
 
     return teacher_info
 
 
-def get_teacher_subjects_db(db: Session, user_id: int):
-    subjects = db.query(
+async def get_teacher_subjects_db(db: AsyncSession, user_id: int):
+    result = await db.execute(select(
         Subject.id, Subject.title, Subject.image_path, Subject.group_id, Group.group_name
     ).join(
         SubjectTeacherAssociation,
@@ -32,7 +32,8 @@ def get_teacher_subjects_db(db: Session, user_id: int):
         Group, Subject.group_id == Group.id
     ).filter(
         Teacher.user_id == user_id
-    ).all()
+    ))
+    subjects = result.all()
 
     result_list = []
     field_list = [
@@ -50,52 +51,32 @@ def get_teacher_subjects_db(db: Session, user_id: int):
     return result_list
 
 
-def get_teacher_lessons_db(db: Session, teacher_id: int):
-    current_date = datetime.now().date()
-    end_date = current_date + timedelta(days=10)
-
-    lessons = db.query(
-        Subject.title,
-        Lesson.title,
-        Lesson.lesson_date,
-        Lesson.lesson_end,
-        Group.group_name
-    ).join(
-        Lesson, Subject.id == Lesson.subject_id
-    ).join(
-        Group, Subject.group_id == Group.id
-    ).filter(
-        Lesson.teacher_id == teacher_id,
-        Lesson.lesson_date >= current_date,
-        Lesson.lesson_date < end_date
-    ).all()
-
-    return lessons
-
-
-def get_teacher_by_user_id_db(db: Session, user_id: int):
-    teacher = db.query(Teacher).filter(Teacher.user_id == user_id).first()
+async def get_teacher_by_user_id_db(db: AsyncSession, user_id: int):
+    result = await db.execute(select(Teacher).filter(Teacher.user_id == user_id))
+    teacher = result.scalars().first()
     return teacher
 
 
-def update_teacher_image_db(db: Session, teacher: Teacher, image_path: str):
+async def update_teacher_image_db(db: AsyncSession, teacher: Teacher, image_path: str):
     teacher.image_path = image_path
-    db.commit()
-    db.refresh(teacher)
+    await db.commit()
+    await db.refresh(teacher)
     return teacher
 
 
-def create_teacher_template_db(db: Session, template: TeacherTemplateSchemas):
+async def create_teacher_template_db(db: AsyncSession, template: TeacherTemplateSchemas):
     new_template = TeacherTemplate(**template.dict())
     db.add(new_template)
-    db.commit()
-    db.refresh(new_template)
+    await db.commit()
+    await db.refresh(new_template)
     return new_template
 
 
-def select_teacher_templates_db(db: Session, teacher_id: int):
-    return db.query(TeacherTemplate).filter(TeacherTemplate.teacher_id == teacher_id).all()
+async def select_teacher_templates_db(db: AsyncSession, teacher_id: int):
+    result = await db.execute(select(TeacherTemplate).filter(TeacherTemplate.teacher_id == teacher_id))
+    return result.scalars().all()
 
 
-def select_template_db(db: Session, template_id: int):
-    return db.query(TeacherTemplate).filter(TeacherTemplate.id == template_id).first()
+async def select_template_db(db: AsyncSession, template_id: int):
+    result = await db.execute(select(TeacherTemplate).filter(TeacherTemplate.id == template_id))
+    return result.scalars().first()
@@ -1,57 +1,66 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.models import QuestionType, TestAnswer, TestLesson, TestMatchingLeft, TestMatchingRight, TestQuestion
 from app.schemas.test_lesson_schemas import TestConfigBase, TestConfigUpdate
 from app.utils.lesson_utils import set_test_answer_info, set_test_question_info, set_test_answer_for_teacher_info
 
 
-def create_test_db(db: Session, test_data: TestConfigBase):
+async def create_test_db(db: AsyncSession, test_data: TestConfigBase):
     new_test = TestLesson(**test_data.dict())
     db.add(new_test)
-    db.commit()
-    db.refresh(new_test)
+    await db.commit()
+    await db.refresh(new_test)
     return new_test
 
 
-def select_test_db(db: Session, test_id: int):
-    return db.query(TestLesson).filter(TestLesson.id == test_id).first()
+async def select_test_db(db: AsyncSession, test_id: int):
+    result = await db.execute(select(TestLesson).filter(TestLesson.id == test_id))
+    return result.scalars().first()
 
 
-def select_test_by_lesson_id_db(db: Session, lesson_id: int):
-    return db.query(TestLesson).filter(TestLesson.lesson_id == lesson_id).first()
+async def select_test_by_lesson_id_db(db: AsyncSession, lesson_id: int):
+    result = await db.execute(select(TestLesson).filter(TestLesson.lesson_id == lesson_id))
+    return result.scalars().first()
 
 
-def select_question_type_id(db: Session, question_type: str):
-    question_type = db.query(QuestionType.id.label("id")).filter(QuestionType.type == question_type).first()
-    return question_type.id
+async def select_question_type_id(db: AsyncSession, question_type: str):
+    result = await db.execute(select(QuestionType.id.label("id")).filter(QuestionType.type == question_type))
+    return result.first().id
 
 
-def select_answers_db(db: Session, question_id: int):
-    return db.query(TestAnswer).filter(TestAnswer.question_id == question_id).all()
+async def select_test_questions_db(db: AsyncSession, test_id: int):
+    result = await db.execute(
+        select(TestQuestion)
+        .options(
+            selectinload(TestQuestion.question_type),
+            selectinload(TestQuestion.test_answer),
+            selectinload(TestQuestion.matching_left),
+            selectinload(TestQuestion.matching_right)
+        )
+        .filter(TestQuestion.test_lesson_id == test_id)
+        .order_by(TestQuestion.id)
+    )
+    return result.scalars().all()
 
 
-def select_test_info_db(db: Session, test_id: int):
-    test_questions = db.query(TestQuestion).filter(TestQuestion.test_lesson_id == test_id).all()
+async def select_test_info_db(db: AsyncSession, test_id: int):
+    test_questions = await select_test_questions_db(db=db, test_id=test_id)
     result = []
 
-    if test_questions is None:
-        return result
-
     for question in test_questions:
         question_info = set_test_question_info(question=question)
 
         if question.question_type.type in ["test", "boolean"]:
-            answers = select_answers_db(db=db, question_id=question.id)
-
-            for answer in answers:
+            for answer in question.test_answer:
                 answer_info = set_test_answer_info(answer)
                 question_info["questionAnswers"].append(answer_info)
 
         elif question.question_type.type == "multiple_choice":
-            answers = select_answers_db(db=db, question_id=question.id)
             counter = 0
 
-            for answer in answers:
+            for answer in question.test_answer:
                 if answer.is_correct:
                     counter += 1
                 answer_info = set_test_answer_info(answer)
@@ -59,31 +68,26 @@ def select_test_info_db(db: Session, test_id: int):
             question_info["quantityCorrectAnswers"] = counter
 
         elif question.question_type.type == "matching":
-            left_options = db.query(TestMatchingLeft).filter(TestMatchingLeft.question_id == question.id).all()
-            right_options = db.query(TestMatchingRight).filter(TestMatchingRight.question_id == question.id).all()
             question_info["questionAnswers"] = {
                 "left": [
                     {"value": left_option.text,
                      "id": left_option.id
-                     } for left_option in left_options],
+                     } for left_option in question.matching_left],
                 "right": [
                     {"value": right_option.text,
                      "id": right_option.id
-                     } for right_option in right_options]
+                     } for right_option in question.matching_right]
             }
 
         elif question.question_type.type == "answer_with_photo":
-            answers = select_answers_db(db=db, question_id=question.id)
-
-            for answer in answers:
+            for answer in question.test_answer:
                 answer_info = set_test_answer_info(answer)
                 question_info["questionAnswers"].append(answer_info)
 
         else:
             question_info["imagePath"] = question.image_path
-            answers = select_answers_db(db=db, question_id=question.id)
 
-            for answer in answers:
+            for answer in question.test_answer:
                 answer_info = set_test_answer_info(answer)
                 question_info["questionAnswers"].append(answer_info)
 
@@ -91,28 +95,22 @@ def select_test_info_db(db: Session, test_id: int):
     return result
 
 
-def select_test_info_for_teacher_db(db: Session, test_id: int):
-    test_questions = db.query(TestQuestion).filter(TestQuestion.test_lesson_id == test_id).all()
+async def select_test_info_for_teacher_db(db: AsyncSession, test_id: int):
+    test_questions = await select_test_questions_db(db=db, test_id=test_id)
     result = []
 
-    if test_questions is None:
-        return result
-
     for question in test_questions:
         question_info = set_test_question_info(question=question)
 
         if question.question_type.type in ["test", "boolean"]:
-            answers = select_answers_db(db=db, question_id=question.id)
-
-            for answer in answers:
+            for answer in question.test_answer:
                 answer_info = set_test_answer_for_teacher_info(answer)
                 question_info["questionAnswers"].append(answer_info)
 
         elif question.question_type.type == "multiple_choice":
-            answers = select_answers_db(db=db, question_id=question.id)
             counter = 0
 
-            for answer in answers:
+            for answer in question.test_answer:
                 if answer.is_correct:
                     counter += 1
                 answer_info = set_test_answer_for_teacher_info(answer)
@@ -120,34 +118,28 @@ def select_test_info_for_teacher_db(db: Session, test_id: int):
             question_info["quantityCorrectAnswers"] = counter
 
         elif question.question_type.type == "matching":
-            left_options = db.query(TestMatchingLeft).filter(TestMatchingLeft.question_id == question.id).all()
-            right_options = db.query(TestMatchingRight).filter(TestMatchingRight.question_id == question.id).all()
-
             question_info["questionAnswers"] = {
                 "left": [{
                     "value": left_option.text,
                     "id": left_option.id,
                     "rightId": left_option.right_id
-                } for left_option in left_options],
+                } for left_option in question.matching_left],
 
                 "right": [{
                     "value": right_option.text,
                     "id": right_option.id
-                } for right_option in right_options]
+                } for right_option in question.matching_right]
             }
 
         elif question.question_type.type == "answer_with_photo":
-            answers = select_answers_db(db=db, question_id=question.id)
-
-            for answer in answers:
+            for answer in question.test_answer:
                 answer_info = set_test_answer_for_teacher_info(answer)
                 question_info["questionAnswers"].append(answer_info)
 
         else:
             question_info["imagePath"] = question.image_path
-            answers = select_answers_db(db=db, question_id=question.id)
 
-            for answer in answers:
+            for answer in question.test_answer:
                 answer_info = set_test_answer_info(answer)
                 question_info["questionAnswers"].append(answer_info)
 
@@ -155,19 +147,19 @@ def select_test_info_for_teacher_db(db: Session, test_id: int):
     return result
 
 
-def update_test_db(db: Session, test: TestLesson, test_data: TestConfigUpdate):
+async def update_test_db(db: AsyncSession, test: TestLesson, test_data: TestConfigUpdate):
     for field, value in test_data:
         if value is not None:
             setattr(test, field, value)
 
     test.timer = test_data.timer
-    db.commit()
-    db.refresh(test)
+    await db.commit()
+    await db.refresh(test)
     return test
 
 
-def create_test_question_db(
-        db: Session,
+async def create_test_question_db(
+        db: AsyncSession,
         question_text: str,
         question_number: int,
         question_score: int,
@@ -184,13 +176,13 @@ def create_test_question_db(
         hided=hided
     )
     db.add(question)
-    db.commit()
-    db.refresh(question)
+    await db.commit()
+    await db.refresh(question)
     return question
 
 
-def create_test_question_with_photo_db(
-        db: Session,
+async def create_test_question_with_photo_db(
+        db: AsyncSession,
         question_text: str,
         question_number: int,
         question_score: int,
@@ -209,30 +201,46 @@ def create_test_question_with_photo_db(
         image_path=image_path
     )
     db.add(question)
-    db.commit()
-    db.refresh(question)
+    await db.commit()
+    await db.refresh(question)
     return question
 
 
-def select_test_question_db(db: Session, question_id: int):
-    return db.query(TestQuestion).filter(TestQuestion.id == question_id).first()
+async def select_test_question_db(db: AsyncSession, question_id: int):
+    result = await db.execute(
+        select(TestQuestion)
+        .options(
+            selectinload(TestQuestion.question_type),
+            selectinload(TestQuestion.test_answer),
+            selectinload(TestQuestion.matching_left),
+            selectinload(TestQuestion.matching_right)
+        )
+        .filter(TestQuestion.id == question_id)
+    )
+    return result.scalars().first()
+
 
+async def select_question_test_id_db(db: AsyncSession, question_id: int):
+    result = await db.execute(select(TestQuestion.test_lesson_id).filter(TestQuestion.id == question_id))
+    return result.scalar()
 
-def set_test_question_path_db(db: Session, image_path: str):
-    question = db.query(TestQuestion).filter(TestQuestion.image_path == image_path).first()
+
+async def set_test_question_path_db(db: AsyncSession, image_path: str):
+    result = await db.execute(select(TestQuestion).filter(TestQuestion.image_path == image_path))
+    question = result.scalars().first()
     question.image_path = None
-    db.commit()
-    db.refresh(question)
-    return
+    await db.commit()
+    await db.refresh(question)
+    return question.test_lesson_id
 
 
-def delete_test_question_db(db: Session, question: TestQuestion):
-    db.delete(question)
-    db.commit()
+async def delete_test_question_db(db: AsyncSession, question: TestQuestion):
+    await db.delete(question)
+    await db.commit()
 
 
-def update_test_question_db(
-        db: Session,
+async def update_test_question_db(
+        db: AsyncSession,
         question: TestQuestion,
         text: str,
         number: int,
@@ -248,13 +256,13 @@ def update_test_question_db(
     if image_path:
         question.image_path = image_path
 
-    db.commit()
-    db.refresh(question)
+    await db.commit()
+    await db.refresh(question)
     return question
 
 
-def create_test_answer_db(
-        db: Session,
+async def create_test_answer_db(
+        db: AsyncSession,
         answer_text: str,
         is_correct: bool,
         question_id: int
@@ -265,13 +273,13 @@ def create_test_answer_db(
         question_id=question_id,
     )
     db.add(answer)
-    db.commit()
-    db.refresh(answer)
+    await db.commit()
+    await db.refresh(answer)
     return answer
 
 
-def create_test_answer_with_photo_db(
-        db: Session,
+async def create_test_answer_with_photo_db(
+        db: AsyncSession,
         answer_text: str,
         is_correct: bool,
         question_id: int,
@@ -284,25 +292,27 @@ def create_test_answer_with_photo_db(
         image_path=image_path
     )
     db.add(answer)
-    db.commit()
-    db.refresh(answer)
+    await db.commit()
+    await db.refresh(answer)
     return answer
 
 
-def select_test_answer_db(db: Session, answer_id: int):
-    return db.query(TestAnswer).filter(TestAnswer.id == answer_id).first()
+async def select_test_answer_db(db: AsyncSession, answer_id: int):
+    result = await db.execute(select(TestAnswer).filter(TestAnswer.id == answer_id))
+    return result.scalars().first()
 
 
-def set_test_answer_path_db(db: Session, image_path: str):
-    answer = db.query(TestAnswer).filter(TestAnswer.image_path == image_path).first()
+async def set_test_answer_path_db(db: AsyncSession, image_path: str):
+    result = await db.execute(select(TestAnswer).filter(TestAnswer.image_path == image_path))
+    answer = result.scalars().first()
     answer.image_path = None
-    db.commit()
-    db.refresh(answer)
-    return
+    await db.commit()
+    await db.refresh(answer)
+    return answer.question_id
 
 
-def update_test_answer_db(
-        db: Session,
+async def update_test_answer_db(
+        db: AsyncSession,
         answer: TestAnswer,
         text: str,
         is_correct: bool,
@@ -313,24 +323,24 @@ def update_test_answer_db(
     if image_path:
         answer.image_path = image_path
 
-    db.commit()
-    db.refresh(answer)
+    await db.commit()
+    await db.refresh(answer)
     return answer
 
 
-def delete_answer_db(db: Session, answer: TestAnswer):
-    db.delete(answer)
-    db.commit()
+async def delete_answer_db(db: AsyncSession, answer: TestAnswer):
+    await db.delete(answer)
+    await db.commit()
 
 
-def create_test_matching_db(db: Session, right_text: str, left_text: str, question_id: int):
+async def create_test_matching_db(db: AsyncSession, right_text: str, left_text: str, question_id: int):
     right_option = TestMatchingRight(
         text=right_text,
         question_id=question_id
     )
 
     db.add(right_option)
-    db.commit()
+    await db.commit()
 
     left_option = TestMatchingLeft(
         text=left_text,
@@ -339,36 +349,53 @@ def create_test_matching_db(db: Session, right_text: str, left_text: str, questi
     )
 
     db.add(left_option)
-    db.commit()
-    db.refresh(right_option)
-    db.refresh(left_option)
+    await db.commit()
+    await db.refresh(right_option)
+    await db.refresh(left_option)
 
     return {"leftOption": left_option, "rightOption": right_option}
 
 
-def select_matching_right_db(db: Session, right_id: int):
-    return db.query(TestMatchingRight).filter(TestMatchingRight.id == right_id).first()
+async def select_matching_right_db(db: AsyncSession, right_id: int):
+    result = await db.execute(select(TestMatchingRight).filter(TestMatchingRight.id == right_id))
+    return result.scalars().first()
 
 
-def select_matching_left_db(db: Session, left_id: int):
-    return db.query(TestMatchingLeft).filter(TestMatchingLeft.id == left_id).first()
+async def select_matching_left_db(db: AsyncSession, left_id: int):
+    result = await db.execute(select(TestMatchingLeft).filter(TestMatchingLeft.id == left_id))
+    return result.scalars().first()
 
 
-def select_mathing_left_by_right_id_db(db: Session, right_id: int):
-    return db.query(TestMatchingLeft).filter(TestMatchingLeft.right_id == right_id).first()
+async def select_mathing_left_by_right_id_db(db: AsyncSession, right_id: int):
+    result = await db.execute(select(TestMatchingLeft).filter(TestMatchingLeft.right_id == right_id))
+    return result.scalars().first()
 
 
-def delete_matching_right_db(db: Session, right_option: TestMatchingRight):
-    db.delete(right_option)
-    db.commit()
+async def delete_matching_right_db(db: AsyncSession, right_option: TestMatchingRight):
+    await db.delete(right_option)
+    await db.commit()
 
 
-def delete_matching_left_db(db: Session, left_option: TestMatchingLeft):
-    db.delete(left_option)
-    db.commit()
+async def delete_matching_left_db(db: AsyncSession, left_option: TestMatchingLeft):
+    await db.delete(left_option)
+    await db.commit()
 
 
-def set_none_for_left_option_db(db: Session, left_option: TestMatchingLeft):
+async def set_none_for_left_option_db(db: AsyncSession, left_option: TestMatchingLeft):
     left_option.right_id = None
-    db.commit()
-    db.refresh(left_option)
+    await db.commit()
+    await db.refresh(left_option)
+
+
+async def select_test_version_db(db: AsyncSession, test_id: int):
+    result = await db.execute(select(TestLesson.content_version).filter(TestLesson.id == test_id))
+    return result.scalar()
+
+
+async def increment_test_version_db(db: AsyncSession, test_id: int):
+    await db.execute(
+        update(TestLesson)
+        .filter(TestLesson.id == test_id)
+        .values(content_version=TestLesson.content_version + 1)
+    )
+    await db.commit()
@@ -1,77 +1,118 @@
 from datetime import date, datetime
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.models import Curator, Moder, Student, Teacher, User, UserType
 from app.schemas.user_schemas import StudentUpdate
 
+USER_RELATIONS = (
+    selectinload(User.user_type),
+    selectinload(User.student),
+    selectinload(User.teacher),
+    selectinload(User.curator),
+    selectinload(User.moder)
+)
 
-def select_user_type_id_db(db: Session, user_type: str):
-    return db.query(UserType).filter(UserType.type == user_type).first()
 
+async def select_user_type_id_db(db: AsyncSession, user_type: str):
+    result = await db.execute(select(UserType).filter(UserType.type == user_type))
+    return result.scalars().first()
 
-def select_user_type_by_user_id_db(db: Session, user_id: int):
-    user_type = db.query(UserType.type).join(User).filter(User.id == user_id).first()
+
+async def select_user_type_by_user_id_db(db: AsyncSession, user_id: int):
+    result = await db.execute(select(UserType.type).join(User).filter(User.id == user_id))
+    user_type = result.first()
     return user_type
 
 
-def select_user_by_username_db(db: Session, username: str):
-    return db.query(User).filter(User.username == username).first()
+async def select_user_by_username_db(db: AsyncSession, username: str):
+    result = await db.execute(select(User).options(*USER_RELATIONS).filter(User.username == username))
+    return result.scalars().first()
+
+
+async def select_calendar_token_version_db(db: AsyncSession, user_id: int) -> int:
+    result = await db.execute(select(User.calendar_token_version).filter(User.id == user_id))
+    return result.scalar_one()
+
+
+async def increment_calendar_token_version_db(db: AsyncSession, user_id: int) -> int:
+    await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(calendar_token_version=User.calendar_token_version + 1)
+    )
+    await db.commit()
+    return await select_calendar_token_version_db(db=db, user_id=user_id)
 
 
-def select_user_by_id_db(db: Session, user_id: int):
-    return db.query(User).filter(User.id == user_id).first()
+async def select_user_by_id_db(db: AsyncSession, user_id: int):
+    result = await db.execute(select(User).options(*USER_RELATIONS).filter(User.id == user_id))
+    return result.scalars().first()
 
 
-def select_all_students_db(db: Session):
-    return db.query(Student).all()
+async def select_all_students_db(db: AsyncSession):
+    result = await db.execute(select(Student))
+    return result.scalars().all()
 
 
-def select_student_by_id_db(db: Session, student_id: int):
-    return db.query(Student).filter(Student.id == student_id).first()
+async def select_student_by_id_db(db: AsyncSession, student_id: int):
+    result = await db.execute(select(Student).filter(Student.id == student_id))
+    return result.scalars().first()
 
 
-def select_student_by_user_id_db(db: Session, user_id: int):
-    return db.query(Student).filter(Student.user_id == user_id).first()
+async def select_student_by_user_id_db(db: AsyncSession, user_id: int):
+    result = await db.execute(select(Student).filter(Student.user_id == user_id))
+    return result.scalars().first()
 
 
-def select_students_by_group_id_db(db: Session, group_id: int):
-    return db.query(Student).filter(Student.group_id == group_id).all()
+async def select_students_by_group_id_db(db: AsyncSession, group_id: int):
+    result = await db.execute(select(Student).filter(Student.group_id == group_id))
+    return result.scalars().all()
 
 
-def select_students_by_course_id_db(db: Session, course_id: int):
-    return db.query(Student).filter(Student.course_id == course_id).all()
+async def select_students_by_course_id_db(db: AsyncSession, course_id: int):
+    result = await db.execute(select(Student).filter(Student.course_id == course_id))
+    return result.scalars().all()
 
 
-def select_students_by_specializations_id_db(db: Session, specialization_id: int):
-    return db.query(Student).filter(Student.specialization_id == specialization_id).all()
+async def select_students_by_specializations_id_db(db: AsyncSession, specialization_id: int):
+    result = await db.execute(select(Student).filter(Student.specialization_id == specialization_id))
+    return result.scalars().all()
 
 
-def update_user_token_db(db: Session, user: User, token: str, exp_token: datetime):
+async def update_user_token_db(db: AsyncSession, user: User, token: str, exp_token: datetime):
     user.token = token
     user.exp_token = exp_token
     user.last_active = date.today()
     user.is_active = True
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+
+
+async def update_user_password_db(db: AsyncSession, user: User, hashed_password: str):
+    user.hashed_pass = hashed_password
+    await db.commit()
+    await db.refresh(user)
 
 
-def update_student_photo_path_db(db: Session, student: Student, new_path: str):
+async def update_student_photo_path_db(db: AsyncSession, student: Student, new_path: str):
     student.image_path = new_path
-    db.commit()
-    db.refresh(student)
+    await db.commit()
+    await db.refresh(student)
 
 
-def update_student_info_db(db: Session, student: Student, student_data: StudentUpdate):
+async def update_student_info_db(db: AsyncSession, student: Student, student_data: StudentUpdate):
     for field, value in student_data:
         if value:
             setattr(student, field, value)
 
-    db.commit()
-    db.refresh(student)
+    await db.commit()
+    await db.refresh(student)
 
 
-def create_new_user_db(db: Session, username: str, hashed_password: str, user_type_id: int):
+async def create_new_user_db(db: AsyncSession, username: str, hashed_password: str, user_type_id: int):
     new_user = User(
         username=username,
         hashed_pass=hashed_password,
@@ -79,13 +120,13 @@ def create_new_user_db(db: Session, username: str, hashed_password: str, user_ty
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
 
 
-def create_new_student_db(
-        db: Session,
+async def create_new_student_db(
+        db: AsyncSession,
         name: str,
         surname: str,
         lastname: str,
@@ -104,13 +145,13 @@ def create_new_student_db(
     )
 
     db.add(new_student)
-    db.commit()
-    db.refresh(new_student)
+    await db.commit()
+    await db.refresh(new_student)
     return new_student
 
 
-def create_new_teacher_db(
-        db: Session,
+async def create_new_teacher_db(
+        db: AsyncSession,
         name: str,
         surname: str,
         lastname: str,
@@ -126,12 +167,12 @@ def create_new_teacher_db(
     )
 
     db.add(new_teacher)
-    db.commit()
-    db.refresh(new_teacher)
+    await db.commit()
+    await db.refresh(new_teacher)
     return new_teacher
 
 
-def create_new_moder_db(db: Session, name: str, surname: str, lastname: str, user_id: int):
+async def create_new_moder_db(db: AsyncSession, name: str, surname: str, lastname: str, user_id: int):
     new_moder = Moder(
         name=name,
         surname=surname,
@@ -140,13 +181,13 @@ def create_new_moder_db(db: Session, name: str, surname: str, lastname: str, use
     )
 
     db.add(new_moder)
-    db.commit()
-    db.refresh(new_moder)
+    await db.commit()
+    await db.refresh(new_moder)
     return new_moder
 
 
-def create_new_curator_db(
-        db: Session,
+async def create_new_curator_db(
+        db: AsyncSession,
         name: str,
         surname: str,
         lastname: str,
@@ -162,16 +203,16 @@ def create_new_curator_db(
     )
 
     db.add(new_curator)
-    db.commit()
-    db.refresh(new_curator)
+    await db.commit()
+    await db.refresh(new_curator)
     return new_curator
 
 
-def delete_user_db(db: Session, user: User):
-    db.delete(user)
-    db.commit()
+async def delete_user_db(db: AsyncSession, user: User):
+    await db.delete(user)
+    await db.commit()
 
 
-def delete_student_db(db: Session, student: Student):
-    db.delete(student)
-    db.commit()
+async def delete_student_db(db: AsyncSession, student: Student):
+    await db.delete(student)
+    await db.commit()
@@ -1,4 +1,5 @@
-from sqlalchemy import JSON, Boolean, Column, Date, DateTime, Enum, ForeignKey, Integer, String, Text, Time
+from sqlalchemy import (JSON, Boolean, Column, Date, DateTime, Enum, ForeignKey, Index, Integer, String, Text, Time,
+                        UniqueConstraint)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -49,9 +50,10 @@ class User(Base):
     username = Column(String(25), index=True, unique=True, nullable=False)
     hashed_pass = Column(String, nullable=False)
     is_active = Column(Boolean)
-    token = Column(String)
+    token = Column(String, index=True)
     exp_token = Column(DateTime)
     last_active = Column(Date)
+    calendar_token_version = Column(Integer, default=0, server_default="0", nullable=False)
 
     user_type_id = Column(Integer, ForeignKey('user_type.id'))
 
@@ -64,10 +66,12 @@ class User(Base):
     chat_message = relationship('GroupChat', back_populates='user')
     chat_answer = relationship('GroupChatAnswer', back_populates='user')
     recipient = relationship('MessageRecipient', back_populates='user')
+    read_receipt = relationship('GroupChatReadReceipt', back_populates='user')
 
     subject_message = relationship('SubjectChat', back_populates='user')
     subject_answer = relationship('SubjectChatAnswer', back_populates='user')
     subject_recipient = relationship('SubjectRecipient', back_populates='user')
+    subject_read_receipt = relationship('SubjectChatReadReceipt', back_populates='user')
 
     sent_letters = relationship("StudentTeacherLetter",
                                 foreign_keys=[StudentTeacherLetter.sender_id],
@@ -328,6 +332,9 @@ class SubjectInstructionLink(Base):
 
 class SubjectJournal(Base):
     __tablename__ = "subject_journal"
+    __table_args__ = (
+        UniqueConstraint("subject_id", "lesson_id", "student_id", name="uq_subject_journal_lesson_student"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     score = Column(Integer)
@@ -392,6 +399,10 @@ class Module(Base):
 
 class Lesson(Base):
     __tablename__ = "lesson"
+    __table_args__ = (
+        Index("ix_lesson_subject_id_lesson_date", "subject_id", "lesson_date"),
+        Index("ix_lesson_teacher_id_lesson_date", "teacher_id", "lesson_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     number = Column(Integer, default=1, nullable=False)
@@ -410,7 +421,7 @@ class Lesson(Base):
     subject = relationship('Subject', back_populates='lesson')
     teacher = relationship('Teacher', back_populates='lesson')
 
-    lecture = relationship('Lecture', back_populates='lesson')
+    lecture = relationship('Lecture', back_populates='lesson', order_by='Lecture.id')
     test_lesson = relationship('TestLesson', back_populates='lesson')
     seminar = relationship('Seminar', back_populates='lesson')
     video_lecture = relationship('VideoLecture', back_populates='lesson')
@@ -425,10 +436,10 @@ class Lecture(Base):
     __tablename__ = "lecture"
 
     id = Column(Integer, primary_key=True, index=True)
-    lesson_id = Column(Integer, ForeignKey('lesson.id'))
+    lesson_id = Column(Integer, ForeignKey('lesson.id'), index=True)
 
     lesson = relationship('Lesson', uselist=False, back_populates='lecture')
-    attributes = relationship('LectureAttribute', back_populates='lecture')
+    attributes = relationship('LectureAttribute', back_populates='lecture', order_by='LectureAttribute.id')
     student_lecture = relationship('StudentLecture', back_populates='lecture')
 
 
@@ -445,8 +456,8 @@ class LectureAttribute(Base):
     lecture_id = Column(Integer, ForeignKey('lecture.id'))
 
     lecture = relationship('Lecture', back_populates='attributes')
-    lecture_file = relationship('LectureFile', back_populates='lecture_attribute')
-    lecture_link = relationship('LectureLink', back_populates='lecture_attribute')
+    lecture_file = relationship('LectureFile', back_populates='lecture_attribute', order_by='LectureFile.id')
+    lecture_link = relationship('LectureLink', back_populates='lecture_attribute', order_by='LectureLink.id')
 
 
 class LectureFile(Base):
@@ -477,6 +488,9 @@ class LectureLink(Base):
 
 class StudentLecture(Base):
     __tablename__ = "student_lecture"
+    __table_args__ = (
+        Index("ix_student_lecture_student_lecture", "student_id", "lecture_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     score = Column(Integer)
@@ -512,6 +526,7 @@ class TestLesson(Base):
     show_answer = Column(Boolean)
     shuffle_answer = Column(Boolean)
     deadline = Column(DateTime)
+    content_version = Column(Integer, default=0, server_default="0", nullable=False)
     lesson_id = Column(Integer, ForeignKey('lesson.id'))
 
     lesson = relationship('Lesson', uselist=False, back_populates='test_lesson')
@@ -534,9 +549,10 @@ class TestQuestion(Base):
 
     question_type = relationship('QuestionType', back_populates='test_question')
     test_lesson = relationship('TestLesson', back_populates='test_question')
-    test_answer = relationship('TestAnswer', back_populates='test_question')
-    matching_left = relationship('TestMatchingLeft', back_populates='test_question')
-    matching_right = relationship('TestMatchingRight', back_populates='test_question')
+    test_answer = relationship('TestAnswer', back_populates='test_question', order_by='TestAnswer.id')
+    matching_left = relationship('TestMatchingLeft', back_populates='test_question', order_by='TestMatchingLeft.id')
+    matching_right = relationship('TestMatchingRight', back_populates='test_question',
+                                  order_by='TestMatchingRight.id')
     student_test_answer = relationship('StudentTestAnswer', back_populates='test_question')
     student_test_matching = relationship('StudentTestMatching', back_populates='test_question')
 
@@ -974,8 +990,8 @@ class GroupChatAttachFile(Base):
     mime_type = Column(String, nullable=False)
     size = Column(Integer, nullable=False)
 
-    chat_message = Column(Integer, ForeignKey('group_chat.id'))
-    chat_answer = Column(Integer, ForeignKey('group_chat_answer.id'))
+    chat_message = Column(Integer, ForeignKey('group_chat.id'), index=True)
+    chat_answer = Column(Integer, ForeignKey('group_chat_answer.id'), index=True)
 
     group_chat_message = relationship('GroupChat', back_populates='attach_file')
     group_chat_answer = relationship('GroupChatAnswer', back_populates='attach_file')
@@ -983,6 +999,10 @@ class GroupChatAttachFile(Base):
 
 class GroupChat(Base):
     __tablename__ = "group_chat"
+    __table_args__ = (
+        Index("ix_group_chat_group_id_type_datetime", "group_id", "message_type", "datetime_message", "id"),
+        Index("ix_group_chat_group_id_sender_datetime", "group_id", "sender_id", "datetime_message", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     message = Column(Text, nullable=False)
@@ -992,7 +1012,6 @@ class GroupChat(Base):
     sender_id = Column(Integer, ForeignKey('user.id'))
     group_id = Column(Integer, ForeignKey('group.id'))
     message_type = Column(Enum(MessageTypeOption), nullable=False)
-    read_by = Column(String)
     deleted = Column(Boolean)
 
     user = relationship('User', back_populates='chat_message')
@@ -1000,6 +1019,7 @@ class GroupChat(Base):
     group_chat_answer = relationship('GroupChatAnswer', back_populates='group_chat')
     attach_file = relationship('GroupChatAttachFile', back_populates='group_chat_message')
     recipient = relationship('MessageRecipient', back_populates='group_chat_message')
+    read_receipt = relationship('GroupChatReadReceipt', back_populates='group_chat_message')
 
 
 class GroupChatAnswer(Base):
@@ -1010,17 +1030,20 @@ class GroupChatAnswer(Base):
     datetime_message = Column(DateTime, autoincrement=True)
     sender_type = Column(Enum(UserTypeOption), nullable=False)
     sender_id = Column(Integer, ForeignKey('user.id'))
-    group_chat_id = Column(Integer, ForeignKey('group_chat.id'))
-    read_by = Column(String)
+    group_chat_id = Column(Integer, ForeignKey('group_chat.id'), index=True)
     deleted = Column(Boolean)
 
     user = relationship('User', back_populates='chat_answer')
     group_chat = relationship('GroupChat', back_populates='group_chat_answer')
     attach_file = relationship('GroupChatAttachFile', back_populates='group_chat_answer')
+    read_receipt = relationship('GroupChatReadReceipt', back_populates='group_chat_answer')
 
 
 class MessageRecipient(Base):
     __tablename__ = "message_recipient"
+    __table_args__ = (
+        Index("ix_message_recipient_recipient_message", "recipient_id", "group_chat_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     group_chat_id = Column(Integer, ForeignKey('group_chat.id'))
@@ -1030,6 +1053,24 @@ class MessageRecipient(Base):
     group_chat_message = relationship('GroupChat', back_populates='recipient')
 
 
+class GroupChatReadReceipt(Base):
+    __tablename__ = "group_chat_read_receipt"
+    __table_args__ = (
+        UniqueConstraint("user_id", "group_chat_id"),
+        UniqueConstraint("user_id", "group_chat_answer_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    read_at = Column(DateTime)
+    user_id = Column(Integer, ForeignKey('user.id'), nullable=False)
+    group_chat_id = Column(Integer, ForeignKey('group_chat.id'), index=True)
+    group_chat_answer_id = Column(Integer, ForeignKey('group_chat_answer.id'), index=True)
+
+    user = relationship('User', back_populates='read_receipt')
+    group_chat_message = relationship('GroupChat', back_populates='read_receipt')
+    group_chat_answer = relationship('GroupChatAnswer', back_populates='read_receipt')
+
+
 class SubjectChatAttachFile(Base):
     __tablename__ = "subject_chat_attach_file"
 
@@ -1039,8 +1080,8 @@ class SubjectChatAttachFile(Base):
     mime_type = Column(String, nullable=False)
     size = Column(Integer, nullable=False)
 
-    chat_message = Column(Integer, ForeignKey('subject_chat.id'))
-    chat_answer = Column(Integer, ForeignKey('subject_chat_answer.id'))
+    chat_message = Column(Integer, ForeignKey('subject_chat.id'), index=True)
+    chat_answer = Column(Integer, ForeignKey('subject_chat_answer.id'), index=True)
 
     subject_chat_message = relationship('SubjectChat', back_populates='attach_file')
     subject_chat_answer = relationship('SubjectChatAnswer', back_populates='attach_file')
@@ -1048,6 +1089,10 @@ class SubjectChatAttachFile(Base):
 
 class SubjectChat(Base):
     __tablename__ = "subject_chat"
+    __table_args__ = (
+        Index("ix_subject_chat_subject_id_type_datetime", "subject_id", "message_type", "datetime_message", "id"),
+        Index("ix_subject_chat_subject_id_sender_datetime", "subject_id", "sender_id", "datetime_message", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     message = Column(Text, nullable=False)
@@ -1057,7 +1102,6 @@ class SubjectChat(Base):
     sender_id = Column(Integer, ForeignKey('user.id'))
     subject_id = Column(Integer, ForeignKey('subject.id'))
     message_type = Column(Enum(MessageTypeOption), nullable=False)
-    read_by = Column(String)
     deleted = Column(Boolean)
 
     user = relationship('User', back_populates='subject_message')
@@ -1065,6 +1109,7 @@ class SubjectChat(Base):
     subject_chat_answer = relationship('SubjectChatAnswer', back_populates='subject_chat')
     attach_file = relationship('SubjectChatAttachFile', back_populates='subject_chat_message')
     subject_recipient = relationship('SubjectRecipient', back_populates='subject_chat_message')
+    read_receipt = relationship('SubjectChatReadReceipt', back_populates='subject_chat_message')
 
 
 class SubjectChatAnswer(Base):
@@ -1075,17 +1120,20 @@ class SubjectChatAnswer(Base):
     datetime_message = Column(DateTime, autoincrement=True)
     sender_type = Column(Enum(UserTypeOption), nullable=False)
     sender_id = Column(Integer, ForeignKey('user.id'))
-    subject_chat_id = Column(Integer, ForeignKey('subject_chat.id'))
-    read_by = Column(String)
+    subject_chat_id = Column(Integer, ForeignKey('subject_chat.id'), index=True)
     deleted = Column(Boolean)
 
     user = relationship('User', back_populates='subject_answer')
     subject_chat = relationship('SubjectChat', back_populates='subject_chat_answer')
     attach_file = relationship('SubjectChatAttachFile', back_populates='subject_chat_answer')
+    read_receipt = relationship('SubjectChatReadReceipt', back_populates='subject_chat_answer')
 
 
 class SubjectRecipient(Base):
     __tablename__ = "subject_recipient"
+    __table_args__ = (
+        Index("ix_subject_recipient_recipient_message", "recipient_id", "subject_chat_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     subject_chat_id = Column(Integer, ForeignKey('subject_chat.id'))
@@ -1095,6 +1143,24 @@ class SubjectRecipient(Base):
     subject_chat_message = relationship('SubjectChat', back_populates='subject_recipient')
 
 
+class SubjectChatReadReceipt(Base):
+    __tablename__ = "subject_chat_read_receipt"
+    __table_args__ = (
+        UniqueConstraint("user_id", "subject_chat_id"),
+        UniqueConstraint("user_id", "subject_chat_answer_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    read_at = Column(DateTime)
+    user_id = Column(Integer, ForeignKey('user.id'), nullable=False)
+    subject_chat_id = Column(Integer, ForeignKey('subject_chat.id'), index=True)
+    subject_chat_answer_id = Column(Integer, ForeignKey('subject_chat_answer.id'), index=True)
+
+    user = relationship('User', back_populates='subject_read_receipt')
+    subject_chat_message = relationship('SubjectChat', back_populates='read_receipt')
+    subject_chat_answer = relationship('SubjectChatAnswer', back_populates='read_receipt')
+
+
 class Labels(Base):
     __tablename__ = "labels"
 
@@ -1127,3 +1193,18 @@ class DeletedLetters(Base):
     letter_id = Column(Integer, ForeignKey('student_teacher_letter.id'))
 
     letter = relationship('StudentTeacherLetter', back_populates='deleted_letter')
+
+
+class StoredBlob(Base):
+    __tablename__ = "stored_blob"
+    __table_args__ = (
+        Index("ix_stored_blob_ref_count_acquired_at", "ref_count", "acquired_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    checksum = Column(String, nullable=False, unique=True)
+    path = Column(String, nullable=False, unique=True)
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, server_default="0")
+    created_at = Column(DateTime)
+    acquired_at = Column(DateTime, index=True)
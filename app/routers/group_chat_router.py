@@ -2,98 +2,142 @@ from typing import Dict, List
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from fastapi.websockets import WebSocket, WebSocketDisconnect, WebSocketState
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud.group_chat_crud import (get_last_answer_db, get_last_message_db, select_message_by_id_db,
+from app.crud.group_chat_crud import (create_answer_read_receipt_db, create_message_read_receipt_db, get_last_answer_db,
+                                      get_last_message_db, mark_messages_read_db, select_message_by_id_db,
                                       select_messages_by_pagination_db, select_recipient_by_message_id,
-                                      update_answer_read_by_db, update_message_read_by_db)
+                                      select_unread_count_db)
 from app.crud.group_crud import select_group_by_name_db
-from app.models import User
 from app.session import get_db
+from app.utils.chat_broker import WORKER_ID, active_users_message, broker
+from app.utils.chat_delivery import ConnectionWriter, DeliveryMetrics, serialize_message
+from app.utils.connection_registry import ConnectionRegistry
+from app.utils.file_store import is_blob_path
 from app.utils.group_chat import (create_last_message_data, delete_answer_data, delete_message_data,
                                   save_answer_data_to_db, save_message_data_to_db, set_last_answer_dict,
                                   set_last_message_dict, set_last_messages_dict, update_answer_data_to_db,
                                   update_message_data_to_db)
+from app.utils.image_derivatives import get_derivative_paths
 from app.utils.save_images import delete_file, save_group_chat_file
-from app.utils.token import get_current_user
+from app.utils.token import Principal, get_current_user
 
 router = APIRouter()
 
 
 class ConnectionManager:
+    channel = "group_chat"
+
     def __init__(self):
-        self.connections = {}
+        self.connections = ConnectionRegistry()
+        self.metrics = DeliveryMetrics()
+        self.subscribed = False
+
+    async def subscribe(self):
+        if not self.subscribed:
+            self.subscribed = True
+            await broker.subscribe(self.channel, self.deliver)
 
     @staticmethod
-    def create_connection(websocket: WebSocket, user: User):
+    def create_connection(websocket: WebSocket, user: Principal):
         connection = {
             "websocket": websocket,
             "user": user.id,
-            "user_type": str(user.user_type.type)
+            "user_type": str(user.user_type)
         }
         return connection
 
     async def add_connection(self, group_name: str, connection):
-        if group_name not in self.connections:
-            self.connections[group_name] = []
-        self.connections[group_name].append(connection)
+        await self.subscribe()
+        connection["writer"] = ConnectionWriter(connection["websocket"], group_name, self.metrics)
+        self.connections.add(group_name, connection["user"], connection)
+        await broker.add_presence(self.channel, group_name, connection["user"])
         await self.send_total_active_users(group_name=group_name)
 
     async def remove_connection(self, group_name: str, connection):
-        if group_name in self.connections:
-            self.connections[group_name].remove(connection)
+        if self.connections.remove(connection):
+            connection["writer"].stop()
+            await broker.remove_presence(self.channel, group_name, connection["user"])
             await self.send_total_active_users(group_name=group_name)
 
     async def check_user_connection(self, group_name: str, user_id: int):
-        if group_name in self.connections:
-            for connection in self.connections[group_name]:
-                if connection["user"] == user_id:
-                    await connection["websocket"].close()
+        await self.close_user_connections(group_name=group_name, user_id=user_id)
+        await self.publish(group_name, "close", user_id=user_id)
+
+    async def close_user_connections(self, group_name: str, user_id: int):
+        for connection in self.connections.user_connections(group_name, user_id):
+            await connection["websocket"].close()
 
     async def send_total_active_users(self, group_name: str):
-        total_json = {
-            "totalActive": len(self.connections[group_name]),
-            "idsActiveUsers": [connection["user"] for connection in self.connections[group_name]]
-        }
-        await self.send_message_to_group(group_name=group_name, message=total_json)
+        presence = await broker.get_presence(self.channel, group_name)
+        await self.send_message_to_group(group_name=group_name, message=active_users_message(presence))
+
+    async def send_first_message(self, db: AsyncSession, connection: Dict, group_id: int, user: Principal):
+        messages_data = await create_last_message_data(db=db, group_id=group_id, user=user)
+        await self.send_personal_message(connection=connection, message=messages_data)
 
     @staticmethod
-    async def send_first_message(db: Session, websocket: WebSocket, group_id: int, user: User):
-        messages_data = create_last_message_data(db=db, group_id=group_id, user=user)
-        await websocket.send_json(messages_data)
+    async def send_personal_message(connection: Dict, message: Dict):
+        connection["writer"].push(serialize_message(message))
+
+    async def publish(self, group_name: str, target: str, message: Dict = None, user_id: int = None,
+                      user_ids: List[int] = None):
+        event = {
+            "origin": WORKER_ID,
+            "room": group_name,
+            "target": target,
+            "userId": user_id,
+            "userIds": user_ids,
+            "message": message
+        }
+        await broker.publish(self.channel, event)
+
+    async def deliver(self, event: Dict):
+        group_name = event["room"]
+        if event["target"] == "group":
+            await self.deliver_to_group(group_name=group_name, message=event["message"])
+        elif event["target"] == "user":
+            await self.deliver_to_user(group_name=group_name, user_id=event["userId"], message=event["message"])
+        elif event["target"] == "users":
+            await self.deliver_to_users(group_name=group_name, user_ids=event["userIds"], message=event["message"])
+        elif event["target"] == "close" and event["origin"] != WORKER_ID:
+            await self.close_user_connections(group_name=group_name, user_id=event["userId"])
 
     async def send_message_to_user(self, group_name: str, user_id: int, message: Dict):
-        if group_name in self.connections:
-            connections = self.connections[group_name]
-            for connection in connections:
-                if connection["user"] == user_id:
-                    await connection["websocket"].send_json(message)
+        await self.publish(group_name, "user", message=message, user_id=user_id)
 
     async def send_message_to_users(self, group_name: str, user_ids: List[int], message: Dict):
-        if group_name in self.connections:
-            connections = self.connections[group_name]
-            for connection in connections:
-                if connection["user"] in user_ids:
-                    await connection["websocket"].send_json(message)
+        await self.publish(group_name, "users", message=message, user_ids=user_ids)
 
     async def send_message_to_group(self, group_name: str, message: Dict):
-        if group_name in self.connections:
-            connections = self.connections[group_name]
-            for connection in connections:
-                if (connection["websocket"].client_state == WebSocketState.CONNECTED
-                        and connection["websocket"].application_state == WebSocketState.CONNECTED):
-                    await connection["websocket"].send_json(message)
-                else:
-                    continue
+        await self.publish(group_name, "group", message=message)
+
+    async def deliver_to_user(self, group_name: str, user_id: int, message: Dict):
+        text = serialize_message(message)
+        for connection in self.connections.user_connections(group_name, user_id):
+            connection["writer"].push(text)
+
+    async def deliver_to_users(self, group_name: str, user_ids: List[int], message: Dict):
+        text = serialize_message(message)
+        for connection in self.connections.users_connections(group_name, user_ids):
+            connection["writer"].push(text)
+
+    async def deliver_to_group(self, group_name: str, message: Dict):
+        text = serialize_message(message)
+        for connection in self.connections.room_connections(group_name):
+            if (connection["websocket"].client_state == WebSocketState.CONNECTED
+                    and connection["websocket"].application_state == WebSocketState.CONNECTED):
+                connection["writer"].push(text)
 
 
 manager = ConnectionManager()
 
 
 @router.websocket("/ws/{group_name}/{token}")
-async def group_chat_socket(group_name: str, token: str, websocket: WebSocket, db: Session = Depends(get_db)):
-    user = get_current_user(db=db, token=token)
-    group_id = select_group_by_name_db(db=db, group_name=group_name)
+async def group_chat_socket(group_name: str, token: str, websocket: WebSocket, db: AsyncSession = Depends(get_db)):
+    user = await get_current_user(db=db, token=token)
+    group_id = await select_group_by_name_db(db=db, group_name=group_name)
+    connection = None
 
     try:
         await manager.check_user_connection(group_name=group_name, user_id=user.id)
@@ -101,42 +145,42 @@ async def group_chat_socket(group_name: str, token: str, websocket: WebSocket, d
         await websocket.accept()
         connection = manager.create_connection(websocket, user)
         await manager.add_connection(group_name, connection)
-        await manager.send_first_message(db=db, websocket=websocket, group_id=group_id, user=user)
+        await manager.send_first_message(db=db, connection=connection, group_id=group_id, user=user)
 
         while True:
             data = await websocket.receive_json()
 
             if data.get("type") == "message":
-                save_message_data_to_db(db=db, group_id=group_id, data=data)
-                message_obj = get_last_message_db(db=db, group_id=group_id, sender_id=data.get("senderId"))
+                await save_message_data_to_db(db=db, group_id=group_id, data=data)
+                message_obj = await get_last_message_db(db=db, group_id=group_id, sender_id=data.get("senderId"))
                 message_to_send = set_last_message_dict(message_obj)
 
                 if data.get("messageType") == "everyone":
                     await manager.send_message_to_group(group_name=group_name, message=message_to_send)
 
                 elif data.get("messageType") == "several":
-                    await websocket.send_json(message_to_send)
+                    await manager.send_personal_message(connection=connection, message=message_to_send)
                     await manager.send_message_to_users(group_name=group_name, user_ids=data.get("recipient"),
                                                         message=message_to_send)
 
                 else:
-                    await websocket.send_json(message_to_send)
+                    await manager.send_personal_message(connection=connection, message=message_to_send)
                     await manager.send_message_to_user(group_name=group_name, user_id=data.get("recipient"),
                                                        message=message_to_send)
 
             elif data.get("type") == "answer":
-                save_answer_data_to_db(db=db, data=data)
-                answer_obj = get_last_answer_db(db=db, sender_id=data.get("senderId"))
+                await save_answer_data_to_db(db=db, data=data)
+                answer_obj = await get_last_answer_db(db=db, sender_id=data.get("senderId"))
                 answer_to_send = set_last_answer_dict(answer_obj)
-                message_obj = select_message_by_id_db(db=db, message_id=data.get("messageId"))
+                message_obj = await select_message_by_id_db(db=db, message_id=data.get("messageId"))
 
                 if message_obj.message_type == "alone":
-                    await websocket.send_json(answer_to_send)
+                    await manager.send_personal_message(connection=connection, message=answer_to_send)
                     await manager.send_message_to_user(group_name=group_name, user_id=message_obj.sender_id,
                                                        message=answer_to_send)
 
                 elif message_obj.message_type == "several":
-                    recipients = select_recipient_by_message_id(db=db, message_id=message_obj.id)
+                    recipients = await select_recipient_by_message_id(db=db, message_id=message_obj.id)
                     user_ids = [recipient.recipient_id for recipient in recipients]
                     await manager.send_message_to_users(group_name=group_name, user_ids=user_ids,
                                                         message=answer_to_send)
@@ -147,19 +191,19 @@ async def group_chat_socket(group_name: str, token: str, websocket: WebSocket, d
                     await manager.send_message_to_group(group_name=group_name, message=answer_to_send)
 
             elif data.get("type") == "deleteMessage":
-                info = delete_message_data(db=db, data=data)
+                info = await delete_message_data(db=db, data=data)
                 message = f'Message with id {data.get("messageId")} have been deleted'
 
                 if info["messageType"] == "everyone":
                     await manager.send_message_to_group(group_name=group_name, message={"message": message})
 
                 else:
-                    await websocket.send_json({"message": message})
+                    await manager.send_personal_message(connection=connection, message={"message": message})
                     await manager.send_message_to_users(group_name=group_name, user_ids=info["recipient"],
                                                         message={"message": message})
 
             elif data.get("type") == "deleteAnswer":
-                info = delete_answer_data(db=db, data=data)
+                info = await delete_answer_data(db=db, data=data)
                 message = f'Answer with id {data.get("answerId")} have been deleted'
 
                 if info["messageType"] == "everyone":
@@ -178,22 +222,22 @@ async def group_chat_socket(group_name: str, token: str, websocket: WebSocket, d
                                                         message={"message": message})
 
             elif data.get("type") == "updateMessage":
-                updated_message = update_message_data_to_db(db=db, data=data)
+                updated_message = await update_message_data_to_db(db=db, data=data)
 
                 if updated_message["messageType"] == "everyone":
                     await manager.send_message_to_group(group_name=group_name, message=updated_message)
 
                 elif updated_message["messageType"] == "alone":
-                    await websocket.send_json(updated_message)
+                    await manager.send_personal_message(connection=connection, message=updated_message)
                     await manager.send_message_to_user(group_name=group_name, user_id=data.get("recipient"),
                                                        message=updated_message)
                 else:
-                    await websocket.send_json(updated_message)
+                    await manager.send_personal_message(connection=connection, message=updated_message)
                     await manager.send_message_to_users(group_name=group_name, user_ids=data.get("recipient"),
                                                         message=updated_message)
 
             elif data.get("type") == "updateAnswer":
-                updated_answer = update_answer_data_to_db(db=db, data=data)
+                updated_answer = await update_answer_data_to_db(db=db, data=data)
                 if updated_answer["messageType"] == "everyone":
                     await manager.send_message_to_group(group_name=group_name, message=updated_answer["answerData"])
 
@@ -211,22 +255,24 @@ async def group_chat_socket(group_name: str, token: str, websocket: WebSocket, d
                                                         message=updated_answer["answerData"])
 
     except WebSocketDisconnect:
-        manager.connections[group_name].remove(connection)
+        pass
     finally:
-        await manager.send_total_active_users(group_name=group_name)
+        if connection is not None:
+            await manager.remove_connection(group_name=group_name, connection=connection)
 
 
 @router.post("/group-chat/attachment-file")
 async def attach_file_to_chat(
         file: UploadFile = File(...),
-        user: User = Depends(get_current_user)
+        user: Principal = Depends(get_current_user)
 ):
     if user.student or user.curator or user.moder:
-        file_path = save_group_chat_file(file=file)
+        stored_file = await save_group_chat_file(file=file)
         return {
-            "filePath": file_path,
+            "filePath": stored_file.path,
             "fileName": file.filename,
-            "fileSize": file.size
+            "fileSize": stored_file.size,
+            "thumbnails": get_derivative_paths(stored_file.path)
         }
     return HTTPException(status_code=403, detail="Teacher can't use group chat")
 
@@ -234,41 +280,71 @@ async def attach_file_to_chat(
 @router.delete("/group-chat/delete-file")
 async def delete_file_from_chat(
         file_path: str,
-        user: User = Depends(get_current_user)
+        user: Principal = Depends(get_current_user)
 ):
     if user.student or user.curator or user.moder:
-        return delete_file(file_path=file_path)
+        if not is_blob_path(file_path):
+            raise HTTPException(status_code=404, detail="File not found")
+        return await delete_file(file_path=file_path)
     return HTTPException(status_code=403, detail="Teacher can't use group chat")
 
 
 @router.post("/read-message/{message_id}")
 async def read_chat_message(
         message_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    return update_message_read_by_db(db=db, message_id=message_id, user_id=user.id)
+    receipt = await create_message_read_receipt_db(db=db, message_id=message_id, user_id=user.id)
+    if receipt is None:
+        raise HTTPException(status_code=404, detail="Message not found")
+    return receipt
 
 
 @router.post("/read-answer/{answer_id}")
 async def read_chat_answer(
         answer_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    return update_answer_read_by_db(db=db, answer_id=answer_id, user_id=user.id)
+    receipt = await create_answer_read_receipt_db(db=db, answer_id=answer_id, user_id=user.id)
+    if receipt is None:
+        raise HTTPException(status_code=404, detail="Answer not found")
+    return receipt
+
+
+@router.post("/read-messages/{group_name}/{last_message_id}")
+async def read_chat_messages(
+        group_name: str,
+        last_message_id: int,
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
+):
+    group_id = await select_group_by_name_db(db=db, group_name=group_name)
+    await mark_messages_read_db(db=db, group_id=group_id, user_id=user.id, last_message_id=last_message_id)
+    return await select_unread_count_db(db=db, group_id=group_id, user_id=user.id)
+
+
+@router.get("/unread-messages/{group_name}")
+async def get_unread_messages_count(
+        group_name: str,
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
+):
+    group_id = await select_group_by_name_db(db=db, group_name=group_name)
+    return await select_unread_count_db(db=db, group_id=group_id, user_id=user.id)
 
 
 @router.get("/next-messages/{group_name}/{last_message_id}")
 async def get_chat_messages(
         group_name: str,
         last_message_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    group_id = select_group_by_name_db(db=db, group_name=group_name)
+    group_id = await select_group_by_name_db(db=db, group_name=group_name)
 
-    messages_obj = select_messages_by_pagination_db(
+    messages_obj = await select_messages_by_pagination_db(
         db=db,
         group_id=group_id,
         recipient_id=user.id,
@@ -277,3 +353,10 @@ async def get_chat_messages(
 
     result = set_last_messages_dict(messages_obj=messages_obj)
     return result
+
+
+@router.get("/group-chat/delivery-metrics")
+async def get_delivery_metrics(user: Principal = Depends(get_current_user)):
+    if user.moder:
+        return manager.metrics.summary()
+    raise HTTPException(status_code=403, detail="Permission denied")
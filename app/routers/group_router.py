@@ -1,15 +1,16 @@
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.group_crud import (create_group_db, select_group_by_id_db, select_groups_by_curator_id_db,
-                                 select_groups_by_specialization_id_db, select_groups_db, update_group_db)
-from app.models import User
+                                 select_groups_by_specialization_id_db, update_group_db)
 from app.schemas.group_schemas import Group as GroupBase
 from app.schemas.group_schemas import GroupCreate, GroupUpdate
 from app.session import get_db
-from app.utils.token import get_current_user
+from app.utils.catalogue_cache import GROUPS_TAG, get_cached_groups, invalidate_catalogue
+from app.utils.schedule import invalidate_schedules
+from app.utils.token import Principal, get_current_user
 
 router = APIRouter()
 
@@ -17,11 +18,12 @@ router = APIRouter()
 @router.post("/group/create", response_model=GroupBase)
 async def create_group(
         group_data: GroupCreate,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher or user.moder:
-        new_group = create_group_db(db=db, group_data=group_data)
+        new_group = await create_group_db(db=db, group_data=group_data)
+        await invalidate_catalogue(GROUPS_TAG)
         return new_group
     else:
         raise HTTPException(
@@ -33,12 +35,14 @@ async def create_group(
 async def update_group(
         group_id: int,
         group_data: GroupUpdate,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher or user.moder:
-        group = select_group_by_id_db(db=db, group_id=group_id)
-        update_group_db(db=db, group_data=group_data, group=group)
+        group = await select_group_by_id_db(db=db, group_id=group_id)
+        await update_group_db(db=db, group_data=group_data, group=group)
+        await invalidate_catalogue(GROUPS_TAG)
+        await invalidate_schedules()
         return {"massage": "Group have been successful updated"}
     else:
         raise HTTPException(
@@ -48,38 +52,38 @@ async def update_group(
 
 @router.get("/groups", response_model=List[GroupBase])
 async def get_groups(
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    groups = select_groups_db(db=db)
+    groups = await get_cached_groups(db=db)
     return groups
 
 
 @router.get("/group/{group_id}", response_model=GroupBase)
 async def get_group_by_id(
         group_id: int,
-        db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        current_user: Principal = Depends(get_current_user)
 ):
-    group = select_group_by_id_db(db=db, group_id=group_id)
+    group = await select_group_by_id_db(db=db, group_id=group_id)
     return group
 
 
 @router.get("/group/curator/{curator_id}")
 async def get_groups_by_curator_id(
         curator_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    groups = select_groups_by_curator_id_db(db=db, curator_id=curator_id)
+    groups = await select_groups_by_curator_id_db(db=db, curator_id=curator_id)
     return groups
 
 
 @router.get("/group/specialization/{specialization_id}")
 async def get_groups_by_specialization_id(
         specialization_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    groups = select_groups_by_specialization_id_db(db=db, specialization_id=specialization_id)
+    groups = await select_groups_by_specialization_id_db(db=db, specialization_id=specialization_id)
     return groups
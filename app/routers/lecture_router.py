@@ -1,21 +1,21 @@
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.celery import confirm_lecture_in_journal
 from app.crud.lecture_crud import (check_lecture_db, create_attribute_base_db, create_attribute_file_db,
                                    create_attribute_file_with_description_db, create_attribute_link_db,
                                    create_lecture_db, delete_attribute_db, delete_attribute_file_db,
                                    delete_attribute_link_db, get_attribute_db, get_attribute_file_by_path_db,
-                                   get_attribute_file_db, get_attribute_link_db, get_lecture_db, update_attribute_db)
-from app.models import User
+                                   get_attribute_file_db, get_attribute_link_db, update_attribute_db)
 from app.schemas.lecture_schemas import (AttributeBase, AttributeFile, AttributeFiles, AttributeHomeWork,
                                          AttributeImages, AttributeLinks, UpdateAttributeBase, UpdateAttributeFile,
                                          UpdateAttributeFiles, UpdateAttributeHomeWork, UpdateAttributeImages,
                                          UpdateAttributeLinks)
 from app.session import get_db
-from app.utils.lesson_utils import get_lecture_attributes_info, get_lesson_base_info
+from app.utils.etag import etag_matches
+from app.utils.journal_writer import journal_writer
+from app.utils.lecture_cache import get_lecture_page, invalidate_lecture_page, invalidate_lecture_page_by_lecture
 from app.utils.save_images import delete_file, save_lesson_file
-from app.utils.token import get_current_user
+from app.utils.token import Principal, get_current_user
 
 router = APIRouter()
 
@@ -23,11 +23,13 @@ router = APIRouter()
 @router.post("/lecture/create")
 async def create_lecture(
         lesson_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher or user.moder:
-        return create_lecture_db(db=db, lesson_id=lesson_id)
+        lecture = await create_lecture_db(db=db, lesson_id=lesson_id)
+        await invalidate_lecture_page(lesson_id)
+        return lecture
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
 
@@ -35,11 +37,11 @@ async def create_lecture(
 @router.post("/lecture/upload/file")
 async def upload_lecture_file(
         file: UploadFile = File(...),
-        user: User = Depends(get_current_user)
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher or user.moder:
-        filepath = save_lesson_file(file)
-        return {"fileName": file.filename, "filePath": filepath, "fileSize": file.size}
+        stored_file = await save_lesson_file(file)
+        return {"fileName": file.filename, "filePath": stored_file.path, "fileSize": stored_file.size}
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
 
@@ -47,22 +49,23 @@ async def upload_lecture_file(
 @router.delete("/lecture/delete/section")
 async def delete_attribute(
         attribute_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher or user.moder:
-        attribute = get_attribute_db(db=db, attr_id=attribute_id)
+        attribute = await get_attribute_db(db=db, attr_id=attribute_id)
 
         if attribute.lecture_file:
             for file in attribute.lecture_file:
-                delete_file(file.file_path)
-                delete_attribute_file_db(db=db, file=file)
+                await delete_file(file.file_path)
+                await delete_attribute_file_db(db=db, file=file)
 
         if attribute.lecture_link:
             for link in attribute.lecture_link:
-                delete_attribute_link_db(db=db, link=link)
+                await delete_attribute_link_db(db=db, link=link)
 
-        delete_attribute_db(db=db, attribute=attribute)
+        await delete_attribute_db(db=db, attribute=attribute)
+        await invalidate_lecture_page_by_lecture(db=db, lecture_id=attribute.lecture_id)
         return {"message": "Section have been deleted"}
 
     else:
@@ -72,13 +75,15 @@ async def delete_attribute(
 @router.delete("/lecture/delete/section-file")
 async def delete_attribute_file(
         file_path: str,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher or user.moder:
-        file = get_attribute_file_by_path_db(db=db, file_path=file_path)
-        delete_file(file.file_path)
-        delete_attribute_file_db(db=db, file=file)
+        file = await get_attribute_file_by_path_db(db=db, file_path=file_path)
+        attribute = await get_attribute_db(db=db, attr_id=file.lecture_attribute_id)
+        await delete_file(file.file_path)
+        await delete_attribute_file_db(db=db, file=file)
+        await invalidate_lecture_page_by_lecture(db=db, lecture_id=attribute.lecture_id)
         return {"message": "File have been deleted"}
     else:
         HTTPException(status_code=403, detail="Permission denied")
@@ -88,11 +93,11 @@ async def delete_attribute_file(
 async def create_text_attribute(
         lecture_id: int,
         item: AttributeBase,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher or user.moder:
-        create_attribute_base_db(
+        await create_attribute_base_db(
             db=db,
             lecture_id=lecture_id,
             attr_type=item.attributeType,
@@ -101,6 +106,7 @@ async def create_text_attribute(
             attr_number=item.attributeNumber,
             hided=item.hided
         )
+        await invalidate_lecture_page_by_lecture(db=db, lecture_id=lecture_id)
         return {"message": "Attribute have been saved"}
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
@@ -110,12 +116,12 @@ async def create_text_attribute(
 async def update_text_attribute(
         attribute_id: int,
         item: UpdateAttributeBase,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher or user.moder:
-        attribute = get_attribute_db(db=db, attr_id=attribute_id)
-        update_attribute_db(
+        attribute = await get_attribute_db(db=db, attr_id=attribute_id)
+        await update_attribute_db(
             db=db,
             attribute=attribute,
             title=item.attributeTitle,
@@ -123,6 +129,7 @@ async def update_text_attribute(
             number=item.attributeNumber,
             hided=item.hided
         )
+        await invalidate_lecture_page_by_lecture(db=db, lecture_id=attribute.lecture_id)
         return {"message": "Attribute have been updated"}
 
 
@@ -130,11 +137,11 @@ async def update_text_attribute(
 async def create_file_attribute(
         lecture_id: int,
         item: AttributeFile,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher or user.moder:
-        attribute = create_attribute_base_db(
+        attribute = await create_attribute_base_db(
             db=db,
             lecture_id=lecture_id,
             attr_type=item.attributeType,
@@ -144,7 +151,7 @@ async def create_file_attribute(
             hided=item.hided
         )
 
-        create_attribute_file_db(
+        await create_attribute_file_db(
             db=db,
             attribute_id=attribute.id,
             filename=item.fileName,
@@ -152,6 +159,7 @@ async def create_file_attribute(
             file_path=item.filePath,
             download_allowed=item.downloadAllowed
         )
+        await invalidate_lecture_page_by_lecture(db=db, lecture_id=lecture_id)
         return {"message": "Attribute have been saved"}
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
@@ -161,12 +169,12 @@ async def create_file_attribute(
 async def update_file_attribute(
         attribute_id: int,
         item: UpdateAttributeFile,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher or user.moder:
-        attribute = get_attribute_db(db=db, attr_id=attribute_id)
-        update_attribute_db(
+        attribute = await get_attribute_db(db=db, attr_id=attribute_id)
+        await update_attribute_db(
             db=db,
             attribute=attribute,
             title=item.attributeTitle,
@@ -175,11 +183,11 @@ async def update_file_attribute(
             hided=item.hided
         )
 
-        file = get_attribute_file_db(db=db, file_id=attribute.lecture_file[0].id)
-        delete_file(attribute.lecture_file[0].file_path)
-        delete_attribute_file_db(db=db, file=file)
+        file = await get_attribute_file_db(db=db, file_id=attribute.lecture_file[0].id)
+        await delete_file(attribute.lecture_file[0].file_path)
+        await delete_attribute_file_db(db=db, file=file)
 
-        create_attribute_file_db(
+        await create_attribute_file_db(
             db=db,
             attribute_id=attribute.id,
             filename=item.fileName,
@@ -188,6 +196,7 @@ async def update_file_attribute(
             download_allowed=item.downloadAllowed
         )
 
+        await invalidate_lecture_page_by_lecture(db=db, lecture_id=attribute.lecture_id)
         return {"message": "Attribute have been updated"}
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
@@ -197,11 +206,11 @@ async def update_file_attribute(
 async def create_files_attribute(
         lecture_id: int,
         item: AttributeFiles,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher or user.moder:
-        attribute = create_attribute_base_db(
+        attribute = await create_attribute_base_db(
             db=db,
             lecture_id=lecture_id,
             attr_type=item.attributeType,
@@ -212,7 +221,7 @@ async def create_files_attribute(
         )
 
         for file in item.attributeFiles:
-            create_attribute_file_db(
+            await create_attribute_file_db(
                 db=db,
                 attribute_id=attribute.id,
                 filename=file.fileName,
@@ -221,6 +230,7 @@ async def create_files_attribute(
                 download_allowed=file.downloadAllowed,
             )
 
+        await invalidate_lecture_page_by_lecture(db=db, lecture_id=lecture_id)
         return {"message": "Attribute have been saved"}
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
@@ -230,12 +240,12 @@ async def create_files_attribute(
 async def update_files_attribute(
         attribute_id: int,
         item: UpdateAttributeFiles,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher or user.moder:
-        attribute = get_attribute_db(db=db, attr_id=attribute_id)
-        update_attribute_db(
+        attribute = await get_attribute_db(db=db, attr_id=attribute_id)
+        await update_attribute_db(
             db=db,
             attribute=attribute,
             title=item.attributeTitle,
@@ -245,11 +255,11 @@ async def update_files_attribute(
         )
 
         for att_file in attribute.lecture_file:
-            file = get_attribute_file_db(db=db, file_id=att_file.id)
-            delete_attribute_file_db(db=db, file=file)
+            file = await get_attribute_file_db(db=db, file_id=att_file.id)
+            await delete_attribute_file_db(db=db, file=file)
 
         for file in item.attributeFiles:
-            create_attribute_file_db(
+            await create_attribute_file_db(
                 db=db,
                 attribute_id=attribute.id,
                 filename=file.fileName,
@@ -258,6 +268,7 @@ async def update_files_attribute(
                 download_allowed=file.downloadAllowed,
             )
 
+        await invalidate_lecture_page_by_lecture(db=db, lecture_id=attribute.lecture_id)
         return {"message": "Attribute have been saved"}
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
@@ -267,11 +278,11 @@ async def update_files_attribute(
 async def create_images_attribute(
         lecture_id: int,
         item: AttributeImages,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher or user.moder:
-        attribute = create_attribute_base_db(
+        attribute = await create_attribute_base_db(
             db=db,
             lecture_id=lecture_id,
             attr_type=item.attributeType,
@@ -282,7 +293,7 @@ async def create_images_attribute(
         )
 
         for image in item.attributeImages:
-            create_attribute_file_with_description_db(
+            await create_attribute_file_with_description_db(
                 db=db,
                 attribute_id=attribute.id,
                 filename=image.imageName,
@@ -291,6 +302,7 @@ async def create_images_attribute(
                 file_description=image.imageDescription,
                 download_allowed=image.downloadAllowed,
             )
+        await invalidate_lecture_page_by_lecture(db=db, lecture_id=lecture_id)
         return {"message": "Attribute have been saved"}
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
@@ -300,12 +312,12 @@ async def create_images_attribute(
 async def update_images_attribute(
         attribute_id: int,
         item: UpdateAttributeImages,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher or user.moder:
-        attribute = get_attribute_db(db=db, attr_id=attribute_id)
-        update_attribute_db(
+        attribute = await get_attribute_db(db=db, attr_id=attribute_id)
+        await update_attribute_db(
             db=db,
             attribute=attribute,
             title=item.attributeTitle,
@@ -315,11 +327,11 @@ async def update_images_attribute(
         )
 
         for att_file in attribute.lecture_file:
-            file = get_attribute_file_db(db=db, file_id=att_file.id)
-            delete_attribute_file_db(db=db, file=file)
+            file = await get_attribute_file_db(db=db, file_id=att_file.id)
+            await delete_attribute_file_db(db=db, file=file)
 
         for image in item.attributeImages:
-            create_attribute_file_with_description_db(
+            await create_attribute_file_with_description_db(
                 db=db,
                 attribute_id=attribute.id,
                 filename=image.imageName,
@@ -328,6 +340,7 @@ async def update_images_attribute(
                 file_description=image.imageDescription,
                 download_allowed=image.downloadAllowed,
             )
+        await invalidate_lecture_page_by_lecture(db=db, lecture_id=attribute.lecture_id)
         return {"message": "Attribute have been saved"}
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
@@ -337,11 +350,11 @@ async def update_images_attribute(
 async def create_link_attribute(
         lecture_id: int,
         item: AttributeLinks,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher or user.moder:
-        attribute = create_attribute_base_db(
+        attribute = await create_attribute_base_db(
             db=db,
             lecture_id=lecture_id,
             attr_type=item.attributeType,
@@ -352,8 +365,9 @@ async def create_link_attribute(
         )
 
         for link in item.attributeLinks:
-            create_attribute_link_db(db=db, link=link.link, anchor=link.anchor, attribute_id=attribute.id)
+            await create_attribute_link_db(db=db, link=link.link, anchor=link.anchor, attribute_id=attribute.id)
 
+        await invalidate_lecture_page_by_lecture(db=db, lecture_id=lecture_id)
         return {"message": "Attribute have been saved"}
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
@@ -363,12 +377,12 @@ async def create_link_attribute(
 async def update_link_attribute(
         attribute_id: int,
         item: UpdateAttributeLinks,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher or user.moder:
-        attribute = get_attribute_db(db=db, attr_id=attribute_id)
-        update_attribute_db(
+        attribute = await get_attribute_db(db=db, attr_id=attribute_id)
+        await update_attribute_db(
             db=db,
             attribute=attribute,
             title=item.attributeTitle,
@@ -378,12 +392,13 @@ async def update_link_attribute(
         )
 
         for attr_link in attribute.lecture_link:
-            link = get_attribute_link_db(db=db, link_id=attr_link.id)
-            delete_attribute_link_db(db=db, link=link)
+            link = await get_attribute_link_db(db=db, link_id=attr_link.id)
+            await delete_attribute_link_db(db=db, link=link)
 
         for new_link in item.attributeLinks:
-            create_attribute_link_db(db=db, attribute_id=attribute.id, link=new_link.link, anchor=new_link.anchor)
+            await create_attribute_link_db(db=db, attribute_id=attribute.id, link=new_link.link, anchor=new_link.anchor)
 
+        await invalidate_lecture_page_by_lecture(db=db, lecture_id=attribute.lecture_id)
         return {"message": "Attribute have been saved"}
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
@@ -393,11 +408,11 @@ async def update_link_attribute(
 async def create_homework_attribute(
         lecture_id: int,
         item: AttributeHomeWork,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher or user.moder:
-        attribute = create_attribute_base_db(
+        attribute = await create_attribute_base_db(
             db=db,
             lecture_id=lecture_id,
             attr_type=item.attributeType,
@@ -409,7 +424,7 @@ async def create_homework_attribute(
 
         if item.attributeFiles:
             for file in item.attributeFiles:
-                create_attribute_file_db(
+                await create_attribute_file_db(
                     db=db,
                     filename=file.fileName,
                     file_path=file.filePath,
@@ -420,13 +435,14 @@ async def create_homework_attribute(
 
         if item.attributeLinks:
             for link in item.attributeLinks:
-                create_attribute_link_db(
+                await create_attribute_link_db(
                     db=db,
                     link=link.link,
                     anchor=link.anchor,
                     attribute_id=attribute.id
                 )
 
+        await invalidate_lecture_page_by_lecture(db=db, lecture_id=lecture_id)
         return {"message": "Attribute have been saved"}
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
@@ -436,12 +452,12 @@ async def create_homework_attribute(
 async def update_homework_attribute(
         attribute_id: int,
         item: UpdateAttributeHomeWork,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher or user.moder:
-        attribute = get_attribute_db(db=db, attr_id=attribute_id)
-        update_attribute_db(
+        attribute = await get_attribute_db(db=db, attr_id=attribute_id)
+        await update_attribute_db(
             db=db,
             attribute=attribute,
             title=item.attributeTitle,
@@ -452,11 +468,11 @@ async def update_homework_attribute(
 
         if item.attributeLinks:
             for attr_link in attribute.lecture_link:
-                link = get_attribute_link_db(db=db, link_id=attr_link.id)
-                delete_attribute_link_db(db=db, link=link)
+                link = await get_attribute_link_db(db=db, link_id=attr_link.id)
+                await delete_attribute_link_db(db=db, link=link)
 
             for new_link in item.attributeLinks:
-                create_attribute_link_db(
+                await create_attribute_link_db(
                     db=db,
                     attribute_id=attribute.id,
                     link=new_link.link,
@@ -465,11 +481,11 @@ async def update_homework_attribute(
 
         if item.attributeFiles:
             for attr_file in attribute.lecture_file:
-                file = get_attribute_file_db(db=db, file_id=attr_file.id)
-                delete_attribute_file_db(db=db, file=file)
+                file = await get_attribute_file_db(db=db, file_id=attr_file.id)
+                await delete_attribute_file_db(db=db, file=file)
 
             for new_file in item.attributeFiles:
-                create_attribute_file_db(
+                await create_attribute_file_db(
                     db=db,
                     attribute_id=attribute.id,
                     filename=new_file.fileName,
@@ -478,6 +494,7 @@ async def update_homework_attribute(
                     download_allowed=new_file.downloadAllowed
                 )
 
+        await invalidate_lecture_page_by_lecture(db=db, lecture_id=attribute.lecture_id)
         return {"message": "Attribute have been saved"}
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
@@ -486,28 +503,34 @@ async def update_homework_attribute(
 @router.get("/lecture/{lesson_id}")
 async def get_lecture_data(
         lesson_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    base_info = get_lesson_base_info(db=db, lesson_id=lesson_id)
-    lecture = get_lecture_db(db=db, lesson_id=lesson_id)
+    page = await get_lecture_page(db=db, lesson_id=lesson_id)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Lesson not found")
 
-    if lecture is not None:
-        return get_lecture_attributes_info(base_info=base_info, lecture=lecture)
-    else:
-        return base_info
+    lecture_info, etag = page
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request=request, etag=etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return lecture_info
 
 
 @router.post("/confirm")
 async def config_lecture(
         lecture_id: int,
         student_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.student:
-        check_lecture_db(db=db, lecture_id=lecture_id, student_id=student_id)
-        confirm_lecture_in_journal.delay(student_id=student_id, lecture_id=lecture_id)
+        await check_lecture_db(db=db, lecture_id=lecture_id, student_id=student_id)
+        journal_writer.lecture_viewed(student_id=student_id, lecture_id=lecture_id)
         return {"message": "Lecture have been viewed"}
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
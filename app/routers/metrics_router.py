@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.utils.response_cache import response_cache
+from app.utils.token import Principal, get_current_user
+
+router = APIRouter()
+
+
+@router.get("/metrics/cache")
+async def get_cache_metrics(user: Principal = Depends(get_current_user)):
+    if not user.moder:
+        raise HTTPException(status_code=403, detail="Permission denied")
+    return response_cache.stats()
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.module_crud import (create_module_db, delete_module_db, select_module_by_id_db,
-                                  select_modules_by_subject_id_db, select_modules_db, update_module_db)
-from app.models import User
+                                  select_modules_by_subject_id_db, update_module_db)
 from app.schemas.module_schemas import CreateModule, UpdateModule
 from app.session import get_db
-from app.utils.token import get_current_user
+from app.utils.catalogue_cache import MODULES_TAG, get_cached_modules, invalidate_catalogue
+from app.utils.subject_cache import invalidate_subject_tapes
+from app.utils.token import Principal, get_current_user
 
 router = APIRouter()
 
@@ -14,11 +15,13 @@ router = APIRouter()
 @router.post("/module/create")
 async def create_module(
         module: CreateModule,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.moder or user.teacher:
-        new_module = create_module_db(db=db, module=module)
+        new_module = await create_module_db(db=db, module=module)
+        await invalidate_subject_tapes(new_module.subject_id)
+        await invalidate_catalogue(MODULES_TAG)
         return new_module
     else:
         raise HTTPException(
@@ -31,14 +34,18 @@ async def create_module(
 async def update_module(
         module_id: int,
         module_data: UpdateModule,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.moder or user.teacher:
-        module = select_module_by_id_db(db=db, module_id=module_id)
+        module = await select_module_by_id_db(db=db, module_id=module_id)
         if not module:
             raise HTTPException(status_code=404, detail="Module not found")
-        return update_module_db(db=db, module=module, module_data=module_data)
+        subject_id = module.subject_id
+        module = await update_module_db(db=db, module=module, module_data=module_data)
+        await invalidate_subject_tapes(subject_id, module.subject_id)
+        await invalidate_catalogue(MODULES_TAG)
+        return module
     else:
         raise HTTPException(
             status_code=403,
@@ -48,11 +55,11 @@ async def update_module(
 
 @router.get("/modules")
 async def get_modules(
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher or user.moder or user.student:
-        modules = select_modules_db(db=db)
+        modules = await get_cached_modules(db=db)
         if not modules:
             raise HTTPException(status_code=404, detail="Modules not found")
         return {"modules": modules}
@@ -66,11 +73,11 @@ async def get_modules(
 @router.get("/module/{module_id}")
 async def get_module(
         module_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher or user.moder or user.student:
-        module = select_module_by_id_db(db=db, module_id=module_id)
+        module = await select_module_by_id_db(db=db, module_id=module_id)
         if not module:
             raise HTTPException(status_code=404, detail="Module not found")
         return module
@@ -84,11 +91,11 @@ async def get_module(
 @router.get("/module/subject/{subject_id}")
 async def get_modules_by_subject(
         subject_id: int,
-        db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        current_user: Principal = Depends(get_current_user)
 ):
     if current_user.teacher or current_user.moder:
-        modules = select_modules_by_subject_id_db(db=db, subject_id=subject_id)
+        modules = await select_modules_by_subject_id_db(db=db, subject_id=subject_id)
         if not modules:
             raise HTTPException(status_code=404, detail="Modules not found")
         return {"modules": modules}
@@ -102,14 +109,16 @@ async def get_modules_by_subject(
 @router.delete("/module/{module_id}/delete")
 async def delete_module(
         module_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.moder or user.teacher:
-        module = select_module_by_id_db(db=db, module_id=module_id)
+        module = await select_module_by_id_db(db=db, module_id=module_id)
         if not module:
             raise HTTPException(status_code=404, detail="Module not found")
-        delete_module_db(db=db, module=module)
+        await delete_module_db(db=db, module=module)
+        await invalidate_subject_tapes(module.subject_id)
+        await invalidate_catalogue(MODULES_TAG)
         return {"massage": "Module have been successful deleted"}
     else:
         raise HTTPException(
@@ -1,7 +1,12 @@
+import logging
 import random
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
+from app.utils.connection_registry import ConnectionRegistry
+
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
@@ -13,53 +18,23 @@ async def generate_uuid():
 
 class RoomConnectionManager:
     def __init__(self):
-        self.websocket_connections = []
-
-    def initialize_room(self, room_id):
-        for connection in self.websocket_connections:
-            if room_id in connection:
-                return
-
-        room_data = {
-            room_id: [],
-            "room_connection": []
-        }
-        self.websocket_connections.append(room_data)
+        self.websocket_connections = ConnectionRegistry()
 
     def add_new_user(self, room_id: int, user_id: int, websocket: WebSocket):
-        for connection in self.websocket_connections:
-            if room_id in connection:
-                connection[room_id].append(
-                    {
-                        "userId": user_id,
-                        "websocket": websocket
-                    }
-                )
-                connection["room_connection"].append(user_id)
-                return
+        self.websocket_connections.add(room_id, user_id, websocket)
 
     def remove_user(self, room_id: int, websocket: WebSocket):
-        for connection in self.websocket_connections:
-            if room_id in connection:
-                for user in connection[room_id]:
-                    if user["websocket"] == websocket:
-                        user_id = user["userId"]
-                        connection[room_id].remove(user)
-                        connection["room_connection"].remove(user_id)
-                        return
+        self.websocket_connections.remove(websocket)
 
     async def send_list_user(self, room_id: int, user_id: int):
-        for connection in self.websocket_connections:
-            if room_id in connection:
-                connection_list = [conn_id for conn_id in connection["room_connection"] if conn_id != user_id]
-                for user in connection[room_id]:
-                    if user["userId"] == user_id:
-                        await user["websocket"].send_json(
-                            {
-                                "eventType": "all users",
-                                "data": connection_list
-                            }
-                        )
+        connection_list = [conn_id for conn_id in self.websocket_connections.room_users(room_id) if conn_id != user_id]
+        for websocket in self.websocket_connections.user_connections(room_id, user_id):
+            await websocket.send_json(
+                {
+                    "eventType": "all users",
+                    "data": connection_list
+                }
+            )
 
     async def send_offer(
             self,
@@ -68,20 +43,16 @@ class RoomConnectionManager:
             recipient: int,
             signal: dict
     ):
-        for connection in self.websocket_connections:
-            if room_id in connection:
-                for user in connection[room_id]:
-                    if user["userId"] == recipient:
-                        await user["websocket"].send_json(
-                            {
-                                "eventType": "user joined",
-                                "data": {
-                                    "callerId": sender,
-                                    "signal": signal
-                                }
-                            }
-                        )
-                        break
+        for websocket in self.websocket_connections.user_connections(room_id, recipient)[:1]:
+            await websocket.send_json(
+                {
+                    "eventType": "user joined",
+                    "data": {
+                        "callerId": sender,
+                        "signal": signal
+                    }
+                }
+            )
 
     async def send_answer(
             self,
@@ -90,20 +61,16 @@ class RoomConnectionManager:
             recipient: int,
             signal: dict
     ):
-        for connection in self.websocket_connections:
-            if room_id in connection:
-                for user in connection[room_id]:
-                    if user["userId"] == recipient:
-                        await user["websocket"].send_json(
-                            {
-                                "eventType": "receiving returned signal",
-                                "data": {
-                                    "id": sender,
-                                    "signal": signal
-                                }
-                            }
-                        )
-                        break
+        for websocket in self.websocket_connections.user_connections(room_id, recipient)[:1]:
+            await websocket.send_json(
+                {
+                    "eventType": "receiving returned signal",
+                    "data": {
+                        "id": sender,
+                        "signal": signal
+                    }
+                }
+            )
 
 
 manager = RoomConnectionManager()
@@ -114,8 +81,6 @@ async def connect_to_room(
        websocket: WebSocket,
        room_id: int
 ):
-    manager.initialize_room(room_id=room_id)
-
     try:
         await websocket.accept()
 
@@ -141,12 +106,9 @@ async def connect_to_room(
             else:
                 await websocket.send_text("Wrong eventType")
 
-            print(manager.websocket_connections)
-
     except WebSocketDisconnect as e:
-        print(f"Ошибка {e}")
-        manager.remove_user(room_id=room_id, websocket=websocket)
-        print(manager.websocket_connections)
+        logger.debug("Room %s socket disconnected with code %s", room_id, e.code)
 
     finally:
+        manager.remove_user(room_id=room_id, websocket=websocket)
         await websocket.close()
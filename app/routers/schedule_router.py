@@ -0,0 +1,76 @@
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.user_crud import increment_calendar_token_version_db, select_calendar_token_version_db
+from app.session import get_db
+from app.setting import CALENDAR_FUTURE_DAYS, CALENDAR_PAST_DAYS
+from app.utils.etag import etag_matches, make_etag
+from app.utils.ical import build_calendar
+from app.utils.schedule import get_user_schedule, resolve_schedule_range
+from app.utils.token import Principal, create_calendar_token, get_calendar_user, get_current_user
+
+router = APIRouter()
+
+
+@router.get("/schedule")
+async def get_my_schedule(
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
+):
+    date_from, date_to = resolve_schedule_range(date_from=date_from, date_to=date_to)
+    return await get_user_schedule(db=db, user=user, date_from=date_from, date_to=date_to)
+
+
+def build_calendar_link(request: Request, user: Principal, version: int) -> dict:
+    token = create_calendar_token(user=user, version=version)
+    url = request.url_for("get_schedule_calendar").include_query_params(token=token)
+    return {"url": str(url)}
+
+
+@router.get("/schedule/calendar-link")
+async def get_calendar_link(
+        request: Request,
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
+):
+    version = await select_calendar_token_version_db(db=db, user_id=user.id)
+    return build_calendar_link(request=request, user=user, version=version)
+
+
+@router.post("/schedule/calendar-link/reset")
+async def reset_calendar_link(
+        request: Request,
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
+):
+    version = await increment_calendar_token_version_db(db=db, user_id=user.id)
+    return build_calendar_link(request=request, user=user, version=version)
+
+
+@router.get("/schedule/calendar.ics")
+async def get_schedule_calendar(
+        request: Request,
+        token: str,
+        db: AsyncSession = Depends(get_db)
+):
+    user = await get_calendar_user(db=db, token=token)
+    today = datetime.now().date()
+    schedule = await get_user_schedule(
+        db=db,
+        user=user,
+        date_from=today - timedelta(days=CALENDAR_PAST_DAYS),
+        date_to=today + timedelta(days=CALENDAR_FUTURE_DAYS)
+    )
+
+    etag = make_etag(schedule)
+    headers = {"ETag": f"W/{etag}", "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    calendar = build_calendar(schedule=schedule, calendar_name=f"{user.username} schedule")
+    return Response(content=calendar, media_type="text/calendar", headers=headers)
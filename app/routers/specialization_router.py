@@ -1,16 +1,16 @@
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.specialization_crud import (create_specialization_db, delete_specialization_db,
-                                          select_specialization_by_id_db, select_specializations_by_course_id_db,
-                                          select_specializations_db, update_specialization_title_db)
-from app.models import User
+                                          select_specialization_by_id_db, update_specialization_title_db)
 from app.schemas.specialization_schemas import Specialization as SpecializationBase
 from app.schemas.specialization_schemas import SpecializationCreate
 from app.session import get_db
-from app.utils.token import get_current_user
+from app.utils.catalogue_cache import (SPECIALIZATIONS_TAG, get_cached_specializations,
+                                       get_cached_specializations_by_course, invalidate_catalogue)
+from app.utils.token import Principal, get_current_user
 
 router = APIRouter()
 
@@ -18,41 +18,44 @@ router = APIRouter()
 @router.post("/specialization/create")
 async def create_specialization(
         specialization_data: SpecializationCreate,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if not user.moder:
         raise HTTPException(
             status_code=403,
             detail="Only moderators can create a new specialization"
         )
-    return create_specialization_db(db=db, data=specialization_data)
+    specialization = await create_specialization_db(db=db, data=specialization_data)
+    await invalidate_catalogue(SPECIALIZATIONS_TAG)
+    return specialization
 
 
 @router.put("/specialization/{specialization_id}/update")
 async def update_specialization(
         specialization_id: int,
         title: str,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if not user.moder:
         raise HTTPException(
             status_code=403,
             detail="Only moderators can update specialization"
         )
-    specialization = select_specialization_by_id_db(db=db, spec_id=specialization_id)
-    update_specialization_title_db(db=db, title=title, specialization=specialization)
+    specialization = await select_specialization_by_id_db(db=db, spec_id=specialization_id)
+    await update_specialization_title_db(db=db, title=title, specialization=specialization)
+    await invalidate_catalogue(SPECIALIZATIONS_TAG)
     return {"message": "Title for specialization have been successful updated"}
 
 
 @router.get("/specializations", response_model=List[SpecializationBase])
 async def get_specializations(
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.moder or user.teacher:
-        specializations = select_specializations_db(db=db)
+        specializations = await get_cached_specializations(db=db)
         return specializations
     else:
         raise HTTPException(
@@ -64,11 +67,11 @@ async def get_specializations(
 @router.get("/specialization/{specialization_id}", response_model=SpecializationBase)
 async def get_specialization_by_id(
         specialization_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.moder or user.teacher:
-        specialization = select_specialization_by_id_db(db=db, spec_id=specialization_id)
+        specialization = await select_specialization_by_id_db(db=db, spec_id=specialization_id)
         return specialization
     else:
         raise HTTPException(
@@ -80,11 +83,11 @@ async def get_specialization_by_id(
 @router.get("/specializations/course/{course_id}", response_model=List[SpecializationBase])
 async def get_specialization_by_course_id(
         course_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.moder or user.teacher:
-        specializations = select_specializations_by_course_id_db(db=db, course_id=course_id)
+        specializations = await get_cached_specializations_by_course(db=db, course_id=course_id)
         return specializations
     else:
         raise HTTPException(
@@ -96,12 +99,13 @@ async def get_specialization_by_course_id(
 @router.delete("/specialization/delete")
 async def delete_specialization(
         specialization_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.moder or user.teacher:
-        specialization = select_specialization_by_id_db(db=db, spec_id=specialization_id)
-        delete_specialization_db(db=db, specialization=specialization)
+        specialization = await select_specialization_by_id_db(db=db, spec_id=specialization_id)
+        await delete_specialization_db(db=db, specialization=specialization)
+        await invalidate_catalogue(SPECIALIZATIONS_TAG)
         return {"massage": "Specialization have been successful deleted"}
     else:
         raise HTTPException(
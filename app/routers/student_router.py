@@ -1,28 +1,34 @@
+from datetime import date
+from typing import Optional
+
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud.lesson_crud import select_lesson_by_subject_db
-from app.crud.student_crud import get_student_info_db, get_student_schedule_db
-from app.crud.subject_crud import select_dop_subjects, select_subject_by_group_id_db
+from app.crud.lesson_crud import select_student_register_db, stream_student_register_db
+from app.crud.student_crud import get_student_info_db
 from app.crud.user_crud import (delete_student_db, delete_user_db, select_all_students_db, select_student_by_id_db,
                                 select_student_by_user_id_db, select_students_by_course_id_db,
                                 select_students_by_group_id_db, select_students_by_specializations_id_db,
                                 select_user_by_id_db, update_student_info_db, update_student_photo_path_db)
-from app.models import User
 from app.schemas.user_schemas import StudentUpdate
 from app.session import get_db
-from app.utils.save_images import save_student_avatar
-from app.utils.token import get_current_user
+from app.utils.group_cache import invalidate_group_students
+from app.utils.image_derivatives import get_derivative_paths
+from app.utils.save_images import release_replaced_file, save_student_avatar
+from app.utils.schedule import get_schedule, invalidate_schedules, resolve_schedule_range
+from app.utils.student_register import group_student_register, iterate_student_register_json
+from app.utils.token import Principal, get_current_user
 
 router = APIRouter()
 
 
 @router.get("/student/info/me")
 async def get_student_info(
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    user_info_list = get_student_info_db(db=db, user_id=user.id)
+    user_info_list = await get_student_info_db(db=db, user_id=user.id)
 
     field_list = [
         'student_id',
@@ -45,37 +51,46 @@ async def get_student_info(
 
 @router.get("/student/my/schedule")
 async def get_student_schedule(
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    result = get_student_schedule_db(db=db, student_id=user.student[0].id)
-    return result
+    if not user.student:
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+    date_from, date_to = resolve_schedule_range(date_from=date_from, date_to=date_to)
+    return await get_schedule(db=db, date_from=date_from, date_to=date_to, student_id=user.student_id)
 
 
 @router.put("/student/update/photo")
 async def update_student_avatar(
         file: UploadFile = File(...),
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if not user.student:
         raise HTTPException(status_code=403, detail="Only students can update their avatars")
 
-    student = select_student_by_user_id_db(db=db, user_id=user.id)
+    student = await select_student_by_user_id_db(db=db, user_id=user.id)
 
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
-    file_path = save_student_avatar(photo=file)
-    update_student_photo_path_db(
+    old_path = student.image_path
+    file_path = (await save_student_avatar(photo=file)).path
+    await update_student_photo_path_db(
         db=db,
         student=student,
         new_path=file_path
     )
+    await invalidate_group_students(student.group_id)
+    await release_replaced_file(old_path)
 
     return {
         "message": "Avatar updated successfully",
-        "photo_path": file_path
+        "photo_path": file_path,
+        "thumbnails": get_derivative_paths(file_path)
     }
 
 
@@ -83,19 +98,23 @@ async def update_student_avatar(
 async def update_student_info(
         student_id: int,
         student_data: StudentUpdate,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.student or user.moder or user.teacher:
-        student = select_student_by_user_id_db(db=db, user_id=student_id)
+        student = await select_student_by_user_id_db(db=db, user_id=student_id)
         if not student:
             raise HTTPException(status_code=404, detail="Student not found")
 
-        update_student_info_db(
+        group_id = student.group_id
+        await update_student_info_db(
             db=db,
             student=student,
             student_data=student_data
         )
+        await invalidate_group_students(group_id, student.group_id)
+        if student.group_id != group_id:
+            await invalidate_schedules()
 
         return {"message": "Student information updated successfully"}
     else:
@@ -107,20 +126,20 @@ async def update_student_info(
 
 @router.get("/students")
 async def get_students(
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    students = select_all_students_db(db=db)
+    students = await select_all_students_db(db=db)
     return {"students": students}
 
 
 @router.get("/student/{student_id}")
 async def get_student(
         student_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    student = select_student_by_id_db(db=db, student_id=student_id)
+    student = await select_student_by_id_db(db=db, student_id=student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     return student
@@ -129,10 +148,10 @@ async def get_student(
 @router.get("/students/course/{course_id}")
 async def get_students_in_course(
         course_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    students = select_students_by_course_id_db(db=db, course_id=course_id)
+    students = await select_students_by_course_id_db(db=db, course_id=course_id)
     if not students:
         raise HTTPException(status_code=404, detail="Students not found")
     return {"students": students}
@@ -141,10 +160,10 @@ async def get_students_in_course(
 @router.get("/students/group/{group_id}")
 async def get_students_in_group(
         group_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    students = select_students_by_group_id_db(db=db, group_id=group_id)
+    students = await select_students_by_group_id_db(db=db, group_id=group_id)
     if not students:
         raise HTTPException(status_code=404, detail="Students not found")
     return {"students": students}
@@ -153,9 +172,9 @@ async def get_students_in_group(
 @router.get("/students/specialization/{specialization_id}")
 async def get_students_in_specialization(
         specialization_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)):
-    students = select_students_by_specializations_id_db(db=db, specialization_id=specialization_id)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)):
+    students = await select_students_by_specializations_id_db(db=db, specialization_id=specialization_id)
     if not students:
         raise HTTPException(status_code=404, detail="Students not found")
     return {"students": students}
@@ -164,45 +183,35 @@ async def get_students_in_specialization(
 @router.delete("/student/{student_id}")
 async def delete_student(
         student_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    student = select_student_by_id_db(db=db, student_id=student_id)
+    student = await select_student_by_id_db(db=db, student_id=student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
-    user_data = select_user_by_id_db(db=db, user_id=student.user_id)
+    user_data = await select_user_by_id_db(db=db, user_id=student.user_id)
+    group_id = student.group_id
 
-    delete_student_db(db=db, student=student)
-    delete_user_db(db=db, user=user_data)
+    await delete_student_db(db=db, student=student)
+    await delete_user_db(db=db, user=user_data)
+    await invalidate_group_students(group_id)
     return {"massage": "Student has been successful deleted"}
 
 
 @router.get("/student/get-register/{student_id}")
 async def get_student_register(
         student_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        stream: bool = False,
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    student = select_student_by_id_db(db=db, student_id=student_id)
-    result = []
-    main_subjects = select_subject_by_group_id_db(db=db, group_id=student.group_id)
-    for subject in main_subjects:
-        lessons = select_lesson_by_subject_db(db=db, subject_id=subject.subject_id)
-        subject_register = {
-            "subjectId": subject.subject_id,
-            "subjectName": subject.subject_title,
-            "subjectLessons": lessons
-        }
-        result.append(subject_register)
-
-    dop_subjects = select_dop_subjects(db=db, student_id=student_id)
-    for subject in dop_subjects:
-        lessons = select_lesson_by_subject_db(db=db, subject_id=subject[0])
-        dop_subject_register = {
-            "dopSubjectId": subject[0],
-            "dopSubjectName": subject[1],
-            "dopSubjectLessons": lessons
-        }
-        result.append(dop_subject_register)
-
-    return result
+    student = await select_student_by_id_db(db=db, student_id=student_id)
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    if stream:
+        rows = stream_student_register_db(db=db, group_id=student.group_id, student_id=student_id)
+        return StreamingResponse(iterate_student_register_json(rows), media_type="application/json")
+
+    rows = await select_student_register_db(db=db, group_id=student.group_id, student_id=student_id)
+    return group_student_register(rows)
@@ -2,81 +2,127 @@ from typing import Dict, List
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from fastapi.websockets import WebSocket, WebSocketDisconnect, WebSocketState
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud.subject_chat_crud import (get_messages_for_subject_chat_by_pagination_db, select_last_answer_db,
-                                        select_last_message_db, select_message_by_id_db, select_recipient_by_message_id,
-                                        update_read_by_for_answer_db, update_read_by_for_message_db)
-from app.models import User
+from app.crud.subject_chat_crud import (create_answer_read_receipt_db, create_message_read_receipt_db,
+                                        get_messages_for_subject_chat_by_pagination_db, mark_messages_read_db,
+                                        select_last_answer_db, select_last_message_db, select_message_by_id_db,
+                                        select_recipient_by_message_id, select_unread_count_db)
 from app.session import get_db
+from app.utils.chat_broker import WORKER_ID, active_users_message, broker
+from app.utils.chat_delivery import ConnectionWriter, DeliveryMetrics, serialize_message
+from app.utils.connection_registry import ConnectionRegistry
+from app.utils.file_store import is_blob_path
+from app.utils.image_derivatives import get_derivative_paths
 from app.utils.save_images import delete_file, save_subject_chat_file
 from app.utils.subject_chat import (delete_answer_data_to_db, delete_message_data_to_db, get_data_about_latest_messages,
                                     save_answer_data_to_db, save_message_data_to_db, set_subject_chat_last_answer_dict,
                                     set_subject_chat_last_message_dict, set_subject_chat_last_messages_dict,
                                     update_answer_data_to_db, update_message_data_to_db)
-from app.utils.token import get_current_user
+from app.utils.token import Principal, get_current_user
 
 router = APIRouter()
 
 
 class ConnectionManager:
+    channel = "subject_chat"
+
     def __init__(self):
-        self.connections = {}
+        self.connections = ConnectionRegistry()
+        self.metrics = DeliveryMetrics()
+        self.subscribed = False
+
+    async def subscribe(self):
+        if not self.subscribed:
+            self.subscribed = True
+            await broker.subscribe(self.channel, self.deliver)
 
     @staticmethod
-    def create_connection(websocket: WebSocket, user: User):
-        connection = {"websocket": websocket, "user": user.id, "user_type": str(user.user_type.type)}
+    def create_connection(websocket: WebSocket, user: Principal):
+        connection = {"websocket": websocket, "user": user.id, "user_type": str(user.user_type)}
         return connection
 
     async def add_connection(self, subject_id: int, connection: Dict):
-        if subject_id not in self.connections:
-            self.connections[subject_id] = []
-        self.connections[subject_id].append(connection)
+        await self.subscribe()
+        connection["writer"] = ConnectionWriter(connection["websocket"], subject_id, self.metrics)
+        self.connections.add(subject_id, connection["user"], connection)
+        await broker.add_presence(self.channel, subject_id, connection["user"])
         await self.total_active_users(subject_id=subject_id)
 
     async def remove_connection(self, subject_id: int, connection: Dict):
-        if subject_id in self.connections:
-            self.connections[subject_id].remove(connection)
+        if self.connections.remove(connection):
+            connection["writer"].stop()
+            await broker.remove_presence(self.channel, subject_id, connection["user"])
             await self.total_active_users(subject_id=subject_id)
 
     async def check_user_connection(self, subject_id: int,  user_id: int):
-        if subject_id in self.connections:
-            for connection in self.connections[subject_id]:
-                if connection["user"] == user_id:
-                    await connection["websocket"].close()
+        await self.close_user_connections(subject_id=subject_id, user_id=user_id)
+        await self.publish(subject_id, "close", user_id=user_id)
+
+    async def close_user_connections(self, subject_id: int, user_id: int):
+        for connection in self.connections.user_connections(subject_id, user_id):
+            await connection["websocket"].close()
 
     async def total_active_users(self, subject_id: int):
-        total_json = {
-            "totalActive": len(self.connections[subject_id]),
-            "idsActiveUsers": [connection["user"] for connection in self.connections[subject_id]]
-        }
-        await self.send_message_to_everyone(subject_id=subject_id, message=total_json)
+        presence = await broker.get_presence(self.channel, subject_id)
+        await self.send_message_to_everyone(subject_id=subject_id, message=active_users_message(presence))
+
+    async def send_first_message(self, db: AsyncSession, connection: Dict, subject_id: int, user: Principal):
+        last_messages = await get_data_about_latest_messages(db=db, subject_id=subject_id, user=user)
+        await self.send_personal_message(connection=connection, message=last_messages)
 
     @staticmethod
-    async def send_first_message(db: Session, websocket: WebSocket, subject_id: int, user: User):
-        last_messages = get_data_about_latest_messages(db=db, subject_id=subject_id, user=user)
-        await websocket.send_json(last_messages)
+    async def send_personal_message(connection: Dict, message: Dict):
+        connection["writer"].push(serialize_message(message))
+
+    async def publish(self, subject_id: int, target: str, message: Dict = None, user_id: int = None,
+                      user_ids: List[int] = None):
+        event = {
+            "origin": WORKER_ID,
+            "room": subject_id,
+            "target": target,
+            "userId": user_id,
+            "userIds": user_ids,
+            "message": message
+        }
+        await broker.publish(self.channel, event)
+
+    async def deliver(self, event: Dict):
+        subject_id = event["room"]
+        if event["target"] == "everyone":
+            await self.deliver_to_everyone(subject_id=subject_id, message=event["message"])
+        elif event["target"] == "user":
+            await self.deliver_to_user(user_id=event["userId"], subject_id=subject_id, message=event["message"])
+        elif event["target"] == "users":
+            await self.deliver_to_users(user_ids=event["userIds"], subject_id=subject_id, message=event["message"])
+        elif event["target"] == "close" and event["origin"] != WORKER_ID:
+            await self.close_user_connections(subject_id=subject_id, user_id=event["userId"])
 
     async def send_message_to_user(self, user_id: int, subject_id: int, message: Dict):
-        if subject_id in self.connections:
-            for connection in self.connections[subject_id]:
-                if connection["user"] == user_id:
-                    await connection["websocket"].send_json(message)
+        await self.publish(subject_id, "user", message=message, user_id=user_id)
 
     async def send_message_to_users(self, user_ids: List[int], subject_id: int, message: Dict):
-        if subject_id in self.connections:
-            for connection in self.connections[subject_id]:
-                if connection["user"] in user_ids:
-                    await connection["websocket"].send_json(message)
+        await self.publish(subject_id, "users", message=message, user_ids=user_ids)
 
     async def send_message_to_everyone(self, subject_id: int, message: Dict):
-        if subject_id in self.connections:
-            for connection in self.connections[subject_id]:
-                if (connection["websocket"].application_state == WebSocketState.CONNECTED
-                        and connection["websocket"].client_state == WebSocketState.CONNECTED):
-                    await connection["websocket"].send_json(message)
-                else:
-                    continue
+        await self.publish(subject_id, "everyone", message=message)
+
+    async def deliver_to_user(self, user_id: int, subject_id: int, message: Dict):
+        text = serialize_message(message)
+        for connection in self.connections.user_connections(subject_id, user_id):
+            connection["writer"].push(text)
+
+    async def deliver_to_users(self, user_ids: List[int], subject_id: int, message: Dict):
+        text = serialize_message(message)
+        for connection in self.connections.users_connections(subject_id, user_ids):
+            connection["writer"].push(text)
+
+    async def deliver_to_everyone(self, subject_id: int, message: Dict):
+        text = serialize_message(message)
+        for connection in self.connections.room_connections(subject_id):
+            if (connection["websocket"].application_state == WebSocketState.CONNECTED
+                    and connection["websocket"].client_state == WebSocketState.CONNECTED):
+                connection["writer"].push(text)
 
 
 manager = ConnectionManager()
@@ -87,9 +133,10 @@ async def subject_chat_socket(
     subject_id: int,
     token: str,
     websocket: WebSocket,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = get_current_user(db=db, token=token)
+    user = await get_current_user(db=db, token=token)
+    connection = None
 
     try:
         await manager.check_user_connection(subject_id=subject_id, user_id=user.id)
@@ -97,23 +144,23 @@ async def subject_chat_socket(
         await websocket.accept()
         connection = manager.create_connection(websocket=websocket, user=user)
         await manager.add_connection(subject_id=subject_id, connection=connection)
-        await manager.send_first_message(db=db, websocket=websocket, subject_id=subject_id, user=user)
+        await manager.send_first_message(db=db, connection=connection, subject_id=subject_id, user=user)
 
         while True:
             data = await websocket.receive_json()
 
             if data.get("type") == "message":
-                save_message_data_to_db(db=db, subject_id=subject_id, data=data)
-                message_obj = select_last_message_db(db=db, subject_id=subject_id, sender_id=data.get("senderId"))
+                await save_message_data_to_db(db=db, subject_id=subject_id, data=data)
+                message_obj = await select_last_message_db(db=db, subject_id=subject_id, sender_id=data.get("senderId"))
                 message_to_send = set_subject_chat_last_message_dict(message_obj)
 
                 if data.get("messageType") == "alone":
-                    await websocket.send_json(message_to_send)
+                    await manager.send_personal_message(connection=connection, message=message_to_send)
                     await manager.send_message_to_user(user_id=data.get("recipient"), subject_id=subject_id,
                                                        message=message_to_send)
 
                 elif data.get("messageType") == "several":
-                    await websocket.send_json(message_to_send)
+                    await manager.send_personal_message(connection=connection, message=message_to_send)
                     await manager.send_message_to_users(user_ids=data.get("recipient"), subject_id=subject_id,
                                                         message=message_to_send)
 
@@ -121,18 +168,18 @@ async def subject_chat_socket(
                     await manager.send_message_to_everyone(subject_id=subject_id, message=message_to_send)
 
             elif data.get("type") == "answer":
-                save_answer_data_to_db(db=db, data=data)
-                answer_obj = select_last_answer_db(db=db, sender_id=data.get("senderId"))
+                await save_answer_data_to_db(db=db, data=data)
+                answer_obj = await select_last_answer_db(db=db, sender_id=data.get("senderId"))
                 answer_to_send = set_subject_chat_last_answer_dict(answer_obj)
-                message_obj = select_message_by_id_db(db=db, message_id=data.get("messageId"))
+                message_obj = await select_message_by_id_db(db=db, message_id=data.get("messageId"))
 
                 if message_obj.message_type == "alone":
-                    await websocket.send_json(answer_to_send)
+                    await manager.send_personal_message(connection=connection, message=answer_to_send)
                     await manager.send_message_to_user(user_id=message_obj.sender_id, subject_id=subject_id,
                                                        message=answer_to_send)
 
                 elif message_obj.message_type == "several":
-                    recipients = select_recipient_by_message_id(db=db, message_id=message_obj.id)
+                    recipients = await select_recipient_by_message_id(db=db, message_id=message_obj.id)
                     user_ids = [recipient.recipient_id for recipient in recipients]
                     await manager.send_message_to_users(user_ids=user_ids, subject_id=subject_id,
                                                         message=answer_to_send)
@@ -143,15 +190,15 @@ async def subject_chat_socket(
                     await manager.send_message_to_everyone(subject_id=subject_id, message=answer_to_send)
 
             elif data.get("type") == "updateMessage":
-                updated_message = update_message_data_to_db(db=db, data=data)
+                updated_message = await update_message_data_to_db(db=db, data=data)
 
                 if updated_message["messageType"] == "alone":
-                    await websocket.send_json(updated_message)
+                    await manager.send_personal_message(connection=connection, message=updated_message)
                     await manager.send_message_to_user(user_id=data.get("recipient"), subject_id=subject_id,
                                                        message=updated_message)
 
                 elif updated_message["messageType"] == "several":
-                    await websocket.send_json(updated_message)
+                    await manager.send_personal_message(connection=connection, message=updated_message)
                     await manager.send_message_to_users(user_ids=data.get("recipient"), subject_id=subject_id,
                                                         message=updated_message)
 
@@ -159,19 +206,19 @@ async def subject_chat_socket(
                     await manager.send_message_to_everyone(subject_id=subject_id, message=updated_message)
 
             elif data.get("type") == "deleteMessage":
-                info = delete_message_data_to_db(db=db, data=data)
+                info = await delete_message_data_to_db(db=db, data=data)
                 message_to_send = f'Message with id {data.get("messageId")} have been deleted'
 
                 if info["messageType"] == "everyone":
                     await manager.send_message_to_everyone(subject_id=subject_id, message={"message": message_to_send})
 
                 else:
-                    await websocket.send_json({"message": message_to_send})
+                    await manager.send_personal_message(connection=connection, message={"message": message_to_send})
                     await manager.send_message_to_users(subject_id=subject_id, user_ids=info["recipient"],
                                                         message={"message": message_to_send})
 
             elif data.get("type") == "updateAnswer":
-                updated_answer = update_answer_data_to_db(db=db, data=data)
+                updated_answer = await update_answer_data_to_db(db=db, data=data)
 
                 if updated_answer["messageType"] == "alone":
                     await manager.send_message_to_user(subject_id=subject_id, user_id=updated_answer["messageSenderId"],
@@ -189,7 +236,7 @@ async def subject_chat_socket(
                     await manager.send_message_to_everyone(subject_id=subject_id, message=updated_answer["answerData"])
 
             elif data.get("type") == "deleteAnswer":
-                info = delete_answer_data_to_db(db=db, data=data)
+                info = await delete_answer_data_to_db(db=db, data=data)
                 message_to_send = f'Answer with id {data.get("answerId")} have been deleted'
 
                 if info["messageType"] == "alone":
@@ -208,22 +255,24 @@ async def subject_chat_socket(
                     await manager.send_message_to_everyone(subject_id=subject_id, message={"message": message_to_send})
 
     except WebSocketDisconnect:
-        manager.connections[subject_id].remove(connection)
+        pass
     finally:
-        await manager.total_active_users(subject_id=subject_id)
+        if connection is not None:
+            await manager.remove_connection(subject_id=subject_id, connection=connection)
 
 
 @router.post("/subject_chat/attachment-file")
 async def attach_file_to_chat(
         file: UploadFile = File(...),
-        user: User = Depends(get_current_user)
+        user: Principal = Depends(get_current_user)
 ):
     if user.student or user.teacher or user.moder:
-        file_path = save_subject_chat_file(file=file)
+        stored_file = await save_subject_chat_file(file=file)
         return {
-            "filePath": file_path,
+            "filePath": stored_file.path,
             "fileName": file.filename,
-            "fileSize": file.size
+            "fileSize": stored_file.size,
+            "thumbnails": get_derivative_paths(stored_file.path)
         }
     return HTTPException(status_code=403, detail="Curator can't use group chat")
 
@@ -231,40 +280,68 @@ async def attach_file_to_chat(
 @router.delete("/subject_chat/delete-file")
 async def delete_file_from_chat(
         file_path: str,
-        user: User = Depends(get_current_user)
+        user: Principal = Depends(get_current_user)
 ):
     if user.student or user.teacher or user.moder:
-        return delete_file(file_path=file_path)
+        if not is_blob_path(file_path):
+            raise HTTPException(status_code=404, detail="File not found")
+        return await delete_file(file_path=file_path)
     return HTTPException(status_code=403, detail="Curator can't use group chat")
 
 
 @router.post("/subject_chat/read_message/{message_id}")
 async def read_chat_message(
         message_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    return update_read_by_for_message_db(db=db, message_id=message_id, user_id=user.id)
+    receipt = await create_message_read_receipt_db(db=db, message_id=message_id, user_id=user.id)
+    if receipt is None:
+        raise HTTPException(status_code=404, detail="Message not found")
+    return receipt
 
 
 @router.post("/subject_chat/read_answer/{answer_id}")
 async def read_chat_answer(
         answer_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    return update_read_by_for_answer_db(db=db, answer_id=answer_id, user_id=user.id)
+    receipt = await create_answer_read_receipt_db(db=db, answer_id=answer_id, user_id=user.id)
+    if receipt is None:
+        raise HTTPException(status_code=404, detail="Answer not found")
+    return receipt
+
+
+@router.post("/subject_chat/read_messages/{subject_id}/{last_message_id}")
+async def read_chat_messages(
+        subject_id: int,
+        last_message_id: int,
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
+):
+    await mark_messages_read_db(db=db, subject_id=subject_id, user_id=user.id, last_message_id=last_message_id)
+    return await select_unread_count_db(db=db, subject_id=subject_id, user_id=user.id)
+
+
+@router.get("/subject_chat/unread_messages/{subject_id}")
+async def get_unread_messages_count(
+        subject_id: int,
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
+):
+    return await select_unread_count_db(db=db, subject_id=subject_id, user_id=user.id)
 
 
 @router.get("/subject_chat/next-messages/{subject_id}/{last_message_id}")
 async def get_chat_messages(
         subject_id: int,
         last_message_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
 
-    messages_obj = get_messages_for_subject_chat_by_pagination_db(
+    messages_obj = await get_messages_for_subject_chat_by_pagination_db(
         db=db,
         subject_id=subject_id,
         recipient_id=user.id,
@@ -273,3 +350,10 @@ async def get_chat_messages(
 
     result = set_subject_chat_last_messages_dict(messages_obj=messages_obj)
     return result
+
+
+@router.get("/subject_chat/delivery-metrics")
+async def get_delivery_metrics(user: Principal = Depends(get_current_user)):
+    if user.moder:
+        return manager.metrics.summary()
+    raise HTTPException(status_code=403, detail="Permission denied")
@@ -1,24 +1,29 @@
+from datetime import date
+from typing import Optional
+
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.teacher_crud import (create_teacher_template_db, get_teacher_by_user_id_db, get_teacher_info_db,
-                                   get_teacher_lessons_db, get_teacher_subjects_db, select_teacher_templates_db,
-                                   select_template_db, update_teacher_image_db)
-from app.models import User
+                                   get_teacher_subjects_db, select_teacher_templates_db, select_template_db,
+                                   update_teacher_image_db)
 from app.schemas.teacher_schemas import TeacherTemplateSchemas
 from app.session import get_db
-from app.utils.save_images import save_teacher_avatar
-from app.utils.token import get_current_user
+from app.utils.image_derivatives import get_derivative_paths
+from app.utils.save_images import release_replaced_file, save_teacher_avatar
+from app.utils.schedule import get_schedule, resolve_schedule_range
+from app.utils.subject_cache import invalidate_teacher_subject_tapes
+from app.utils.token import Principal, get_current_user
 
 router = APIRouter()
 
 
 @router.get("/teacher/info/me")
 async def get_teacher_info(
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    teacher_info_list = get_teacher_info_db(db=db, user_id=user.id)
+    teacher_info_list = await get_teacher_info_db(db=db, user_id=user.id)
     field_list = [
         'teacher_id',
         'teacher_name',
@@ -29,7 +34,7 @@ async def get_teacher_info(
 
     teacher_info = dict(zip(field_list, teacher_info_list))
 
-    subjects = get_teacher_subjects_db(db=db, user_id=user.id)
+    subjects = await get_teacher_subjects_db(db=db, user_id=user.id)
     teacher_info['subject_info'] = subjects
 
     return teacher_info
@@ -37,49 +42,45 @@ async def get_teacher_info(
 
 @router.get("/teacher/my/schedule")
 async def get_my_schedule(
-        teacher_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    lessons = get_teacher_lessons_db(db=db, teacher_id=teacher_id)
-    result = []
-
-    for lesson in lessons:
-        schedule_data = {
-            'subject_name': lesson[0],
-            'lesson_name': lesson[1],
-            'lesson_date': lesson[2],
-            'lesson_end': lesson[3],
-            'group_name': lesson[4]
-        }
-        result.append(schedule_data)
+    if not user.teacher:
+        raise HTTPException(status_code=403, detail="Permission denied")
 
-    return result
+    date_from, date_to = resolve_schedule_range(date_from=date_from, date_to=date_to)
+    return await get_schedule(db=db, date_from=date_from, date_to=date_to, teacher_id=user.teacher_id)
 
 
 @router.put("/teacher/update-image")
 async def update_teacher_image(
         file: UploadFile = File(...),
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    teacher = get_teacher_by_user_id_db(db=db, user_id=user.id)
-    image_path = save_teacher_avatar(photo=file)
-    update_teacher_image_db(db=db, teacher=teacher, image_path=image_path)
+    teacher = await get_teacher_by_user_id_db(db=db, user_id=user.id)
+    old_path = teacher.image_path
+    image_path = (await save_teacher_avatar(photo=file)).path
+    await update_teacher_image_db(db=db, teacher=teacher, image_path=image_path)
+    await invalidate_teacher_subject_tapes(db=db, teacher_id=teacher.id)
+    await release_replaced_file(old_path)
     return {
         "message": "Avatar updated successfully",
-        "photo_path": image_path
+        "photo_path": image_path,
+        "thumbnails": get_derivative_paths(image_path)
     }
 
 
 @router.post("/create/template")
 async def create_lesson_template(
         template: TeacherTemplateSchemas,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher:
-        new_template = create_teacher_template_db(db=db, template=template)
+        new_template = await create_teacher_template_db(db=db, template=template)
         return new_template
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
@@ -88,11 +89,11 @@ async def create_lesson_template(
 @router.get("/templates")
 async def get_teacher_templates(
         teacher_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher:
-        return select_teacher_templates_db(db=db, teacher_id=teacher_id)
+        return await select_teacher_templates_db(db=db, teacher_id=teacher_id)
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
 
@@ -100,10 +101,10 @@ async def get_teacher_templates(
 @router.get("/template/{template_id}")
 async def get_template_by_id(
         template_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher:
-        return select_template_db(db=db, template_id=template_id)
+        return await select_template_db(db=db, template_id=template_id)
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
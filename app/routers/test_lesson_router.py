@@ -1,23 +1,23 @@
 from typing import List
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.test_lesson_crud import (create_test_answer_db, create_test_answer_with_photo_db, create_test_db,
                                        create_test_matching_db, create_test_question_db,
                                        create_test_question_with_photo_db, delete_answer_db, delete_matching_left_db,
                                        delete_matching_right_db, delete_test_question_db, select_matching_left_db,
                                        select_matching_right_db, select_mathing_left_by_right_id_db,
-                                       select_question_type_id, select_test_answer_db, select_test_by_lesson_id_db,
-                                       select_test_db, select_test_info_db, select_test_info_for_teacher_db,
-                                       select_test_question_db, set_none_for_left_option_db, set_test_question_path_db,
-                                       set_test_answer_path_db, update_test_db, update_test_question_db)
-from app.models import User
+                                       select_question_test_id_db, select_question_type_id, select_test_answer_db,
+                                       select_test_by_lesson_id_db, select_test_db, select_test_question_db,
+                                       set_none_for_left_option_db, set_test_answer_path_db, set_test_question_path_db,
+                                       update_test_db, update_test_question_db)
 from app.schemas.test_lesson_schemas import QuestionBase, TestConfigBase, TestConfigUpdate
 from app.session import get_db
 from app.utils.lesson_utils import get_lesson_base_info, set_test_info
 from app.utils.save_images import delete_file, save_lesson_file
-from app.utils.token import get_current_user
+from app.utils.test_cache import get_test_questions_info, invalidate_test_cache
+from app.utils.token import Principal, get_current_user
 
 router = APIRouter()
 
@@ -25,11 +25,11 @@ router = APIRouter()
 @router.post("/test/")
 async def create_test_config(
         test_data: TestConfigBase,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.moder or user.teacher:
-        return create_test_db(db=db, test_data=test_data)
+        return await create_test_db(db=db, test_data=test_data)
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
 
@@ -38,12 +38,14 @@ async def create_test_config(
 async def update_test_config(
         test_id: int,
         test_data: TestConfigUpdate,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.moder or user.teacher:
-        test = select_test_db(db=db, test_id=test_id)
-        return update_test_db(db=db, test=test, test_data=test_data)
+        test = await select_test_db(db=db, test_id=test_id)
+        test = await update_test_db(db=db, test=test, test_data=test_data)
+        await invalidate_test_cache(db=db, test_id=test_id)
+        return test
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
 
@@ -52,14 +54,14 @@ async def update_test_config(
 async def create_test_data(
         test_id: int,
         data: List[QuestionBase],
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     for question_data in data:
         if question_data.questionType in ["boolean", "test", "multiple_choice"]:
-            question_type_id = select_question_type_id(db=db, question_type=question_data.questionType)
+            question_type_id = await select_question_type_id(db=db, question_type=question_data.questionType)
 
-            question = create_test_question_db(
+            question = await create_test_question_db(
                 db=db,
                 question_text=question_data.questionText,
                 question_number=question_data.questionNumber,
@@ -70,16 +72,16 @@ async def create_test_data(
             )
 
             for answer_data in question_data.questionAnswers:
-                create_test_answer_db(
+                await create_test_answer_db(
                     db=db,
                     answer_text=answer_data.answerText,
                     is_correct=answer_data.isCorrect,
                     question_id=question.id
                 )
         elif question_data.questionType == "answer_with_photo":
-            question_type_id = select_question_type_id(db=db, question_type=question_data.questionType)
+            question_type_id = await select_question_type_id(db=db, question_type=question_data.questionType)
 
-            question = create_test_question_db(
+            question = await create_test_question_db(
                 db=db,
                 question_text=question_data.questionText,
                 question_number=question_data.questionNumber,
@@ -90,7 +92,7 @@ async def create_test_data(
             )
 
             for answer_data in question_data.questionAnswers:
-                create_test_answer_with_photo_db(
+                await create_test_answer_with_photo_db(
                     db=db,
                     answer_text=answer_data.answerText,
                     is_correct=answer_data.isCorrect,
@@ -99,9 +101,9 @@ async def create_test_data(
                 )
 
         elif question_data.questionType == "question_with_photo":
-            question_type_id = select_question_type_id(db=db, question_type=question_data.questionType)
+            question_type_id = await select_question_type_id(db=db, question_type=question_data.questionType)
 
-            question = create_test_question_with_photo_db(
+            question = await create_test_question_with_photo_db(
                 db=db,
                 question_text=question_data.questionText,
                 question_number=question_data.questionNumber,
@@ -113,7 +115,7 @@ async def create_test_data(
             )
 
             for answer_data in question_data.questionAnswers:
-                create_test_answer_db(
+                await create_test_answer_db(
                     db=db,
                     answer_text=answer_data.answerText,
                     is_correct=answer_data.isCorrect,
@@ -121,9 +123,9 @@ async def create_test_data(
                 )
 
         elif question_data.questionType == "matching":
-            question_type_id = select_question_type_id(db=db, question_type=question_data.questionType)
+            question_type_id = await select_question_type_id(db=db, question_type=question_data.questionType)
 
-            question = create_test_question_db(
+            question = await create_test_question_db(
                 db=db,
                 question_text=question_data.questionText,
                 question_number=question_data.questionNumber,
@@ -134,13 +136,14 @@ async def create_test_data(
             )
 
             for answer_data in question_data.questionAnswers:
-                create_test_matching_db(
+                await create_test_matching_db(
                     db=db,
                     right_text=answer_data.rightText,
                     left_text=answer_data.leftText,
                     question_id=question.id
                 )
 
+    await invalidate_test_cache(db=db, test_id=test_id)
     return {"Message": "Test data have been saved"}
 
 
@@ -148,12 +151,12 @@ async def create_test_data(
 async def update_question(
         question_id: int,
         data: QuestionBase,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.moder or user.teacher:
-        question = select_test_question_db(db=db, question_id=question_id)
-        update_test_question_db(
+        question = await select_test_question_db(db=db, question_id=question_id)
+        await update_test_question_db(
             db=db,
             question=question,
             text=data.questionText,
@@ -165,19 +168,19 @@ async def update_question(
 
         if data.questionType == "matching":
             for right in question.matching_right:
-                delete_matching_right_db(db=db, right_option=right)
+                await delete_matching_right_db(db=db, right_option=right)
             for left in question.matching_left:
-                delete_matching_left_db(db=db, left_option=left)
+                await delete_matching_left_db(db=db, left_option=left)
 
         else:
             for answer in question.test_answer:
                 if answer.image_path:
-                    delete_file(answer.image_path)
-                delete_answer_db(db=db, answer=answer)
+                    await delete_file(answer.image_path)
+                await delete_answer_db(db=db, answer=answer)
 
         if data.questionType == "answer_with_photo":
             for new_answer in data.questionAnswers:
-                create_test_answer_with_photo_db(
+                await create_test_answer_with_photo_db(
                     db=db,
                     answer_text=new_answer.answerText,
                     is_correct=new_answer.isCorrect,
@@ -186,7 +189,7 @@ async def update_question(
                 )
         elif data.questionType in ["test", "boolean", "multiple_choice", "question_with_photo"]:
             for new_answer in data.questionAnswers:
-                create_test_answer_db(
+                await create_test_answer_db(
                     db=db,
                     answer_text=new_answer.answerText,
                     is_correct=new_answer.isCorrect,
@@ -194,12 +197,13 @@ async def update_question(
                 )
         else:
             for matching in data.questionAnswers:
-                create_test_matching_db(
+                await create_test_matching_db(
                     db=db,
                     right_text=matching.rightText,
                     left_text=matching.leftText,
                     question_id=question_id
                 )
+        await invalidate_test_cache(db=db, test_id=question.test_lesson_id)
         return {"message": "Question data have been updated"}
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
@@ -208,35 +212,37 @@ async def update_question(
 @router.delete("/test/delete-question")
 async def delete_question(
         question_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.moder or user.teacher:
-        question = select_test_question_db(db=db, question_id=question_id)
+        question = await select_test_question_db(db=db, question_id=question_id)
+        test_id = question.test_lesson_id
         if question.question_type == "matching":
             for left in question.matching_left:
-                delete_matching_left_db(db=db, left_option=left)
+                await delete_matching_left_db(db=db, left_option=left)
             for right in question.matching_right:
-                delete_matching_right_db(db=db, right_option=right)
-            delete_test_question_db(db=db, question=question)
+                await delete_matching_right_db(db=db, right_option=right)
+            await delete_test_question_db(db=db, question=question)
 
         elif question.question_type == "question_with_photo":
-            delete_file(question.image_path)
+            await delete_file(question.image_path)
             for answer in question.test_answer:
-                delete_answer_db(db=db, answer=answer)
-            delete_test_question_db(db=db, question=question)
+                await delete_answer_db(db=db, answer=answer)
+            await delete_test_question_db(db=db, question=question)
 
         elif question.question_type == "answer_with_photo":
             for answer in question.test_answer:
-                delete_file(answer.image_path)
-                delete_answer_db(db=db, answer=answer)
-            delete_test_question_db(db=db, question=question)
+                await delete_file(answer.image_path)
+                await delete_answer_db(db=db, answer=answer)
+            await delete_test_question_db(db=db, question=question)
 
         else:
             for answer in question.test_answer:
-                delete_answer_db(db=db, answer=answer)
-            delete_test_question_db(db=db, question=question)
+                await delete_answer_db(db=db, answer=answer)
+            await delete_test_question_db(db=db, question=question)
 
+        await invalidate_test_cache(db=db, test_id=test_id)
         return {"message": "Question have been deleted"}
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
@@ -245,12 +251,13 @@ async def delete_question(
 @router.delete("/test/delete-question-image")
 async def delete_question_image(
         image_path: str,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.moder or user.teacher:
-        set_test_question_path_db(db=db, image_path=image_path)
-        delete_file(image_path)
+        test_id = await set_test_question_path_db(db=db, image_path=image_path)
+        await delete_file(image_path)
+        await invalidate_test_cache(db=db, test_id=test_id)
         return {"message": "Image have been deleted"}
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
@@ -259,14 +266,16 @@ async def delete_question_image(
 @router.delete("/test/delete-answer")
 async def delete_answer(
         answer_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.moder or user.teacher:
-        answer = select_test_answer_db(db=db, answer_id=answer_id)
+        answer = await select_test_answer_db(db=db, answer_id=answer_id)
+        test_id = await select_question_test_id_db(db=db, question_id=answer.question_id)
         if answer.image_path:
-            delete_file(answer.image_path)
-        delete_answer_db(db=db, answer=answer)
+            await delete_file(answer.image_path)
+        await delete_answer_db(db=db, answer=answer)
+        await invalidate_test_cache(db=db, test_id=test_id)
         return {"message": "Answer have been deleted"}
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
@@ -275,12 +284,13 @@ async def delete_answer(
 @router.delete("/test/delete-answer-image")
 async def delete_answer_image(
         image_path: str,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.moder or user.teacher:
-        set_test_answer_path_db(db=db, image_path=image_path)
-        delete_file(image_path)
+        question_id = await set_test_answer_path_db(db=db, image_path=image_path)
+        await delete_file(image_path)
+        await invalidate_test_cache(db=db, test_id=await select_question_test_id_db(db=db, question_id=question_id))
         return {"message": "Image have been deleted"}
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
@@ -289,12 +299,14 @@ async def delete_answer_image(
 @router.delete("/test/delete-matching-left")
 async def delete_matching_left(
         left_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.moder or user.teacher:
-        left_option = select_matching_left_db(db=db, left_id=left_id)
-        delete_matching_left_db(db=db, left_option=left_option)
+        left_option = await select_matching_left_db(db=db, left_id=left_id)
+        test_id = await select_question_test_id_db(db=db, question_id=left_option.question_id)
+        await delete_matching_left_db(db=db, left_option=left_option)
+        await invalidate_test_cache(db=db, test_id=test_id)
         return {"message": "Left option have been deleted"}
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
@@ -303,14 +315,16 @@ async def delete_matching_left(
 @router.delete("/test/delete/matching-right")
 async def delete_matching_right(
         right_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.moder or user.teacher:
-        right_option = select_matching_right_db(db=db, right_id=right_id)
-        left_option = select_mathing_left_by_right_id_db(db=db, right_id=right_id)
-        set_none_for_left_option_db(db=db, left_option=left_option)
-        delete_matching_right_db(db=db, right_option=right_option)
+        right_option = await select_matching_right_db(db=db, right_id=right_id)
+        test_id = await select_question_test_id_db(db=db, question_id=right_option.question_id)
+        left_option = await select_mathing_left_by_right_id_db(db=db, right_id=right_id)
+        await set_none_for_left_option_db(db=db, left_option=left_option)
+        await delete_matching_right_db(db=db, right_option=right_option)
+        await invalidate_test_cache(db=db, test_id=test_id)
         return {"message": "Right option have been deleted"}
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
@@ -319,35 +333,44 @@ async def delete_matching_right(
 @router.get("/test/{lesson_id}")
 async def get_test_info(
         lesson_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    lesson_base = get_lesson_base_info(db=db, lesson_id=lesson_id)
-    test_lesson = select_test_by_lesson_id_db(db=db, lesson_id=lesson_id)
+    lesson_base = await get_lesson_base_info(db=db, lesson_id=lesson_id)
+    test_lesson = await select_test_by_lesson_id_db(db=db, lesson_id=lesson_id)
 
     if test_lesson is None:
         return lesson_base
     else:
         test_info = set_test_info(lesson_base=lesson_base, test_lesson=test_lesson)
-        test_info["testQuestions"] = select_test_info_db(db=db, test_id=test_lesson.id)
+        test_info["testQuestions"] = await get_test_questions_info(
+            db=db,
+            test_id=test_lesson.id,
+            version=test_lesson.content_version
+        )
         return test_info
 
 
 @router.get("/test-for-teacher/{lesson_id}")
 async def get_test_info_for_teacher(
         lesson_id: int,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
     if user.teacher or user.moder:
-        lesson_base = get_lesson_base_info(db=db, lesson_id=lesson_id)
-        test_lesson = select_test_by_lesson_id_db(db=db, lesson_id=lesson_id)
+        lesson_base = await get_lesson_base_info(db=db, lesson_id=lesson_id)
+        test_lesson = await select_test_by_lesson_id_db(db=db, lesson_id=lesson_id)
 
         if test_lesson is None:
             return lesson_base
         else:
             test_info = set_test_info(lesson_base=lesson_base, test_lesson=test_lesson)
-            test_info["testQuestions"] = select_test_info_for_teacher_db(db=db, test_id=test_lesson.id)
+            test_info["testQuestions"] = await get_test_questions_info(
+                db=db,
+                test_id=test_lesson.id,
+                version=test_lesson.content_version,
+                for_teacher=True
+            )
             return test_info
 
     else:
@@ -357,10 +380,10 @@ async def get_test_info_for_teacher(
 @router.post("/test/upload/image")
 async def upload_test_image(
         file: UploadFile = File(...),
-        user: User = Depends(get_current_user)
+        user: Principal = Depends(get_current_user)
 ):
     if user.moder or user.teacher:
-        file_path = save_lesson_file(file=file)
-        return {"filePath": file_path}
+        stored_file = await save_lesson_file(file=file)
+        return {"filePath": stored_file.path}
     else:
         raise HTTPException(status_code=403, detail="Permission denied")
@@ -1,37 +1,47 @@
-from datetime import timedelta
+from datetime import date, timedelta
 
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.user_crud import (create_new_curator_db, create_new_moder_db, create_new_student_db,
-                                create_new_teacher_db, create_new_user_db, select_user_by_username_db,
-                                select_user_type_id_db, update_user_token_db)
+                                create_new_teacher_db, create_new_user_db, select_user_by_id_db,
+                                select_user_by_username_db, select_user_type_id_db, update_user_password_db,
+                                update_user_token_db)
 from app.models import User
 from app.schemas.user_schemas import CuratorCreate, ModerCreate, StudentCreate, TeacherCreate
 from app.session import get_db
 from app.setting import ACCESS_TOKEN_EXPIRE_HOURS
-from app.utils.password import check_password, hash_password
-from app.utils.token import create_access_token, delete_token_user, get_current_user
+from app.utils.group_cache import invalidate_group_students
+from app.utils.password import check_password, hash_password, password_pool
+from app.utils.subject_cache import invalidate_teacher_subject_tapes
+from app.utils.token import Principal, create_access_token, delete_token_user, get_current_user, revoke_token
 
 router = APIRouter()
 
 
+async def invalidate_last_active(db: AsyncSession, user: User):
+    if user.teacher:
+        await invalidate_teacher_subject_tapes(db=db, teacher_id=user.teacher[0].id)
+    if user.student:
+        await invalidate_group_students(user.student[0].group_id)
+
+
 @router.post("/student/create")
 async def create_student(
         data: StudentCreate,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
-    hashed_password = hash_password(data.password)
-    user_type = select_user_type_id_db(db=db, user_type=data.usertype.value)
+    hashed_password = await hash_password(data.password)
+    user_type = await select_user_type_id_db(db=db, user_type=data.usertype.value)
 
-    new_user = create_new_user_db(
+    new_user = await create_new_user_db(
         db=db,
         username=data.username,
         hashed_password=hashed_password,
         user_type_id=user_type.id)
 
-    new_student = create_new_student_db(
+    new_student = await create_new_student_db(
         db=db,
         name=data.name,
         surname=data.surname,
@@ -50,18 +60,18 @@ async def create_student(
 @router.post("/teacher/create")
 async def create_teacher(
         data: TeacherCreate,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
-    hashed_password = hash_password(data.password)
-    user_type = select_user_type_id_db(db=db, user_type=data.usertype.value)
+    hashed_password = await hash_password(data.password)
+    user_type = await select_user_type_id_db(db=db, user_type=data.usertype.value)
 
-    new_user = create_new_user_db(
+    new_user = await create_new_user_db(
         db=db,
         username=data.username,
         hashed_password=hashed_password,
         user_type_id=user_type.id)
 
-    new_teacher = create_new_teacher_db(
+    new_teacher = await create_new_teacher_db(
         db=db,
         name=data.name,
         surname=data.surname,
@@ -79,19 +89,19 @@ async def create_teacher(
 @router.post("/moder/create")
 async def create_moder(
         data: ModerCreate,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
-    hashed_password = hash_password(data.password)
-    user_type = select_user_type_id_db(db=db, user_type=data.usertype.value)
+    hashed_password = await hash_password(data.password)
+    user_type = await select_user_type_id_db(db=db, user_type=data.usertype.value)
 
-    new_user = create_new_user_db(
+    new_user = await create_new_user_db(
         db=db,
         username=data.username,
         hashed_password=hashed_password,
         user_type_id=user_type.id,
     )
 
-    new_moder = create_new_moder_db(
+    new_moder = await create_new_moder_db(
         db=db,
         name=data.name,
         surname=data.surname,
@@ -108,19 +118,19 @@ async def create_moder(
 @router.post("/curator/create")
 async def create_curator(
         data: CuratorCreate,
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
-    hashed_password = hash_password(data.password)
-    user_type = select_user_type_id_db(db=db, user_type=data.usertype.value)
+    hashed_password = await hash_password(data.password)
+    user_type = await select_user_type_id_db(db=db, user_type=data.usertype.value)
 
-    new_user = create_new_user_db(
+    new_user = await create_new_user_db(
         db=db,
         username=data.username,
         hashed_password=hashed_password,
         user_type_id=user_type.id
     )
 
-    new_curator = create_new_curator_db(
+    new_curator = await create_new_curator_db(
         db=db,
         name=data.name,
         surname=data.surname,
@@ -138,20 +148,27 @@ async def create_curator(
 @router.post("/auth/token")
 async def login(
         form_data: OAuth2PasswordRequestForm = Depends(),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
-    user = select_user_by_username_db(db, form_data.username)
+    user = await select_user_by_username_db(db, form_data.username)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid username or password")
-    if not check_password(form_data.password, user.hashed_pass):
+    is_valid, new_hash = await check_password(form_data.password, user.hashed_pass)
+    if not is_valid:
         raise HTTPException(status_code=401, detail="Invalid username or password")
+    if new_hash:
+        await update_user_password_db(db=db, user=user, hashed_password=new_hash)
 
     access_token_expires = timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
     access_token, expire_token = create_access_token(
         data={"sub": user.username},
         expires_delta=access_token_expires)
 
-    update_user_token_db(db=db, user=user, token=access_token, exp_token=expire_token)
+    if user.token and user.token != access_token:
+        await revoke_token(token=user.token, expire_token=user.exp_token)
+    if user.last_active != date.today():
+        await invalidate_last_active(db=db, user=user)
+    await update_user_token_db(db=db, user=user, token=access_token, exp_token=expire_token)
 
     return {
         "access_token": access_token,
@@ -165,10 +182,21 @@ async def login(
     }
 
 
+@router.get("/auth/password-pool-metrics")
+async def get_password_pool_metrics(user: Principal = Depends(get_current_user)):
+    if user.moder:
+        return password_pool.summary()
+    else:
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+
 @router.get("/logout")
 async def logout(
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_db),
+        user: Principal = Depends(get_current_user)
 ):
-    delete_token_user(db=db, user=user)
+    db_user = await select_user_by_id_db(db=db, user_id=user.id)
+    if db_user.last_active != date.today():
+        await invalidate_last_active(db=db, user=db_user)
+    await delete_token_user(db=db, user=db_user)
     return {"message": "You have been successfully logged out"}
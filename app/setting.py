@@ -6,11 +6,62 @@ load_dotenv()
 
 API_PREFIX = os.getenv('API_PREFIX')
 DATABASE_URL = os.getenv('DATABASE_URL')
+ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL')
 BROKER_URL = os.getenv('BROKER_URL')
+CHAT_BROKER_URL = os.getenv('CHAT_BROKER_URL')
+CHAT_BROKER_RECONNECT_DELAY = float(os.getenv('CHAT_BROKER_RECONNECT_DELAY', 1))
+CHAT_PRESENCE_TTL = float(os.getenv('CHAT_PRESENCE_TTL', 60))
+CHAT_SEND_QUEUE_SIZE = int(os.getenv('CHAT_SEND_QUEUE_SIZE', 256))
+CHAT_SEND_TIMEOUT = float(os.getenv('CHAT_SEND_TIMEOUT', 5))
+ANSWER_KEY_CACHE_TTL = float(os.getenv('ANSWER_KEY_CACHE_TTL', 300))
+TEST_INFO_CACHE_TTL = float(os.getenv('TEST_INFO_CACHE_TTL', 300))
+LECTURE_CACHE_TTL = float(os.getenv('LECTURE_CACHE_TTL', 300))
+SUBJECT_TAPES_CACHE_TTL = float(os.getenv('SUBJECT_TAPES_CACHE_TTL', 60))
+AUTH_CACHE_TTL = float(os.getenv('AUTH_CACHE_TTL', 60))
+GROUP_MEMBERS_CACHE_TTL = float(os.getenv('GROUP_MEMBERS_CACHE_TTL', 60))
+SCHEDULE_CACHE_TTL = float(os.getenv('SCHEDULE_CACHE_TTL', 300))
+SCHEDULE_DEFAULT_DAYS = int(os.getenv('SCHEDULE_DEFAULT_DAYS', 10))
+SCHEDULE_MAX_DAYS = int(os.getenv('SCHEDULE_MAX_DAYS', 366))
+CALENDAR_PAST_DAYS = int(os.getenv('CALENDAR_PAST_DAYS', 30))
+CALENDAR_FUTURE_DAYS = int(os.getenv('CALENDAR_FUTURE_DAYS', 180))
+CALENDAR_TOKEN_EXPIRE_DAYS = int(os.getenv('CALENDAR_TOKEN_EXPIRE_DAYS', 365))
+RESPONSE_CACHE_URL = os.getenv('RESPONSE_CACHE_URL')
+RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', 300))
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', 1024))
+TOKEN_REVOCATION_URL = os.getenv('TOKEN_REVOCATION_URL')
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 1))
+QUERY_REPEAT_THRESHOLD = int(os.getenv('QUERY_REPEAT_THRESHOLD', 5))
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+PASSWORD_POOL_SIZE = int(os.getenv('PASSWORD_POOL_SIZE', min(4, os.cpu_count() or 1)))
+PASSWORD_POOL_QUEUE_SIZE = int(os.getenv('PASSWORD_POOL_QUEUE_SIZE', 64))
+JOURNAL_BATCH_SIZE = int(os.getenv('JOURNAL_BATCH_SIZE', 100))
+JOURNAL_FLUSH_INTERVAL = float(os.getenv('JOURNAL_FLUSH_INTERVAL', 1))
+JOURNAL_MAX_PENDING = int(os.getenv('JOURNAL_MAX_PENDING', 10000))
+JOURNAL_RETRY_DELAY = float(os.getenv('JOURNAL_RETRY_DELAY', 1))
+JOURNAL_MAX_RETRY_DELAY = float(os.getenv('JOURNAL_MAX_RETRY_DELAY', 60))
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', 1024 * 1024))
+MAX_IMAGE_UPLOAD_SIZE = int(os.getenv('MAX_IMAGE_UPLOAD_SIZE', 10 * 1024 * 1024))
+MAX_DOCUMENT_UPLOAD_SIZE = int(os.getenv('MAX_DOCUMENT_UPLOAD_SIZE', 50 * 1024 * 1024))
+MAX_CHAT_UPLOAD_SIZE = int(os.getenv('MAX_CHAT_UPLOAD_SIZE', 50 * 1024 * 1024))
+MAX_LESSON_UPLOAD_SIZE = int(os.getenv('MAX_LESSON_UPLOAD_SIZE', 1024 * 1024 * 1024))
 
-# AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID')
-# AWS_ACCESS_SECRET_KEY = os.getenv('AWS_ACCESS_SECRET_KEY')
-# AWS_BUCKET_NAME = os.getenv('AWS_BUCKET_NAME')
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'local')
+AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID')
+AWS_ACCESS_SECRET_KEY = os.getenv('AWS_ACCESS_SECRET_KEY')
+AWS_BUCKET_NAME = os.getenv('AWS_BUCKET_NAME')
+AWS_REGION = os.getenv('AWS_REGION')
+AWS_ENDPOINT_URL = os.getenv('AWS_ENDPOINT_URL')
+S3_MULTIPART_THRESHOLD = int(os.getenv('S3_MULTIPART_THRESHOLD', 64 * 1024 * 1024))
+S3_MULTIPART_CHUNK_SIZE = int(os.getenv('S3_MULTIPART_CHUNK_SIZE', 16 * 1024 * 1024))
+PRESIGNED_URL_EXPIRE = int(os.getenv('PRESIGNED_URL_EXPIRE', 3600))
+MEDIA_ACCEL_MODE = os.getenv('MEDIA_ACCEL_MODE')
+MEDIA_ACCEL_PREFIX = os.getenv('MEDIA_ACCEL_PREFIX', '/protected/')
+MEDIA_CHUNK_SIZE = int(os.getenv('MEDIA_CHUNK_SIZE', 256 * 1024))
+IMAGE_DERIVATIVE_SIZES = tuple(int(size) for size in os.getenv('IMAGE_DERIVATIVE_SIZES', '96,320').split(','))
+IMAGE_DERIVATIVE_WORKERS = int(os.getenv('IMAGE_DERIVATIVE_WORKERS', 2))
+BLOB_GRACE_PERIOD = float(os.getenv('BLOB_GRACE_PERIOD', 24 * 60 * 60))
+BLOB_SWEEP_INTERVAL = float(os.getenv('BLOB_SWEEP_INTERVAL', 60 * 60))
+BLOB_SWEEP_BATCH_SIZE = int(os.getenv('BLOB_SWEEP_BATCH_SIZE', 100))
 
 SECRET_KEY = os.getenv('SECRET_KEY')
 ALGORITHM = os.getenv('ALGORITHM')
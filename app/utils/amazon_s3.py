@@ -1,38 +1,67 @@
-# from io import BytesIO
-#
-# import boto3
-# from fastapi import UploadFile
-#
-# from app.setting import (AWS_ACCESS_KEY_ID, AWS_ACCESS_SECRET_KEY,
-#                          AWS_BUCKET_NAME)
-#
-# STUDENT_IMAGE_FOLDER = 'images/student_profile_photo/'
-# SUBJECT_AVATAR_FOLDER = 'images/subject_main_photo/'
-# SUBJECT_LOGO_FOLDER = 'images/subject_logo/'
-#
-#
-# def get_s3_client():
-#     s3_client = boto3.client(
-#         "s3",
-#         aws_access_key_id=AWS_ACCESS_KEY_ID,
-#         aws_secret_access_key=AWS_ACCESS_SECRET_KEY
-#     )
-#
-#     return s3_client
-#
-#
-# def get_bytes_image(file: UploadFile):
-#     file_content = file.file.read()
-#     return BytesIO(file_content)
-#
-#
-# def save_images(file: UploadFile):
-#     s3_client = get_s3_client()
-#     bytes_file = get_bytes_image(file)
-#     s3_client.put_object(
-#         Body=bytes_file,
-#         Bucket=AWS_BUCKET_NAME,
-#         Key=SUBJECT_LOGO_FOLDER + file.filename
-#     )
-#
-#     return SUBJECT_LOGO_FOLDER + file.filename
+import mimetypes
+
+from app.setting import (AWS_ACCESS_KEY_ID, AWS_ACCESS_SECRET_KEY, AWS_BUCKET_NAME, AWS_ENDPOINT_URL, AWS_REGION,
+                         PRESIGNED_URL_EXPIRE, S3_MULTIPART_CHUNK_SIZE, S3_MULTIPART_THRESHOLD)
+
+
+def get_s3_client():
+    import boto3
+
+    s3_client = boto3.client(
+        "s3",
+        aws_access_key_id=AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=AWS_ACCESS_SECRET_KEY,
+        region_name=AWS_REGION,
+        endpoint_url=AWS_ENDPOINT_URL
+    )
+
+    return s3_client
+
+
+class S3Storage:
+    is_remote = True
+
+    def __init__(self, bucket: str, client=None):
+        from boto3.s3.transfer import TransferConfig
+
+        self.bucket = bucket
+        self.client = client or get_s3_client()
+        self.transfer_config = TransferConfig(
+            multipart_threshold=S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=S3_MULTIPART_CHUNK_SIZE
+        )
+
+    def put_file(self, local_path: str, key: str):
+        content_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+        self.client.upload_file(
+            local_path,
+            self.bucket,
+            key,
+            ExtraArgs={"ContentType": content_type},
+            Config=self.transfer_config
+        )
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def url(self, key: str, expires: int = PRESIGNED_URL_EXPIRE) -> str:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=expires
+        )
+
+
+def create_s3_storage() -> S3Storage:
+    return S3Storage(bucket=AWS_BUCKET_NAME)
@@ -0,0 +1,48 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.group_crud import select_groups_db
+from app.crud.module_crud import select_modules_db
+from app.crud.specialization_crud import select_specializations_by_course_id_db, select_specializations_db
+from app.crud.subject_crud import select_all_subjects_db
+from app.crud.subject_instruction_crud import select_subject_instructions_db
+from app.utils.response_cache import response_cache
+
+SUBJECTS_TAG = "subjects"
+SPECIALIZATIONS_TAG = "specializations"
+GROUPS_TAG = "groups"
+MODULES_TAG = "modules"
+SUBJECT_INSTRUCTIONS_TAG = "subject-instructions"
+
+
+@response_cache.cached("subjects", tags=(SUBJECTS_TAG,))
+async def get_cached_subjects(db: AsyncSession):
+    return await select_all_subjects_db(db=db)
+
+
+@response_cache.cached("specializations", tags=(SPECIALIZATIONS_TAG,))
+async def get_cached_specializations(db: AsyncSession):
+    return await select_specializations_db(db=db)
+
+
+@response_cache.cached("specializations-by-course", tags=(SPECIALIZATIONS_TAG,))
+async def get_cached_specializations_by_course(db: AsyncSession, course_id: int):
+    return await select_specializations_by_course_id_db(db=db, course_id=course_id)
+
+
+@response_cache.cached("groups", tags=(GROUPS_TAG,))
+async def get_cached_groups(db: AsyncSession):
+    return await select_groups_db(db=db)
+
+
+@response_cache.cached("modules", tags=(MODULES_TAG,))
+async def get_cached_modules(db: AsyncSession):
+    return await select_modules_db(db=db)
+
+
+@response_cache.cached("subject-instructions", tags=(SUBJECT_INSTRUCTIONS_TAG,))
+async def get_cached_subject_instructions(db: AsyncSession, subject_id: int):
+    return await select_subject_instructions_db(db=db, subject_id=subject_id)
+
+
+async def invalidate_catalogue(*tags: str):
+    await response_cache.invalidate(*tags)
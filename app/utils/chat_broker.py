@@ -0,0 +1,156 @@
+import asyncio
+import json
+import logging
+import uuid
+from collections import Counter, defaultdict
+from typing import Awaitable, Callable, Dict, List
+
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.setting import CHAT_BROKER_RECONNECT_DELAY, CHAT_BROKER_URL, CHAT_PRESENCE_TTL
+
+logger = logging.getLogger(__name__)
+
+WORKER_ID = uuid.uuid4().hex
+
+Handler = Callable[[Dict], Awaitable[None]]
+
+
+class InMemoryBroker:
+    def __init__(self):
+        self.handlers = defaultdict(list)
+        self.presence = defaultdict(Counter)
+
+    async def subscribe(self, channel: str, handler: Handler):
+        self.handlers[channel].append(handler)
+
+    async def publish(self, channel: str, event: Dict):
+        await self.dispatch(channel, json.loads(json.dumps(event)))
+
+    async def dispatch(self, channel: str, event: Dict):
+        for handler in self.handlers[channel]:
+            try:
+                await handler(event)
+            except Exception:
+                logger.exception("Chat broker handler failed for channel %s", channel)
+
+    async def add_presence(self, channel: str, room, user_id: int):
+        self.presence[f"{channel}:{room}"][user_id] += 1
+
+    async def remove_presence(self, channel: str, room, user_id: int):
+        users = self.presence[f"{channel}:{room}"]
+        users[user_id] -= 1
+        if users[user_id] <= 0:
+            del users[user_id]
+
+    async def get_presence(self, channel: str, room) -> Dict[int, int]:
+        return dict(self.presence[f"{channel}:{room}"])
+
+
+class RedisBroker:
+    def __init__(self, url: str):
+        self.redis = aioredis.from_url(url, decode_responses=True)
+        self.pubsub = self.redis.pubsub()
+        self.handlers = defaultdict(list)
+        self.listener = None
+        self.heartbeat = None
+        self.presence_keys = set()
+
+    async def subscribe(self, channel: str, handler: Handler):
+        self.handlers[channel].append(handler)
+        await self.pubsub.subscribe(channel)
+        if self.listener is None:
+            self.listener = asyncio.create_task(self.listen())
+
+    async def listen(self):
+        while True:
+            try:
+                async for item in self.pubsub.listen():
+                    if item["type"] == "message":
+                        await self.dispatch(item["channel"], json.loads(item["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Chat broker lost its Redis subscription, reconnecting")
+            await self.resubscribe()
+
+    async def resubscribe(self):
+        while True:
+            await asyncio.sleep(CHAT_BROKER_RECONNECT_DELAY)
+            try:
+                await self.pubsub.reset()
+                self.pubsub = self.redis.pubsub()
+                await self.pubsub.subscribe(*self.handlers)
+                return
+            except (RedisError, OSError):
+                logger.warning("Chat broker could not resubscribe, retrying in %ss", CHAT_BROKER_RECONNECT_DELAY)
+
+    async def dispatch(self, channel: str, event: Dict):
+        for handler in self.handlers[channel]:
+            try:
+                await handler(event)
+            except Exception:
+                logger.exception("Chat broker handler failed for channel %s", channel)
+
+    async def publish(self, channel: str, event: Dict):
+        await self.redis.publish(channel, json.dumps(event))
+
+    async def add_presence(self, channel: str, room, user_id: int):
+        key = f"presence:{channel}:{room}:{WORKER_ID}"
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hincrby(key, str(user_id), 1)
+            pipe.expire(key, int(CHAT_PRESENCE_TTL))
+            pipe.sadd(f"presence:{channel}:{room}", WORKER_ID)
+            await pipe.execute()
+        self.presence_keys.add(key)
+        if self.heartbeat is None:
+            self.heartbeat = asyncio.create_task(self.refresh_presence())
+
+    async def remove_presence(self, channel: str, room, user_id: int):
+        key = f"presence:{channel}:{room}:{WORKER_ID}"
+        if await self.redis.hincrby(key, str(user_id), -1) <= 0:
+            await self.redis.hdel(key, str(user_id))
+        if not await self.redis.exists(key):
+            self.presence_keys.discard(key)
+            await self.redis.srem(f"presence:{channel}:{room}", WORKER_ID)
+
+    async def get_presence(self, channel: str, room) -> Dict[int, int]:
+        workers = list(await self.redis.smembers(f"presence:{channel}:{room}"))
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for worker_id in workers:
+                pipe.hgetall(f"presence:{channel}:{room}:{worker_id}")
+            worker_users = await pipe.execute()
+
+        presence = Counter()
+        for worker_id, users in zip(workers, worker_users):
+            if not users:
+                await self.redis.srem(f"presence:{channel}:{room}", worker_id)
+            for user_id, count in users.items():
+                if int(count) > 0:
+                    presence[int(user_id)] += int(count)
+        return dict(presence)
+
+    async def refresh_presence(self):
+        while True:
+            await asyncio.sleep(CHAT_PRESENCE_TTL / 3)
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for key in self.presence_keys:
+                        pipe.expire(key, int(CHAT_PRESENCE_TTL))
+                    await pipe.execute()
+            except (RedisError, OSError):
+                logger.exception("Chat broker could not refresh presence")
+
+
+def create_broker(url: str | None):
+    if url:
+        return RedisBroker(url)
+    return InMemoryBroker()
+
+
+def active_users_message(presence: Dict[int, int]) -> Dict[str, int | List[int]]:
+    return {"totalActive": sum(presence.values()), "idsActiveUsers": list(presence)}
+
+
+broker = create_broker(CHAT_BROKER_URL)
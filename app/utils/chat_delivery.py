@@ -0,0 +1,89 @@
+import asyncio
+import json
+import time
+from collections import defaultdict, deque
+from typing import Dict, Hashable
+
+from fastapi import status
+from fastapi.websockets import WebSocket
+
+from app.setting import CHAT_SEND_QUEUE_SIZE, CHAT_SEND_TIMEOUT
+
+
+def serialize_message(message: Dict) -> str:
+    return json.dumps(message, separators=(",", ":"))
+
+
+class DeliveryMetrics:
+    def __init__(self, samples: int = 1000):
+        self.latencies = defaultdict(lambda: deque(maxlen=samples))
+        self.delivered = defaultdict(int)
+        self.dropped = defaultdict(int)
+
+    def observe(self, room: Hashable, latency: float):
+        self.latencies[room].append(latency)
+        self.delivered[room] += 1
+
+    def drop(self, room: Hashable):
+        self.dropped[room] += 1
+
+    def summary(self) -> Dict[str, Dict]:
+        rooms = {}
+        for room in set(self.delivered) | set(self.dropped):
+            latencies = sorted(self.latencies[room])
+            rooms[str(room)] = {
+                "delivered": self.delivered[room],
+                "dropped": self.dropped[room],
+                "p50Ms": round(latencies[len(latencies) // 2] * 1000, 2) if latencies else None,
+                "p95Ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 2) if latencies else None,
+                "maxMs": round(latencies[-1] * 1000, 2) if latencies else None
+            }
+        return rooms
+
+
+class ConnectionWriter:
+    def __init__(self, websocket: WebSocket, room: Hashable, metrics: DeliveryMetrics):
+        self.websocket = websocket
+        self.room = room
+        self.metrics = metrics
+        self.queue = asyncio.Queue(maxsize=CHAT_SEND_QUEUE_SIZE)
+        self.closed = False
+        self.task = asyncio.create_task(self.run())
+
+    def push(self, text: str):
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait((time.perf_counter(), text))
+        except asyncio.QueueFull:
+            self.metrics.drop(self.room)
+            self.close()
+
+    async def run(self):
+        while True:
+            queued_at, text = await self.queue.get()
+            try:
+                await asyncio.wait_for(self.websocket.send_text(text), timeout=CHAT_SEND_TIMEOUT)
+            except Exception:
+                self.metrics.drop(self.room)
+                self.close()
+                return
+            self.metrics.observe(self.room, time.perf_counter() - queued_at)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.task is not asyncio.current_task():
+            self.task.cancel()
+        asyncio.create_task(self.close_websocket())
+
+    async def close_websocket(self):
+        try:
+            await asyncio.wait_for(self.websocket.close(code=status.WS_1013_TRY_AGAIN_LATER), timeout=CHAT_SEND_TIMEOUT)
+        except Exception:
+            return
+
+    def stop(self):
+        self.closed = True
+        self.task.cancel()
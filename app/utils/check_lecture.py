@@ -1,24 +1,21 @@
 from typing import Dict, List
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud.lecture_crud import get_lecture_db, select_student_lecture
+from app.crud.lecture_crud import select_viewed_lecture_lessons_db
 
 
-def checking_lecture(db: Session, student_id: int, subject_lessons: List[Dict]) -> List[Dict]:
-    for item in subject_lessons:
-        if len(item["module_lessons"]) >= 1:
-            for lesson_item in item["module_lessons"]:
-                if lesson_item["lesson_type"] == "lecture":
-                    lecture = get_lecture_db(db=db, lesson_id=lesson_item["lesson_id"])
-                    if lecture:
-                        student_lecture = select_student_lecture(db=db, lecture_id=lecture.id, student_id=student_id)
+async def checking_lecture(
+        db: AsyncSession,
+        student_id: int,
+        subject_id: int,
+        subject_lessons: List[Dict]
+) -> List[Dict]:
+    viewed_lessons = await select_viewed_lecture_lessons_db(db=db, student_id=student_id, subject_id=subject_id)
 
-                        if student_lecture is not None and student_lecture.check is True:
-                            lesson_item["viewed"] = True
-                        else:
-                            lesson_item["viewed"] = False
-                    else:
-                        lesson_item["viewed"] = False
+    for item in subject_lessons:
+        for lesson_item in item["module_lessons"]:
+            if lesson_item["lesson_type"] == "lecture":
+                lesson_item["viewed"] = lesson_item["lesson_id"] in viewed_lessons
 
     return subject_lessons
@@ -0,0 +1,48 @@
+from typing import Any, Dict, Hashable, Iterable, List, Tuple
+
+
+class ConnectionRegistry:
+    def __init__(self):
+        self.rooms: Dict[Hashable, Dict[int, Dict[int, Any]]] = {}
+        self.index: Dict[int, Tuple[Hashable, int]] = {}
+
+    def add(self, room: Hashable, user_id: int, connection: Any):
+        self.rooms.setdefault(room, {}).setdefault(user_id, {})[id(connection)] = connection
+        self.index[id(connection)] = (room, user_id)
+
+    def remove(self, connection: Any) -> bool:
+        location = self.index.pop(id(connection), None)
+        if location is None:
+            return False
+
+        room, user_id = location
+        users = self.rooms[room]
+        del users[user_id][id(connection)]
+        if not users[user_id]:
+            del users[user_id]
+        if not users:
+            del self.rooms[room]
+        return True
+
+    def __contains__(self, connection: Any) -> bool:
+        return id(connection) in self.index
+
+    def user_connections(self, room: Hashable, user_id: int) -> List[Any]:
+        return list(self.rooms.get(room, {}).get(user_id, {}).values())
+
+    def users_connections(self, room: Hashable, user_ids: Iterable[int]) -> List[Any]:
+        users = self.rooms.get(room, {})
+        connections = []
+        for user_id in set(user_ids):
+            if user_id in users:
+                connections.extend(users[user_id].values())
+        return connections
+
+    def room_connections(self, room: Hashable) -> List[Any]:
+        return [connection for sockets in self.rooms.get(room, {}).values() for connection in sockets.values()]
+
+    def room_users(self, room: Hashable) -> List[int]:
+        return list(self.rooms.get(room, {}))
+
+    def room_size(self, room: Hashable) -> int:
+        return sum(len(sockets) for sockets in self.rooms.get(room, {}).values())
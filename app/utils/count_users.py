@@ -1,31 +1,32 @@
 from typing import Dict, List, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.group_chat_crud import select_curator_in_group_db, select_student_in_group_db
 from app.crud.subject_chat_crud import select_students_for_subject_db, select_teachers_for_subject_db
+from app.utils.image_derivatives import get_thumbnail_path
 
 
-def select_users_in_group(group_id: int, db: Session) -> List[Tuple]:
+async def select_users_in_group(group_id: int, db: AsyncSession) -> List[Tuple]:
     users = []
-    students = select_student_in_group_db(db=db, group_id=group_id)
+    students = await select_student_in_group_db(db=db, group_id=group_id)
     for student in students:
         users.append(student)
 
-    curators = select_curator_in_group_db(db=db, group_id=group_id)
+    curators = await select_curator_in_group_db(db=db, group_id=group_id)
     for curator in curators:
         users.append(curator)
 
     return users
 
 
-def select_users_in_subject(subject_id: int, db: Session) -> List[Tuple]:
+async def select_users_in_subject(subject_id: int, db: AsyncSession) -> List[Tuple]:
     users = []
-    students = select_students_for_subject_db(db=db, subject_id=subject_id)
+    students = await select_students_for_subject_db(db=db, subject_id=subject_id)
     for student in students:
         users.append(student)
 
-    teachers = select_teachers_for_subject_db(db=db, subject_id=subject_id)
+    teachers = await select_teachers_for_subject_db(db=db, subject_id=subject_id)
     for teacher in teachers:
         users.append(teacher)
 
@@ -38,6 +39,7 @@ def set_keyword_for_users_data(users: List) -> List[Dict]:
 
     for user in users:
         user_dict = dict(zip(fields, user))
+        user_dict["imageThumbnail"] = get_thumbnail_path(user_dict["imagePath"])
         users_info.append(user_dict)
 
     return users_info
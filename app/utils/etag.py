@@ -0,0 +1,17 @@
+import hashlib
+import json
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+
+
+def make_etag(data) -> str:
+    payload = json.dumps(jsonable_encoder(data), sort_keys=True, separators=(",", ":"))
+    return f'"{hashlib.sha1(payload.encode()).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
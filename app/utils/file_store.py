@@ -0,0 +1,111 @@
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from typing import BinaryIO, Callable, List, NamedTuple, Optional
+
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from app.crud.file_store_crud import acquire_blob_db, delete_unreferenced_blob_db, select_unreferenced_blobs_db
+from app.session import AsyncSessionLocal
+from app.setting import BLOB_GRACE_PERIOD, UPLOAD_CHUNK_SIZE
+from app.utils.storage import storage
+
+BLOB_FOLDER = 'static/blobs/'
+BLOB_TEMP_FOLDER = 'static/blobs/tmp/'
+
+
+class StoredFile(NamedTuple):
+    path: str
+    size: int
+    checksum: str
+
+
+def write_upload(source: BinaryIO, folder: str, max_size: int) -> StoredFile:
+    checksum = hashlib.sha256()
+    size = 0
+
+    source.seek(0)
+    descriptor, temp_path = tempfile.mkstemp(dir=folder, suffix=".part")
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            while chunk := source.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise HTTPException(status_code=413, detail=f"File is too large, max size is {max_size} bytes")
+                checksum.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+    return StoredFile(path=temp_path, size=size, checksum=checksum.hexdigest())
+
+
+def get_blob_path(checksum: str, filename: Optional[str]) -> str:
+    extension = os.path.splitext(filename or "")[1].lower()
+    if not re.fullmatch(r"\.\w+", extension):
+        extension = ""
+    return os.path.join(BLOB_FOLDER, checksum[:2], checksum[2:4], f"{checksum}{extension}")
+
+
+def get_grace_cutoff() -> datetime:
+    return datetime.utcnow() - timedelta(seconds=BLOB_GRACE_PERIOD)
+
+
+def is_blob_path(file_path: str) -> bool:
+    return os.path.normpath(file_path).startswith(os.path.normpath(BLOB_FOLDER) + os.sep)
+
+
+async def store_upload(
+        file: UploadFile,
+        max_size: int,
+        process: Optional[Callable[[str, str], None]] = None
+) -> StoredFile:
+    os.makedirs(BLOB_TEMP_FOLDER, exist_ok=True)
+    temp_file = await run_in_threadpool(write_upload, file.file, BLOB_TEMP_FOLDER, max_size)
+    source_path = None
+
+    try:
+        async with AsyncSessionLocal() as db:
+            blob_path = await acquire_blob_db(
+                db=db,
+                checksum=temp_file.checksum,
+                path=get_blob_path(temp_file.checksum, file.filename),
+                size=temp_file.size
+            )
+            await db.commit()
+
+        if not await run_in_threadpool(storage.exists, blob_path):
+            if process is not None:
+                source_path = f"{temp_file.path}.src"
+                await run_in_threadpool(shutil.copyfile, temp_file.path, source_path)
+            await run_in_threadpool(storage.put_file, temp_file.path, blob_path)
+    except BaseException:
+        if source_path and os.path.exists(source_path):
+            os.remove(source_path)
+        raise
+    finally:
+        if os.path.exists(temp_file.path):
+            os.remove(temp_file.path)
+
+    if source_path is not None:
+        process(source_path, blob_path)
+    return StoredFile(path=blob_path, size=temp_file.size, checksum=temp_file.checksum)
+
+
+async def collect_blob(file_path: str) -> bool:
+    async with AsyncSessionLocal() as db:
+        if not await delete_unreferenced_blob_db(db=db, path=file_path, acquired_before=get_grace_cutoff()):
+            return False
+        await run_in_threadpool(storage.delete, file_path)
+        await db.commit()
+    return True
+
+
+async def select_unreferenced_blobs(limit: int) -> List[str]:
+    async with AsyncSessionLocal() as db:
+        return await select_unreferenced_blobs_db(db=db, acquired_before=get_grace_cutoff(), limit=limit)
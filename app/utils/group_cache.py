@@ -0,0 +1,36 @@
+from typing import Dict, List
+
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.group_crud import select_group_students_db
+from app.setting import GROUP_MEMBERS_CACHE_TTL
+from app.utils.memory_cache import MemoryCache
+from app.utils.response_cache import response_cache
+
+group_students_cache = MemoryCache(ttl=GROUP_MEMBERS_CACHE_TTL)
+
+
+def group_students_tag(group_id: int) -> str:
+    return f"group-students:{group_id}"
+
+
+async def get_group_students(db: AsyncSession, group_id: int, subject_id: int) -> List[Dict]:
+    try:
+        generation = await response_cache.store.versions((group_students_tag(group_id),))
+    except RedisError:
+        generation = None
+
+    key = (group_id, subject_id, generation)
+    students = group_students_cache.get(key) if generation is not None else None
+    if students is None:
+        version = group_students_cache.version(key)
+        students = await select_group_students_db(db=db, group_id=group_id, subject_id=subject_id)
+        if generation is not None:
+            group_students_cache.set(key, students, version)
+    return students
+
+
+async def invalidate_group_students(*group_ids: int):
+    tags = {group_students_tag(group_id) for group_id in group_ids if group_id is not None}
+    await response_cache.invalidate(*tags)
@@ -1,14 +1,15 @@
 from typing import Dict
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.group_chat_crud import (create_attach_file_db, create_group_chat_answer, create_group_chat_massage,
                                       create_recipient_db, delete_answer_db, delete_attached_file_db, delete_message_db,
                                       select_answer_by_id_db, select_last_messages_db, select_message_by_id_db,
                                       update_answer_text_db, update_message_text_and_fixed_db, update_message_type_db)
-from app.models import GroupChat, GroupChatAnswer, User
+from app.models import GroupChat, GroupChatAnswer
 from app.utils.count_users import select_users_in_group, set_keyword_for_users_data
 from app.utils.save_images import delete_file
+from app.utils.token import Principal
 
 
 def set_last_messages_dict(messages_obj):
@@ -25,7 +26,7 @@ def set_last_messages_dict(messages_obj):
             "senderId": message.sender_id,
             "senderType": message.sender_type.value,
             "deleted": message.deleted,
-            "readBy": message.read_by.split(", ") if message.read_by else [],
+            "readBy": [receipt.user_id for receipt in message.read_receipt],
             "answers": [],
             "attachFiles": []
         }
@@ -38,7 +39,7 @@ def set_last_messages_dict(messages_obj):
                 "senderId": answer.sender_id,
                 "senderType": answer.sender_type.value,
                 "deleted": answer.deleted,
-                "readBy": answer.read_by.split(", ") if answer.read_by else [],
+                "readBy": [receipt.user_id for receipt in answer.read_receipt],
                 "attachFiles": []
             }
 
@@ -96,7 +97,7 @@ def set_last_message_dict(message_obj):
         "senderId": message_obj.sender_id,
         "senderType": message_obj.sender_type.value,
         "deleted": message_obj.deleted,
-        "readBy": message_obj.read_by.split(", ") if message_obj.read_by else [],
+        "readBy": [],
         "attachFiles": attach_files
     }
 
@@ -128,11 +129,11 @@ def set_last_answer_dict(answer_obj):
         "answerId": answer_obj[0].id,
         "answerText": answer_obj[0].message,
         "answerDatetime": answer_obj[0].datetime_message.strftime("%d.%m.%Y %H:%M:%S"),
-        "messageId": answer_obj[0].group_chat.id,
+        "messageId": answer_obj[0].group_chat_id,
         "senderId": answer_obj[0].sender_id,
         "senderType": answer_obj[0].sender_type,
         "deleted": answer_obj[0].deleted,
-        "readBy": answer_obj[0].read_by.split(",") if answer_obj[0].read_by else [],
+        "readBy": [],
         "attachFiles": attach_files
     }
 
@@ -173,7 +174,7 @@ def set_updated_message(message_obj: GroupChat):
                 "answerDatetime": answer.datetime_message.strftime("%d.%m.%Y %H:%M:%S"),
                 "senderId": answer.sender_id,
                 "senderType": answer.sender_type,
-                "readBy": answer.read_by.split(",") if answer.read_by else [],
+                "readBy": [receipt.user_id for receipt in answer.read_receipt],
                 "deleted": answer.deleted,
                 "attachFiles": answer_attach_files
             }
@@ -189,7 +190,7 @@ def set_updated_message(message_obj: GroupChat):
         "senderType": message_obj.sender_type,
         "fixed": message_obj.fixed,
         "deleted": message_obj.deleted,
-        "readBy": message_obj.read_by.split(",") if message_obj.read_by else [],
+        "readBy": [receipt.user_id for receipt in message_obj.read_receipt],
         "recipient": [rec.recipient_id for rec in message_obj.recipient] if message_obj.recipient else [],
         "attachFiles": attach_file,
         "answers": answers
@@ -216,24 +217,24 @@ def set_updated_answer(answer_obj: GroupChatAnswer):
         "answerDatetime": answer_obj.datetime_message.strftime("%d.%m.%Y %H:%M:%S"),
         "senderId": answer_obj.sender_id,
         "senderType": answer_obj.sender_type,
-        "readBy": answer_obj.read_by.split(",") if answer_obj.read_by else [],
+        "readBy": [receipt.user_id for receipt in answer_obj.read_receipt],
         "deleted": answer_obj.deleted,
         "attachFiles": attach_file
     }
     return answer
 
 
-def create_last_message_data(db: Session, group_id: int, user: User):
-    users = select_users_in_group(group_id=group_id, db=db)
+async def create_last_message_data(db: AsyncSession, group_id: int, user: Principal):
+    users = await select_users_in_group(group_id=group_id, db=db)
     user_info = set_keyword_for_users_data(users)
-    messages_obj = select_last_messages_db(db=db, group_id=group_id, recipient_id=user.id)
+    messages_obj = await select_last_messages_db(db=db, group_id=group_id, recipient_id=user.id)
     last_messages = set_last_messages_dict(messages_obj=messages_obj)
     last_messages['userInfo'] = user_info
     return last_messages
 
 
-def save_message_data_to_db(db: Session, group_id: int, data: Dict):
-    new_message = create_group_chat_massage(
+async def save_message_data_to_db(db: AsyncSession, group_id: int, data: Dict):
+    new_message = await create_group_chat_massage(
         db=db,
         message=data.get("message"),
         message_type=data.get("messageType"),
@@ -244,14 +245,14 @@ def save_message_data_to_db(db: Session, group_id: int, data: Dict):
     )
 
     if data.get("attachFiles") is not None:
-        create_attach_file_db(db=db, attach_files=data.get("attachFiles"), chat_message=new_message.id)
+        await create_attach_file_db(db=db, attach_files=data.get("attachFiles"), chat_message=new_message.id)
 
     if data.get("recipient") is not None:
-        create_recipient_db(db=db, recipient=data.get("recipient"), group_chat_id=new_message.id)
+        await create_recipient_db(db=db, recipient=data.get("recipient"), group_chat_id=new_message.id)
 
 
-def save_answer_data_to_db(db: Session, data: Dict):
-    new_answer = create_group_chat_answer(
+async def save_answer_data_to_db(db: AsyncSession, data: Dict):
+    new_answer = await create_group_chat_answer(
         db=db,
         message=data.get("message"),
         group_chat_id=data.get("messageId"),
@@ -260,12 +261,12 @@ def save_answer_data_to_db(db: Session, data: Dict):
     )
 
     if data.get("attachFiles") is not None:
-        create_attach_file_db(db=db, attach_files=data.get("attachFiles"), chat_answer=new_answer.id)
+        await create_attach_file_db(db=db, attach_files=data.get("attachFiles"), chat_answer=new_answer.id)
 
 
-def delete_message_data(db: Session, data: Dict):
-    chat_message = select_message_by_id_db(db=db, message_id=data.get("messageId"))
-    chat_message = delete_message_db(db=db, message=chat_message)
+async def delete_message_data(db: AsyncSession, data: Dict):
+    chat_message = await select_message_by_id_db(db=db, message_id=data.get("messageId"))
+    chat_message = await delete_message_db(db=db, message=chat_message)
 
     if chat_message.message_type == "everyone":
         return {"messageType": "everyone"}
@@ -276,9 +277,9 @@ def delete_message_data(db: Session, data: Dict):
         }
 
 
-def delete_answer_data(db: Session, data: Dict):
-    answer = select_answer_by_id_db(db=db, answer_id=data.get("answerId"))
-    answer = delete_answer_db(db=db, answer=answer)
+async def delete_answer_data(db: AsyncSession, data: Dict):
+    answer = await select_answer_by_id_db(db=db, answer_id=data.get("answerId"))
+    answer = await delete_answer_db(db=db, answer=answer)
     message = answer.group_chat
 
     if message.message_type == "everyone":
@@ -292,40 +293,50 @@ def delete_answer_data(db: Session, data: Dict):
                 "recipients": [recipient.recipient_id for recipient in message.recipient]}
 
 
-def update_message_data_to_db(db: Session, data: Dict):
-    message = select_message_by_id_db(db=db, message_id=data.get("messageId"))
+async def update_message_data_to_db(db: AsyncSession, data: Dict):
+    message = await select_message_by_id_db(db=db, message_id=data.get("messageId"))
 
     if len(message.attach_file) >= 1:
+        kept_paths = {attach_file["path"] for attach_file in data.get("attachFiles") or []}
         for attach_file in message.attach_file:
-            delete_file(file_path=attach_file.file_path)
-            delete_attached_file_db(db=db, file_id=attach_file.id)
+            file_path = attach_file.file_path
+            await delete_attached_file_db(db=db, file_id=attach_file.id)
+            if file_path not in kept_paths:
+                await delete_file(file_path=file_path)
 
     if data.get("attachFiles") is not None:
-        create_attach_file_db(db=db, attach_files=data.get("attachFiles"), chat_message=data.get("messageId"))
+        await create_attach_file_db(db=db, attach_files=data.get("attachFiles"), chat_message=data.get("messageId"))
 
     if data.get("message") != message.message or data.get("fixed") != message.fixed:
-        update_message_text_and_fixed_db(db=db, new_text=data.get("message"), fixed=data.get("fixed"), message=message)
+        await update_message_text_and_fixed_db(
+            db=db,
+            new_text=data.get("message"),
+            fixed=data.get("fixed"),
+            message=message
+        )
 
-    if message.message_type == data.get("messageType"):
-        message_data = set_updated_message(message)
-        return message_data
-    else:
-        update_message_type_db(db=db, message_type=data.get("messageType"),
-                               recipients=data.get("recipient"), message=message)
-        message_data = set_updated_message(message)
-        return message_data
+    if message.message_type != data.get("messageType"):
+        await update_message_type_db(db=db, message_type=data.get("messageType"),
+                                     recipients=data.get("recipient"), message=message)
+
+    message = await select_message_by_id_db(db=db, message_id=message.id)
+    message_data = set_updated_message(message)
+    return message_data
 
 
-def update_answer_data_to_db(db: Session, data: Dict):
-    answer = select_answer_by_id_db(db=db, answer_id=data.get("answerId"))
+async def update_answer_data_to_db(db: AsyncSession, data: Dict):
+    answer = await select_answer_by_id_db(db=db, answer_id=data.get("answerId"))
 
     if len(answer.attach_file) >= 1:
+        kept_paths = {attach_file["path"] for attach_file in data.get("attachFiles") or []}
         for attach_file in answer.attach_file:
-            delete_file(file_path=attach_file.file_path)
-            delete_attached_file_db(db=db, file_id=attach_file.id)
+            file_path = attach_file.file_path
+            await delete_attached_file_db(db=db, file_id=attach_file.id)
+            if file_path not in kept_paths:
+                await delete_file(file_path=file_path)
 
     if data.get("attachFiles") is not None:
-        create_attach_file_db(db=db, attach_files=data.get("attachFiles"), chat_answer=data.get("answerId"))
+        await create_attach_file_db(db=db, attach_files=data.get("attachFiles"), chat_answer=data.get("answerId"))
 
     message = answer.group_chat
     result = {
@@ -334,10 +345,9 @@ def update_answer_data_to_db(db: Session, data: Dict):
         "messageRecipient": [rec.recipient_id for rec in message.recipient] if message.recipient else []
     }
 
-    if answer.message == data.get("answerText"):
-        result["answerData"] = set_updated_answer(answer)
-        return result
-    else:
-        update_answer_text_db(db=db, answer_text=data.get("answerText"), answer=answer)
-        result["answerData"] = set_updated_answer(answer)
-        return result
+    if answer.message != data.get("answerText"):
+        await update_answer_text_db(db=db, answer_text=data.get("answerText"), answer=answer)
+
+    answer = await select_answer_by_id_db(db=db, answer_id=answer.id)
+    result["answerData"] = set_updated_answer(answer)
+    return result
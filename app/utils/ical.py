@@ -0,0 +1,68 @@
+from datetime import datetime
+from typing import Dict, List
+
+ICAL_LINE_LIMIT = 75
+
+
+def escape_ical_text(value) -> str:
+    return str(value).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def fold_ical_line(line: str) -> str:
+    parts = []
+    current = ""
+    for char in line:
+        limit = ICAL_LINE_LIMIT if not parts else ICAL_LINE_LIMIT - 1
+        if len((current + char).encode()) > limit:
+            parts.append(current)
+            current = ""
+        current += char
+    parts.append(current)
+    return "\r\n ".join(parts)
+
+
+def format_ical_datetime(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def set_lesson_event(lesson: Dict, stamp: str) -> List[str]:
+    start = lesson["lesson_date"]
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:lesson-{lesson['lesson_id']}@education-platform",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART:{format_ical_datetime(start)}"
+    ]
+    if lesson["lesson_end"] and lesson["lesson_end"] > start.time():
+        lines.append(f"DTEND:{format_ical_datetime(datetime.combine(start.date(), lesson['lesson_end']))}")
+
+    lines.append(f"SUMMARY:{escape_ical_text(lesson['subject_name'])}: {escape_ical_text(lesson['lesson_name'])}")
+
+    description = []
+    if lesson["lesson_type"]:
+        description.append(getattr(lesson["lesson_type"], "value", lesson["lesson_type"]))
+    if lesson["teacher_name"] or lesson["teacher_surname"]:
+        description.append(" ".join(filter(None, [lesson["teacher_name"], lesson["teacher_surname"]])))
+    if lesson["group_name"]:
+        description.append(lesson["group_name"])
+    if description:
+        lines.append(f"DESCRIPTION:{escape_ical_text(chr(10).join(description))}")
+
+    lines.append("END:VEVENT")
+    return lines
+
+
+def build_calendar(schedule: List[Dict], calendar_name: str) -> str:
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//EduGain//Education Platform//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape_ical_text(calendar_name)}"
+    ]
+    for lesson in schedule:
+        lines.extend(set_lesson_event(lesson, stamp))
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(fold_ical_line(line) for line in lines) + "\r\n"
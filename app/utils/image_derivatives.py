@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from app.crud.file_store_crud import lock_blob_db
+from app.session import SessionLocal
+from app.setting import IMAGE_DERIVATIVE_SIZES, IMAGE_DERIVATIVE_WORKERS
+from app.utils.file_store import BLOB_TEMP_FOLDER, is_blob_path
+from app.utils.storage import storage
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_FOLDER = 'static/blobs/derived/'
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp"}
+
+derivative_executor = ThreadPoolExecutor(max_workers=IMAGE_DERIVATIVE_WORKERS, thread_name_prefix="image-derivatives")
+
+
+def is_image_file(filename: Optional[str]) -> bool:
+    return os.path.splitext(filename or "")[1].lower() in IMAGE_EXTENSIONS
+
+
+def get_derivative_paths(file_path: Optional[str]) -> Dict[str, str]:
+    if not file_path or not is_blob_path(file_path) or not is_image_file(file_path):
+        return {}
+
+    checksum = os.path.splitext(os.path.basename(file_path))[0]
+    return {
+        str(size): os.path.join(DERIVATIVE_FOLDER, checksum[:2], checksum[2:4], f"{checksum}-{size}.webp")
+        for size in IMAGE_DERIVATIVE_SIZES
+    }
+
+
+def get_thumbnail_path(file_path: Optional[str]) -> Optional[str]:
+    return get_derivative_paths(file_path).get(str(min(IMAGE_DERIVATIVE_SIZES)))
+
+
+def put_derivative(temp_path: str, file_path: str, derivative_path: str) -> bool:
+    with SessionLocal() as db:
+        if not lock_blob_db(db=db, path=file_path):
+            return False
+        storage.put_file(temp_path, derivative_path)
+        db.commit()
+    return True
+
+
+def generate_derivatives(source_path: str, file_path: str):
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        logger.warning("Pillow is not installed, skipping image derivatives for %s", file_path)
+        os.remove(source_path)
+        return
+
+    try:
+        with Image.open(source_path) as image:
+            image = ImageOps.exif_transpose(image)
+            for size, derivative_path in get_derivative_paths(file_path).items():
+                if storage.exists(derivative_path):
+                    continue
+
+                derivative = image.copy()
+                derivative.thumbnail((int(size), int(size)))
+                descriptor, temp_path = tempfile.mkstemp(dir=BLOB_TEMP_FOLDER, suffix=".webp")
+                try:
+                    with os.fdopen(descriptor, "wb") as f:
+                        derivative.save(f, "WEBP", quality=80)
+                    if not put_derivative(temp_path, file_path, derivative_path):
+                        return
+                finally:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+    except Exception:
+        logger.exception("Failed to generate image derivatives for %s", file_path)
+    finally:
+        os.remove(source_path)
+
+
+def schedule_derivatives(source_path: str, file_path: str):
+    asyncio.get_running_loop().run_in_executor(derivative_executor, generate_derivatives, source_path, file_path)
+
+
+def remove_derivatives(file_path: str):
+    for derivative_path in get_derivative_paths(file_path).values():
+        storage.delete(derivative_path)
@@ -6,15 +6,15 @@ from app.models import SubjectInstruction, SubjectInstructionCategory, SubjectIn
 from app.utils.save_images import save_subject_instructions
 
 
-def save_subject_instruction_file(files: List[UploadFile]) -> List:
+async def save_subject_instruction_file(files: List[UploadFile]) -> List:
     result = []
 
     for file in files:
-        file_path = save_subject_instructions(file=file)
+        stored_file = await save_subject_instructions(file=file)
         file_info_dict = {
-            "filePath": file_path,
+            "filePath": stored_file.path,
             "fileName": file.filename,
-            "fileSize": file.size,
+            "fileSize": stored_file.size,
             "fileType": file.filename.split(".")[-1]
         }
 
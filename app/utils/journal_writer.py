@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from typing import Dict, List
+
+from app.celery import process_journal_events, write_journal_events
+from app.setting import (BROKER_URL, JOURNAL_BATCH_SIZE, JOURNAL_FLUSH_INTERVAL, JOURNAL_MAX_PENDING,
+                         JOURNAL_MAX_RETRY_DELAY, JOURNAL_RETRY_DELAY)
+
+logger = logging.getLogger(__name__)
+
+
+def send_to_broker(events: List[Dict]):
+    write_journal_events.delay(events)
+
+
+class JournalWriter:
+    def __init__(
+            self,
+            sink,
+            batch_size: int,
+            flush_interval: float,
+            max_pending: int,
+            retry_delay: float,
+            max_retry_delay: float
+    ):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.events = []
+        self.task = None
+        self.lock = asyncio.Lock()
+        self.failures = 0
+        self.dropped = 0
+
+    def push(self, event: Dict):
+        if len(self.events) >= self.max_pending:
+            if not self.dropped:
+                logger.error("Journal buffer is full with %s events, dropping new events", len(self.events))
+            self.dropped += 1
+            return
+
+        self.events.append(event)
+        if len(self.events) >= self.batch_size and not self.failures:
+            asyncio.get_running_loop().create_task(self.flush())
+        self.schedule(self.flush_interval)
+
+    def schedule(self, delay: float):
+        if self.task is None or self.task.done() or self.task is asyncio.current_task():
+            self.task = asyncio.get_running_loop().create_task(self.flush_later(delay))
+
+    def lecture_viewed(self, student_id: int, lecture_id: int):
+        self.push({"type": "lecture", "student_id": student_id, "lecture_id": lecture_id})
+
+    def test_scored(self, student_id: int, test_id: int, score: float):
+        self.push({"type": "test", "student_id": student_id, "test_id": test_id, "score": score})
+
+    async def flush_later(self, delay: float):
+        await asyncio.sleep(delay)
+        await self.flush()
+
+    async def flush(self):
+        async with self.lock:
+            while self.events:
+                events = self.events[:self.batch_size]
+                try:
+                    await asyncio.to_thread(self.sink, events)
+                except Exception:
+                    self.failures += 1
+                    delay = min(self.retry_delay * 2 ** (self.failures - 1), self.max_retry_delay)
+                    logger.exception(
+                        "Failed to write %s journal events, retry %s in %ss", len(self.events), self.failures, delay
+                    )
+                    self.schedule(delay)
+                    return
+
+                del self.events[:len(events)]
+                self.failures = 0
+                if self.dropped:
+                    logger.error("Dropped %s journal events while the journal sink was unavailable", self.dropped)
+                    self.dropped = 0
+
+    async def stop(self):
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+        await self.flush()
+        if self.events or self.dropped:
+            logger.error("Lost %s journal events on shutdown", len(self.events) + self.dropped)
+
+
+journal_writer = JournalWriter(
+    sink=send_to_broker if BROKER_URL else process_journal_events,
+    batch_size=JOURNAL_BATCH_SIZE,
+    flush_interval=0 if BROKER_URL else JOURNAL_FLUSH_INTERVAL,
+    max_pending=JOURNAL_MAX_PENDING,
+    retry_delay=JOURNAL_RETRY_DELAY,
+    max_retry_delay=JOURNAL_MAX_RETRY_DELAY
+)
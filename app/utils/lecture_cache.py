@@ -0,0 +1,56 @@
+from typing import Dict, Optional, Tuple
+
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.lecture_crud import select_lecture_lesson_id_db, select_lecture_page_db
+from app.setting import LECTURE_CACHE_TTL
+from app.utils.etag import make_etag
+from app.utils.lesson_utils import get_lecture_attributes_info
+from app.utils.memory_cache import MemoryCache
+from app.utils.response_cache import response_cache
+
+lecture_page_cache = MemoryCache(ttl=LECTURE_CACHE_TTL)
+
+
+def lecture_page_tag(lesson_id: int) -> str:
+    return f"lecture-page:{lesson_id}"
+
+
+async def get_lecture_page(db: AsyncSession, lesson_id: int) -> Optional[Tuple[Dict, str]]:
+    try:
+        generation = await response_cache.store.versions((lecture_page_tag(lesson_id),))
+    except RedisError:
+        generation = None
+
+    key = (lesson_id, generation)
+    page = lecture_page_cache.get(key) if generation is not None else None
+    if page is None:
+        version = lecture_page_cache.version(key)
+        lesson = await select_lecture_page_db(db=db, lesson_id=lesson_id)
+        if lesson is None:
+            return None
+
+        base_info = {
+            "lessonTitle": lesson.title,
+            "lessonDescription": lesson.description,
+            "lessonDate": lesson.lesson_date,
+            "lessonEnd": lesson.lesson_end,
+        }
+        if lesson.lecture:
+            base_info = get_lecture_attributes_info(base_info=base_info, lecture=lesson.lecture[0])
+
+        page = (base_info, make_etag(base_info))
+        if generation is not None:
+            lecture_page_cache.set(key, page, version)
+    return page
+
+
+async def invalidate_lecture_page(lesson_id: int):
+    await response_cache.invalidate(lecture_page_tag(lesson_id))
+
+
+async def invalidate_lecture_page_by_lecture(db: AsyncSession, lecture_id: int):
+    lesson_id = await select_lecture_lesson_id_db(db=db, lecture_id=lecture_id)
+    if lesson_id is not None:
+        await invalidate_lecture_page(lesson_id)
@@ -1,13 +1,13 @@
 from typing import Dict
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.lesson_crud import get_lesson_info_db
 from app.models import Lecture, TestAnswer, TestLesson, TestQuestion
 
 
-def get_lesson_base_info(db: Session, lesson_id: int) -> Dict:
-    lesson_base = get_lesson_info_db(db=db, lesson_id=lesson_id)
+async def get_lesson_base_info(db: AsyncSession, lesson_id: int) -> Dict:
+    lesson_base = await get_lesson_info_db(db=db, lesson_id=lesson_id)
 
     result = {
         "lessonTitle": lesson_base.lessonTitle,
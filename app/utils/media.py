@@ -0,0 +1,115 @@
+import hashlib
+import mimetypes
+import os
+from typing import Optional, Tuple
+
+import anyio
+from fastapi import HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import RedirectResponse, StreamingResponse
+
+from app.setting import MEDIA_ACCEL_MODE, MEDIA_ACCEL_PREFIX, MEDIA_CHUNK_SIZE
+from app.utils.file_store import is_blob_path
+from app.utils.storage import storage
+
+MEDIA_ROOT = os.path.realpath('static')
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+
+def resolve_media_path(file_path: str) -> str:
+    path = os.path.realpath(file_path)
+    if os.path.commonpath([path, MEDIA_ROOT]) != MEDIA_ROOT or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="File not found")
+    return path
+
+
+def make_media_etag(file_path: str, stat: os.stat_result) -> str:
+    if is_blob_path(file_path):
+        return f'"{os.path.splitext(os.path.basename(file_path))[0]}"'
+    return '"' + hashlib.sha1(f"{stat.st_ino}-{stat.st_size}-{stat.st_mtime_ns}".encode()).hexdigest() + '"'
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+
+    start, _, end = range_header[6:].strip().partition("-")
+    try:
+        if start:
+            first, last = int(start), int(end) if end else size - 1
+        else:
+            first, last = size - int(end), size - 1
+    except ValueError:
+        return None
+
+    first, last = max(first, 0), min(last, size - 1)
+    if first > last:
+        raise HTTPException(
+            status_code=416,
+            detail="Range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return first, last
+
+
+async def read_file_range(path: str, first: int, last: int):
+    async with await anyio.open_file(path, "rb") as f:
+        await f.seek(first)
+        remaining = last - first + 1
+        while remaining > 0:
+            chunk = await f.read(min(MEDIA_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def media_response(request: Request, file_path: str) -> Response:
+    path = resolve_media_path(file_path)
+    stat = os.stat(path)
+    etag = make_media_etag(file_path, stat)
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if is_blob_path(file_path) else REVALIDATE_CACHE_CONTROL
+    }
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    if MEDIA_ACCEL_MODE == "x-accel":
+        relative_path = os.path.relpath(path, MEDIA_ROOT).replace(os.sep, "/")
+        headers["X-Accel-Redirect"] = MEDIA_ACCEL_PREFIX.rstrip("/") + "/" + relative_path
+        return Response(headers=headers, media_type=media_type)
+    if MEDIA_ACCEL_MODE == "x-sendfile":
+        headers["X-Sendfile"] = path
+        return Response(headers=headers, media_type=media_type)
+
+    byte_range = None
+    if request.headers.get("if-range", etag) == etag:
+        byte_range = parse_range(request.headers.get("range"), stat.st_size)
+
+    status_code = 200
+    first, last = 0, stat.st_size - 1
+    if byte_range:
+        status_code = 206
+        first, last = byte_range
+        headers["Content-Range"] = f"bytes {first}-{last}/{stat.st_size}"
+    headers["Content-Length"] = str(last - first + 1)
+
+    if request.method == "HEAD" or stat.st_size == 0:
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+    return StreamingResponse(read_file_range(path, first, last), status_code=status_code, headers=headers,
+                             media_type=media_type)
+
+
+async def stored_media_response(request: Request, file_path: str) -> Response:
+    if not storage.is_remote or not is_blob_path(file_path):
+        return media_response(request=request, file_path=file_path)
+
+    key = os.path.normpath(file_path)
+    if not await run_in_threadpool(storage.exists, key):
+        raise HTTPException(status_code=404, detail="File not found")
+    return RedirectResponse(storage.url(key))
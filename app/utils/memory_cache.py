@@ -0,0 +1,45 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class MemoryCache:
+    def __init__(self, ttl: float, max_size: int = 1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.items = OrderedDict()
+        self.generation = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self.items.get(key)
+        if item is None:
+            return None
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self.items[key]
+            return None
+
+        self.items.move_to_end(key)
+        return value
+
+    def version(self, key: Hashable) -> int:
+        return self.generation
+
+    def set(self, key: Hashable, value: Any, version: int, ttl: Optional[float] = None):
+        if self.generation != version:
+            return
+
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self.items[key] = (time.monotonic() + ttl, value)
+        self.items.move_to_end(key)
+        while len(self.items) > self.max_size:
+            self.items.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        self.generation += 1
+        self.items.pop(key, None)
+
+    def clear(self):
+        self.generation += 1
+        self.items.clear()
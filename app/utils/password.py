@@ -1,10 +1,67 @@
-from passlib.hash import bcrypt
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
 
+from fastapi import HTTPException
+from passlib.context import CryptContext
 
-def hash_password(password: str) -> str:
-    hashed_password = bcrypt.hash(password)
-    return hashed_password
+from app.setting import BCRYPT_ROUNDS, PASSWORD_POOL_QUEUE_SIZE, PASSWORD_POOL_SIZE
 
+password_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=BCRYPT_ROUNDS)
 
-def check_password(password: str, hashed_password: str) -> bool:
-    return bcrypt.verify(password, hashed_password)
+
+class PasswordPool:
+    def __init__(self, workers: int, queue_size: int, samples: int = 1000):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+        self.workers = workers
+        self.queue_size = queue_size
+        self.pending = 0
+        self.max_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.waits = deque(maxlen=samples)
+
+    async def run(self, func: Callable, *args):
+        if self.pending >= self.workers + self.queue_size:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Server is busy, try again later")
+
+        self.pending += 1
+        self.max_pending = max(self.max_pending, self.pending)
+        queued_at = time.perf_counter()
+
+        def task():
+            self.waits.append(time.perf_counter() - queued_at)
+            return func(*args)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, task)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def summary(self) -> Dict:
+        waits = sorted(self.waits)
+        return {
+            "workers": self.workers,
+            "queueSize": self.queue_size,
+            "pending": self.pending,
+            "maxPending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "p50WaitMs": round(waits[len(waits) // 2] * 1000, 2) if waits else None,
+            "p95WaitMs": round(waits[int(len(waits) * 0.95)] * 1000, 2) if waits else None
+        }
+
+
+password_pool = PasswordPool(workers=PASSWORD_POOL_SIZE, queue_size=PASSWORD_POOL_QUEUE_SIZE)
+
+
+async def hash_password(password: str) -> str:
+    return await password_pool.run(password_context.hash, password)
+
+
+async def check_password(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await password_pool.run(password_context.verify_and_update, password, hashed_password)
@@ -0,0 +1,146 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.setting import QUERY_REPEAT_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER = r"(?:\?|%s|:\w+|\$\d+)"
+PLACEHOLDER_LIST = re.compile(rf"\(\s*{PLACEHOLDER}(?:\s*,\s*{PLACEHOLDER})*\s*\)")
+WHITESPACE = re.compile(r"\s+")
+
+active_query_stats: ContextVar[Tuple["QueryStats", ...]] = ContextVar("active_query_stats", default=())
+
+
+def get_statement_shape(statement: str) -> str:
+    return PLACEHOLDER_LIST.sub("(?)", WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.duration += duration
+        self.shapes[get_statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int = QUERY_REPEAT_THRESHOLD) -> Dict[str, int]:
+        return {shape: count for shape, count in self.shapes.items() if count >= threshold}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    for stats in active_query_stats.get():
+        stats.record(statement, duration)
+
+
+def handle_error(exception_context):
+    start_times = exception_context.connection.info.get("query_start_time") if exception_context.connection else None
+    if start_times:
+        start_times.pop()
+
+
+def instrument_engine(engine: Engine):
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = active_query_stats.set(active_query_stats.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        active_query_stats.reset(token)
+
+
+def check_query_budget(count: int, repeated: int, max_queries: int, allow_repeated: bool = False):
+    if count > max_queries:
+        raise QueryBudgetExceeded(f"{count} queries exceed the budget of {max_queries}")
+    if repeated and not allow_repeated:
+        raise QueryBudgetExceeded(
+            f"{repeated} statements were repeated at least {QUERY_REPEAT_THRESHOLD} times, likely an N+1 loop"
+        )
+
+
+@contextmanager
+def query_budget(max_queries: int, allow_repeated: bool = False) -> Iterator[QueryStats]:
+    with track_queries() as stats:
+        yield stats
+    check_query_budget(stats.count, len(stats.repeated()), max_queries, allow_repeated)
+
+
+def assert_query_budget(response, max_queries: int, allow_repeated: bool = False):
+    check_query_budget(
+        int(response.headers["X-DB-Query-Count"]),
+        int(response.headers.get("X-DB-Repeated-Queries", 0)),
+        max_queries,
+        allow_repeated
+    )
+
+
+def log_query_stats(scope: Scope, stats: QueryStats):
+    fields = {
+        "method": scope["method"],
+        "path": scope["path"],
+        "db_queries": stats.count,
+        "db_time_ms": round(stats.duration * 1000, 1)
+    }
+    repeated = stats.repeated()
+    if repeated:
+        shapes = "; ".join(f"{count}x {shape[:200]}" for shape, count in repeated.items())
+        logger.warning("Repeated queries in %s %s: %s", scope["method"], scope["path"], shapes, extra=fields)
+    else:
+        logger.debug(
+            "%s %s ran %s queries in %.1fms",
+            scope["method"], scope["path"], fields["db_queries"], fields["db_time_ms"], extra=fields
+        )
+
+
+class QueryCounterMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_with_query_headers(message: Message):
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Query-Count"] = str(stats.count)
+                    headers["X-DB-Query-Time"] = f"{stats.duration * 1000:.1f}"
+                    repeated = stats.repeated()
+                    if repeated:
+                        headers["X-DB-Repeated-Queries"] = str(len(repeated))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_query_headers)
+            finally:
+                log_query_stats(scope, stats)
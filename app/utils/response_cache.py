@@ -0,0 +1,163 @@
+import asyncio
+import functools
+import inspect
+import json
+from collections import Counter, defaultdict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.setting import RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL, RESPONSE_CACHE_URL, WEB_CONCURRENCY
+from app.utils.memory_cache import MemoryCache
+
+
+class InMemoryCacheStore:
+    def __init__(self):
+        self.tags = Counter()
+
+    async def versions(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(self.tags[tag] for tag in tags)
+
+    async def invalidate(self, tags: Iterable[str]):
+        for tag in tags:
+            self.tags[tag] += 1
+
+    async def get(self, key: str) -> Optional[Any]:
+        return None
+
+    async def set(self, key: str, value: Any, ttl: float):
+        return None
+
+
+class RedisCacheStore:
+    def __init__(self, url: str):
+        self.redis = aioredis.from_url(url, decode_responses=True)
+
+    async def versions(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        keys = [f"cache:tag:{tag}" for tag in tags]
+        if not keys:
+            return ()
+        return tuple(int(version or 0) for version in await self.redis.mget(keys))
+
+    async def invalidate(self, tags: Iterable[str]):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.incr(f"cache:tag:{tag}")
+            await pipe.execute()
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self.redis.get(f"cache:{key}")
+        return None if value is None else json.loads(value)
+
+    async def set(self, key: str, value: Any, ttl: float):
+        await self.redis.set(f"cache:{key}", json.dumps(value), ex=max(1, int(ttl)))
+
+
+def create_cache_store(url: str | None, workers: int = 1):
+    if url:
+        return RedisCacheStore(url)
+    if workers > 1:
+        raise RuntimeError("RESPONSE_CACHE_URL is required when running more than one worker")
+    return InMemoryCacheStore()
+
+
+class ResponseCache:
+    def __init__(self, store, ttl: float, max_size: int):
+        self.store = store
+        self.ttl = ttl
+        self.local = MemoryCache(ttl=ttl, max_size=max_size)
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.counters = defaultdict(Counter)
+
+    async def get_or_load(
+            self,
+            name: str,
+            key: str,
+            tags: Tuple[str, ...],
+            loader: Callable[[], Awaitable[Any]],
+            ttl: Optional[float] = None
+    ) -> Any:
+        try:
+            versions = await self.store.versions(tags)
+        except RedisError:
+            self.counters[name]["errors"] += 1
+            return jsonable_encoder(await loader())
+
+        cache_key = f"{name}:{key}:{'.'.join(map(str, versions))}"
+        value = self.local.get(cache_key)
+        if value is not None:
+            self.counters[name]["local_hits"] += 1
+            return value
+
+        while (future := self.inflight.get(cache_key)) is not None:
+            self.counters[name]["coalesced"] += 1
+            loaded, value = await asyncio.shield(future)
+            if loaded:
+                return value
+
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[cache_key] = future
+        try:
+            value = await self.load(name, cache_key, loader, ttl or self.ttl)
+            future.set_result((True, value))
+            return value
+        except BaseException:
+            future.set_result((False, None))
+            raise
+        finally:
+            del self.inflight[cache_key]
+
+    async def load(self, name: str, cache_key: str, loader: Callable[[], Awaitable[Any]], ttl: float) -> Any:
+        version = self.local.version(cache_key)
+        try:
+            value = await self.store.get(cache_key)
+        except RedisError:
+            self.counters[name]["errors"] += 1
+            value = None
+
+        if value is not None:
+            self.counters[name]["remote_hits"] += 1
+        else:
+            self.counters[name]["misses"] += 1
+            value = jsonable_encoder(await loader())
+            try:
+                await self.store.set(cache_key, value, ttl)
+            except RedisError:
+                self.counters[name]["errors"] += 1
+
+        self.local.set(cache_key, value, version, ttl)
+        return value
+
+    def cached(self, name: str, tags: Tuple[str, ...] = (), ttl: Optional[float] = None):
+        def decorator(func):
+            signature = inspect.signature(func)
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                params = {
+                    param: value for param, value in bound.arguments.items() if not isinstance(value, AsyncSession)
+                }
+                key = json.dumps(params, sort_keys=True, default=str)
+                resolved_tags = tuple(tag.format(**params) for tag in tags)
+                return await self.get_or_load(name, key, resolved_tags, lambda: func(*args, **kwargs), ttl)
+
+            return wrapper
+        return decorator
+
+    async def invalidate(self, *tags: str):
+        await self.store.invalidate(tags)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: dict(counters) for name, counters in self.counters.items()}
+
+
+response_cache = ResponseCache(
+    create_cache_store(RESPONSE_CACHE_URL, WEB_CONCURRENCY),
+    ttl=RESPONSE_CACHE_TTL,
+    max_size=RESPONSE_CACHE_SIZE
+)
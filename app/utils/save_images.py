@@ -1,128 +1,116 @@
+import asyncio
+import logging
 import os
-from datetime import datetime
+from typing import Optional
 
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 
-STUDENT_AVATAR_FOLDER = 'static/images/student-avatar/'
-TEACHER_AVATAR_FOLDER = 'static/images/teacher-avatar/'
-SUBJECT_AVATAR_FOLDER = 'static/images/subject/photo/'
-SUBJECT_LOGO_FOLDER = 'static/images/subject/logo/'
-SUBJECT_PROGRAM_FOLDER = 'static/images/subject/program/'
-SUBJECT_ICON_FOLDER = 'static/images/subject/icons/'
-SUBJECT_INSTRUCTION_FOLDER = 'static/images/subject/instruction/'
-LESSON_FILE_FOLDER = 'static/images/lesson-files/'
-SUBJECT_CHAT_FOLDER = 'static/chat/subject/'
-GROUP_CHAT_FOLDER = 'static/chat/group/'
+from app.setting import (BLOB_SWEEP_BATCH_SIZE, BLOB_SWEEP_INTERVAL, MAX_CHAT_UPLOAD_SIZE, MAX_DOCUMENT_UPLOAD_SIZE,
+                         MAX_IMAGE_UPLOAD_SIZE, MAX_LESSON_UPLOAD_SIZE)
+from app.utils.file_store import StoredFile, collect_blob, is_blob_path, select_unreferenced_blobs, store_upload
+from app.utils.image_derivatives import is_image_file, remove_derivatives, schedule_derivatives
 
+logger = logging.getLogger(__name__)
 
-def save_student_avatar(photo: UploadFile) -> str:
-    file_path = os.path.join(STUDENT_AVATAR_FOLDER, photo.filename)
-    os.makedirs(STUDENT_AVATAR_FOLDER, exist_ok=True)
 
-    with open(file_path, "wb") as f:
-        f.write(photo.file.read())
+def get_derivative_process(file: UploadFile):
+    return schedule_derivatives if is_image_file(file.filename) else None
 
-    return file_path
 
+async def save_student_avatar(photo: UploadFile) -> StoredFile:
+    return await store_upload(photo, MAX_IMAGE_UPLOAD_SIZE, process=get_derivative_process(photo))
 
-def save_teacher_avatar(photo: UploadFile) -> str:
-    file_path = os.path.join(TEACHER_AVATAR_FOLDER, photo.filename)
-    os.makedirs(TEACHER_AVATAR_FOLDER, exist_ok=True)
 
-    with open(file_path, "wb") as f:
-        f.write(photo.file.read())
+async def save_teacher_avatar(photo: UploadFile) -> StoredFile:
+    return await store_upload(photo, MAX_IMAGE_UPLOAD_SIZE, process=get_derivative_process(photo))
 
-    return file_path
 
+async def save_subject_avatar(photo: UploadFile) -> StoredFile:
+    return await store_upload(photo, MAX_IMAGE_UPLOAD_SIZE, process=get_derivative_process(photo))
 
-def save_subject_avatar(photo: UploadFile, subject_title) -> str:
-    filename = f'{subject_title}-{photo.filename}'
-    file_path = os.path.join(SUBJECT_AVATAR_FOLDER, filename)
-    os.makedirs(SUBJECT_AVATAR_FOLDER, exist_ok=True)
 
-    with open(file_path, "wb") as f:
-        f.write(photo.file.read())
+async def save_subject_logo(photo: UploadFile) -> StoredFile:
+    return await store_upload(photo, MAX_IMAGE_UPLOAD_SIZE, process=get_derivative_process(photo))
 
-    return file_path
 
+async def save_lesson_file(file: UploadFile) -> StoredFile:
+    return await store_upload(file, MAX_LESSON_UPLOAD_SIZE)
 
-def save_subject_logo(photo: UploadFile, subject_title) -> str:
-    filename = f'{subject_title}-{photo.filename}'
-    file_path = os.path.join(SUBJECT_LOGO_FOLDER, filename)
-    os.makedirs(SUBJECT_LOGO_FOLDER, exist_ok=True)
 
-    with open(file_path, "wb") as f:
-        f.write(photo.file.read())
+async def save_group_chat_file(file: UploadFile) -> StoredFile:
+    return await store_upload(file, MAX_CHAT_UPLOAD_SIZE, process=get_derivative_process(file))
 
-    return file_path
 
+async def save_subject_chat_file(file: UploadFile) -> StoredFile:
+    return await store_upload(file, MAX_CHAT_UPLOAD_SIZE, process=get_derivative_process(file))
 
-def save_lesson_file(file: UploadFile) -> str:
-    folder = LESSON_FILE_FOLDER + datetime.now().strftime("%d-%m-%Y")
-    filename = generate_unique_filename(file.filename)
-    file_path = os.path.join(folder, filename)
-    os.makedirs(folder, exist_ok=True)
 
-    with open(file_path, "wb") as f:
-        f.write(file.file.read())
+async def save_subject_program(file: UploadFile) -> StoredFile:
+    return await store_upload(file, MAX_DOCUMENT_UPLOAD_SIZE)
 
-    return file_path
 
+async def save_subject_icon(file: UploadFile) -> StoredFile:
+    return await store_upload(file, MAX_IMAGE_UPLOAD_SIZE, process=get_derivative_process(file))
 
-def save_group_chat_file(file: UploadFile) -> str:
-    folder = GROUP_CHAT_FOLDER + datetime.now().strftime("%d-%m-%Y")
-    file_path = os.path.join(folder, file.filename)
-    os.makedirs(folder, exist_ok=True)
 
-    with open(file_path, "wb") as f:
-        f.write(file.file.read())
+async def save_subject_instructions(file: UploadFile) -> StoredFile:
+    return await store_upload(file, MAX_DOCUMENT_UPLOAD_SIZE)
 
-    return file_path
 
+async def release_blob_file(file_path: str) -> bool:
+    collected = await collect_blob(file_path)
+    if collected:
+        await run_in_threadpool(remove_derivatives, file_path)
+    return collected
 
-def save_subject_chat_file(file: UploadFile) -> str:
-    folder = SUBJECT_CHAT_FOLDER + datetime.now().strftime("%d-%m-%Y")
-    file_path = os.path.join(folder, file.filename)
-    os.makedirs(folder, exist_ok=True)
 
-    with open(file_path, "wb") as f:
-        f.write(file.file.read())
+async def release_replaced_file(file_path: Optional[str]):
+    if file_path and is_blob_path(file_path):
+        await release_blob_file(file_path)
 
-    return file_path
 
+async def collect_unreferenced_blobs() -> int:
+    collected = 0
+    for file_path in await select_unreferenced_blobs(limit=BLOB_SWEEP_BATCH_SIZE):
+        if await release_blob_file(file_path):
+            collected += 1
+    return collected
 
-def save_subject_program(file: UploadFile) -> str:
-    file_path = os.path.join(SUBJECT_PROGRAM_FOLDER, file.filename)
-    os.makedirs(SUBJECT_PROGRAM_FOLDER, exist_ok=True)
 
-    with open(file_path, "wb") as f:
-        f.write(file.file.read())
+class BlobSweeper:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.task = None
 
-    return file_path
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
 
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                collected = await collect_unreferenced_blobs()
+            except Exception:
+                logger.exception("Failed to collect unreferenced blobs")
+            else:
+                if collected:
+                    logger.info("Collected %s unreferenced blobs", collected)
 
-def save_subject_icon(file: UploadFile) -> str:
-    file_path = os.path.join(SUBJECT_ICON_FOLDER, file.filename)
-    os.makedirs(SUBJECT_ICON_FOLDER, exist_ok=True)
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
 
-    with open(file_path, "wb") as f:
-        f.write(file.file.read())
 
-    return file_path
+blob_sweeper = BlobSweeper(interval=BLOB_SWEEP_INTERVAL)
 
 
-def save_subject_instructions(file: UploadFile) -> str:
-    filename = generate_unique_filename(file.filename)
-    file_path = os.path.join(SUBJECT_INSTRUCTION_FOLDER, filename)
-    os.makedirs(SUBJECT_INSTRUCTION_FOLDER, exist_ok=True)
+async def delete_file(file_path: str):
+    if is_blob_path(file_path):
+        await release_blob_file(file_path)
+        return {"message": f"File {file_path} successfully deleted"}
 
-    with open(file_path, "wb") as f:
-        f.write(file.file.read())
-
-    return file_path
-
-
-def delete_file(file_path: str):
     try:
         if os.path.exists(file_path):
             os.remove(file_path)
@@ -131,10 +119,3 @@ def delete_file(file_path: str):
             return {"message": f"File {file_path} not found."}
     except Exception as e:
         return {"message": f"Error while deleting file: {str(e)}"}
-
-
-def generate_unique_filename(original_filename: str):
-    curr_time = datetime.now().strftime("%d-%m-%Y-%H-%M-%S")
-    filename, file_extension = original_filename.rsplit('.', 1)
-    new_filename = f"{filename}-{curr_time}.{file_extension}"
-    return new_filename
@@ -0,0 +1,69 @@
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.schedule_crud import select_schedule_db
+from app.setting import SCHEDULE_CACHE_TTL, SCHEDULE_DEFAULT_DAYS, SCHEDULE_MAX_DAYS
+from app.utils.memory_cache import MemoryCache
+from app.utils.response_cache import response_cache
+from app.utils.token import Principal
+
+SCHEDULE_TAG = "schedule"
+
+schedule_cache = MemoryCache(ttl=SCHEDULE_CACHE_TTL, max_size=4096)
+
+
+def resolve_schedule_range(date_from: Optional[date], date_to: Optional[date]) -> Tuple[date, date]:
+    date_from = date_from or datetime.now().date()
+    date_to = date_to or date_from + timedelta(days=SCHEDULE_DEFAULT_DAYS - 1)
+
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="date_to must not be earlier than date_from")
+    if (date_to - date_from).days >= SCHEDULE_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Schedule range is limited to {SCHEDULE_MAX_DAYS} days")
+    return date_from, date_to
+
+
+async def get_schedule(
+        db: AsyncSession,
+        date_from: date,
+        date_to: date,
+        student_id: Optional[int] = None,
+        teacher_id: Optional[int] = None
+) -> List[Dict]:
+    try:
+        generation = await response_cache.store.versions((SCHEDULE_TAG,))
+    except RedisError:
+        generation = None
+
+    key = (generation, student_id, teacher_id, date_from, date_to)
+    schedule = schedule_cache.get(key) if generation is not None else None
+    if schedule is None:
+        version = schedule_cache.version(key)
+        rows = await select_schedule_db(
+            db=db,
+            start=datetime.combine(date_from, time.min),
+            end=datetime.combine(date_to + timedelta(days=1), time.min),
+            student_id=student_id,
+            teacher_id=teacher_id
+        )
+        schedule = [dict(row._mapping) for row in rows]
+        if generation is not None:
+            schedule_cache.set(key, schedule, version)
+    return schedule
+
+
+async def get_user_schedule(db: AsyncSession, user: Principal, date_from: date, date_to: date) -> List[Dict]:
+    if user.student:
+        return await get_schedule(db=db, date_from=date_from, date_to=date_to, student_id=user.student_id)
+    if user.teacher:
+        return await get_schedule(db=db, date_from=date_from, date_to=date_to, teacher_id=user.teacher_id)
+    raise HTTPException(status_code=403, detail="Permission denied")
+
+
+async def invalidate_schedules():
+    await response_cache.invalidate(SCHEDULE_TAG)
+    schedule_cache.clear()
@@ -0,0 +1,31 @@
+import os
+
+from app.setting import STORAGE_BACKEND
+
+
+class LocalStorage:
+    is_remote = False
+
+    def put_file(self, local_path: str, key: str):
+        os.makedirs(os.path.dirname(key), exist_ok=True)
+        os.replace(local_path, key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(key)
+
+    def delete(self, key: str):
+        if os.path.exists(key):
+            os.remove(key)
+
+    def url(self, key: str, expires: int = None) -> str:
+        return f"/{key}"
+
+
+def create_storage():
+    if STORAGE_BACKEND == "s3":
+        from app.utils.amazon_s3 import create_s3_storage
+        return create_s3_storage()
+    return LocalStorage()
+
+
+storage = create_storage()
@@ -0,0 +1,54 @@
+import json
+from typing import AsyncIterable, Dict, Iterable, List
+
+from fastapi.encoders import jsonable_encoder
+
+LESSON_FIELDS = [
+    "id", "number", "title", "is_published", "lesson_date", "lesson_end", "lesson_type", "module_id", "teacher_id"
+]
+
+
+def set_subject_register(row) -> Dict:
+    if row.is_additional:
+        return {"dopSubjectId": row.subject_id, "dopSubjectName": row.subject_title, "dopSubjectLessons": []}
+    return {"subjectId": row.subject_id, "subjectName": row.subject_title, "subjectLessons": []}
+
+
+def add_register_lesson(subject_register: Dict, row):
+    if row.id is None:
+        return
+    lesson = {field: getattr(row, field) for field in LESSON_FIELDS}
+    lesson["subject_id"] = row.subject_id
+    lessons_key = "dopSubjectLessons" if "dopSubjectId" in subject_register else "subjectLessons"
+    subject_register[lessons_key].append(lesson)
+
+
+def group_student_register(rows: Iterable) -> List[Dict]:
+    result = []
+    current_key = None
+    for row in rows:
+        if (row.is_additional, row.subject_id) != current_key:
+            current_key = (row.is_additional, row.subject_id)
+            result.append(set_subject_register(row))
+        add_register_lesson(result[-1], row)
+    return result
+
+
+async def iterate_student_register_json(rows: AsyncIterable):
+    subject_register = None
+    current_key = None
+    separator = "["
+
+    async for row in rows:
+        if (row.is_additional, row.subject_id) != current_key:
+            if subject_register is not None:
+                yield separator + json.dumps(jsonable_encoder(subject_register))
+                separator = ","
+            current_key = (row.is_additional, row.subject_id)
+            subject_register = set_subject_register(row)
+        add_register_lesson(subject_register, row)
+
+    if subject_register is not None:
+        yield separator + json.dumps(jsonable_encoder(subject_register))
+        separator = ","
+    yield "[]" if separator == "[" else "]"
@@ -1,129 +1,161 @@
-from sqlalchemy.orm import Session
+from typing import Dict, List, Sequence, Tuple
 
-from app.crud.student_test_crud import (create_student_test_answer_db, create_student_test_matching_db,
-                                        select_correct_answer_db, select_correct_answers_db,
-                                        select_correct_right_option_db, select_count_correct_answers_db)
-from app.models import TestQuestion
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.student_test_crud import select_test_answer_key_db
 from app.schemas.student_test_schemas import MatchingField
+from app.utils.test_cache import answer_key_cache, get_test_version
+
+
+def compile_answer_key(answer_rows: Sequence, matching_rows: Sequence) -> Dict[int, Dict]:
+    answer_key = {}
+    for row in answer_rows:
+        question = answer_key.setdefault(row.question_id, {
+            "score": row.question_score or 0,
+            "correct": [],
+            "matching": {}
+        })
+        if row.answer_id is not None and row.is_correct:
+            question["correct"].append(row.answer_id)
+    for row in matching_rows:
+        answer_key[row.question_id]["matching"][row.left_id] = row.right_id
+    return answer_key
+
+
+async def get_answer_key(db: AsyncSession, test_id: int) -> Dict[int, Dict]:
+    key = (test_id, await get_test_version(db=db, test_id=test_id))
+    answer_key = answer_key_cache.get(key)
+    if answer_key is None:
+        version = answer_key_cache.version(key)
+        answer_rows, matching_rows = await select_test_answer_key_db(db=db, test_id=test_id)
+        answer_key = compile_answer_key(answer_rows, matching_rows)
+        answer_key_cache.set(key, answer_key, version)
+    return answer_key
 
 
 def check_default_test(
-        db: Session,
+        question: Dict,
+        question_id: int,
         student_answer_id: int,
-        question: TestQuestion,
         student_id: int,
         student_test_id: int
-
 ):
-    correct_answer_id = select_correct_answer_db(db=db, question_id=question.id)
-    if correct_answer_id == student_answer_id:
-        create_student_test_answer_db(
-            db=db,
-            score=question.question_score,
-            student_id=student_id,
-            question_id=question.id,
-            answer_id=student_answer_id,
-            student_test_id=student_test_id
-        )
-        return question.question_score
-    else:
-        create_student_test_answer_db(
-            db=db,
-            score=0,
-            student_id=student_id,
-            question_id=question.id,
-            answer_id=student_answer_id,
-            student_test_id=student_test_id
-        )
-        return 0
+    correct_answers = question["correct"]
+    score = question["score"] if correct_answers and correct_answers[0] == student_answer_id else 0
+    answers = [{
+        "score": score,
+        "student_id": student_id,
+        "question_id": question_id,
+        "answer_id": student_answer_id,
+        "student_test_id": student_test_id
+    }]
+    return score, answers
 
 
 def check_multiple_test(
-        db: Session,
-        student_answers: list[int],
-        question: TestQuestion,
+        question: Dict,
+        question_id: int,
+        student_answers: List[int],
         student_id: int,
         student_test_id: int
-
 ):
-    correct_answers = select_correct_answers_db(db=db, question_id=question.id)
-    question_score = question.question_score
-    count_correct_answers = select_count_correct_answers_db(db=db, question_id=question.id)
-    score_for_one_answer = question_score / count_correct_answers
-
-    student_correct_answers = []
-    student_wrong_answers = []
-
-    for student_answer in student_answers:
-        if student_answer in correct_answers:
-            student_correct_answers.append(student_answer)
-        else:
-            student_wrong_answers.append(student_answer)
-
-    student_score = ((len(student_correct_answers) * score_for_one_answer) -
-                     (len(student_wrong_answers) * score_for_one_answer))
-
-    counter = 1
-    for answer_id in student_answers:
-        if counter == 1:
-            create_student_test_answer_db(
-                db=db,
-                score=int(student_score),
-                student_id=student_id,
-                question_id=question.id,
-                answer_id=answer_id,
-                student_test_id=student_test_id
-            )
-        else:
-            create_student_test_answer_db(
-                db=db,
-                score=0,
-                student_id=student_id,
-                question_id=question.id,
-                answer_id=answer_id,
-                student_test_id=student_test_id
-            )
+    correct_answers = question["correct"]
+    score_for_one_answer = question["score"] / len(correct_answers) if correct_answers else 0
+
+    count_correct = len([answer_id for answer_id in student_answers if answer_id in correct_answers])
+    count_wrong = len(student_answers) - count_correct
+    student_score = (count_correct - count_wrong) * score_for_one_answer
+
+    answers = [
+        {
+            "score": int(student_score) if index == 0 else 0,
+            "student_id": student_id,
+            "question_id": question_id,
+            "answer_id": answer_id,
+            "student_test_id": student_test_id
+        }
+        for index, answer_id in enumerate(student_answers)
+    ]
 
     if student_score <= 0:
-        return 0
-    return int(student_score)
+        return 0, answers
+    return int(student_score), answers
 
 
 def check_matching_test(
-        db: Session,
-        matching: list[MatchingField],
-        question: TestQuestion,
+        question: Dict,
+        question_id: int,
+        matching: List[MatchingField],
         student_id: int,
         student_test_id: int
 ):
-    question_score = question.question_score
-    count_matching = len(question.matching_left)
-    score_one_match = question_score / count_matching
+    correct_matching = question["matching"]
+    score_one_match = question["score"] / len(correct_matching) if correct_matching else 0
     student_correct_match = 0
 
+    matchings = []
     for match in matching:
-        correct_right_id = select_correct_right_option_db(db=db, left_option_id=match.leftOptionId)
-        if match.rightOptionId == correct_right_id:
+        is_correct = correct_matching.get(match.leftOptionId) == match.rightOptionId
+        if is_correct:
             student_correct_match += 1
-            create_student_test_matching_db(
-                db=db,
-                score=int(score_one_match),
+        matchings.append({
+            "score": int(score_one_match) if is_correct else 0,
+            "student_id": student_id,
+            "question_id": question_id,
+            "left_option_id": match.leftOptionId,
+            "right_option_id": match.rightOptionId,
+            "student_test_id": student_test_id
+        })
+
+    student_score = student_correct_match * score_one_match
+    return student_score, matchings
+
+
+def grade_student_test(
+        answer_key: Dict[int, Dict],
+        student_answers: Sequence,
+        student_id: int,
+        student_test_id: int
+) -> Tuple[float, List[Dict], List[Dict]]:
+    total_score = 0
+    answers = []
+    matchings = []
+
+    for student_answer in student_answers:
+        question = answer_key.get(student_answer.questionId)
+        if question is None:
+            continue
+
+        if student_answer.questionType == "matching":
+            student_score, rows = check_matching_test(
+                question=question,
+                question_id=student_answer.questionId,
+                matching=student_answer.matching,
                 student_id=student_id,
-                question_id=question.id,
-                left_option_id=match.leftOptionId,
-                right_option_id=match.rightOptionId,
                 student_test_id=student_test_id
             )
+            matchings.extend(rows)
+
+        elif student_answer.questionType == "multiple_choice":
+            student_score, rows = check_multiple_test(
+                question=question,
+                question_id=student_answer.questionId,
+                student_answers=student_answer.answersIds,
+                student_id=student_id,
+                student_test_id=student_test_id
+            )
+            answers.extend(rows)
+
         else:
-            create_student_test_matching_db(
-                db=db,
-                score=0,
+            student_score, rows = check_default_test(
+                question=question,
+                question_id=student_answer.questionId,
+                student_answer_id=student_answer.answerId,
                 student_id=student_id,
-                question_id=question.id,
-                left_option_id=match.leftOptionId,
-                right_option_id=match.rightOptionId,
                 student_test_id=student_test_id
             )
+            answers.extend(rows)
 
-    student_score = student_correct_match * score_one_match
-    return student_score
+        total_score += student_score
+
+    return total_score, answers, matchings
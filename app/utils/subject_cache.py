@@ -0,0 +1,57 @@
+from datetime import datetime
+from typing import Dict, List
+
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.lesson_crud import get_lessons_by_subject_id_db, select_upcoming_lessons_db
+from app.crud.subject_crud import (select_subject_exam_date, select_teacher_subject_ids_db,
+                                   select_teachers_for_subject_db)
+from app.setting import SUBJECT_TAPES_CACHE_TTL
+from app.utils.lesson_utils import set_three_next_lesson
+from app.utils.memory_cache import MemoryCache
+from app.utils.response_cache import response_cache
+from app.utils.subject_utils import set_subjects_lessons_structure
+
+subject_tapes_cache = MemoryCache(ttl=SUBJECT_TAPES_CACHE_TTL)
+
+
+def subject_tapes_tag(subject_id: int) -> str:
+    return f"subject-tapes:{subject_id}"
+
+
+async def get_subject_tapes_base(db: AsyncSession, subject_id: int) -> Dict:
+    try:
+        generation = await response_cache.store.versions((subject_tapes_tag(subject_id),))
+    except RedisError:
+        generation = None
+
+    key = (subject_id, generation)
+    tapes = subject_tapes_cache.get(key) if generation is not None else None
+    if tapes is None:
+        version = subject_tapes_cache.version(key)
+        subject_data = await get_lessons_by_subject_id_db(db=db, subject_id=subject_id)
+        tapes = {
+            "subject_teachers": await select_teachers_for_subject_db(db=db, subject_id=subject_id),
+            "subject_exam_date": await select_subject_exam_date(db=db, subject_id=subject_id),
+            "upcoming_lessons": await select_upcoming_lessons_db(db=db, subject_id=subject_id),
+            "subjects_lessons": set_subjects_lessons_structure(subject_data=subject_data)
+        }
+        if generation is not None:
+            subject_tapes_cache.set(key, tapes, version)
+    return tapes
+
+
+def get_next_lessons(upcoming_lessons: List) -> List[Dict]:
+    today = datetime.today()
+    lessons = [lesson for lesson in upcoming_lessons if lesson.lesson_date >= today]
+    return set_three_next_lesson(lessons=lessons[:3])
+
+
+async def invalidate_subject_tapes(*subject_ids: int):
+    tags = {subject_tapes_tag(subject_id) for subject_id in subject_ids if subject_id is not None}
+    await response_cache.invalidate(*tags)
+
+
+async def invalidate_teacher_subject_tapes(db: AsyncSession, teacher_id: int):
+    await invalidate_subject_tapes(*await select_teacher_subject_ids_db(db=db, teacher_id=teacher_id))
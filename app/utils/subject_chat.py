@@ -1,6 +1,6 @@
 from typing import Dict
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.subject_chat_crud import (create_subject_attach_file_db, create_subject_chat_answer,
                                         create_subject_chat_message, create_subject_recipient_db, delete_answer_db,
@@ -8,9 +8,10 @@ from app.crud.subject_chat_crud import (create_subject_attach_file_db, create_su
                                         get_last_messages_for_subject_chat_db, select_answer_by_id_db,
                                         select_message_by_id_db, update_answer_text_db,
                                         update_message_text_and_fixed_db, update_message_type_and_recipient_db)
-from app.models import SubjectChat, SubjectChatAnswer, User
+from app.models import SubjectChat, SubjectChatAnswer
 from app.utils.count_users import select_users_in_subject, set_keyword_for_users_data
 from app.utils.save_images import delete_file
+from app.utils.token import Principal
 
 
 def set_subject_chat_last_messages_dict(messages_obj):
@@ -27,7 +28,7 @@ def set_subject_chat_last_messages_dict(messages_obj):
             "senderId": message.sender_id,
             "senderType": message.sender_type.value,
             "deleted": message.deleted,
-            "readBy": message.read_by.split(", ") if message.read_by else [],
+            "readBy": [receipt.user_id for receipt in message.read_receipt],
             "answers": [],
             "attachFiles": []
         }
@@ -40,7 +41,7 @@ def set_subject_chat_last_messages_dict(messages_obj):
                 "senderId": answer.sender_id,
                 "senderType": answer.sender_type.value,
                 "deleted": answer.deleted,
-                "readBy": answer.read_by.split(", ") if answer.read_by else [],
+                "readBy": [receipt.user_id for receipt in answer.read_receipt],
                 "attachFiles": []
             }
 
@@ -99,7 +100,7 @@ def set_subject_chat_last_message_dict(message_obj):
         "senderId": message_obj.sender_id,
         "senderType": message_obj.sender_type.value,
         "deleted": message_obj.deleted,
-        "readBy": message_obj.read_by.split(", ") if message_obj.read_by else [],
+        "readBy": [],
         "attachFiles": attach_files
     }
 
@@ -140,7 +141,7 @@ def set_updated_subject_message_dict(message_obj: SubjectChat):
                 "answerDatetime": answer.datetime_message.strftime("%d.%m.%Y %H:%M:%S"),
                 "senderId": answer.sender_id,
                 "senderType": answer.sender_type,
-                "readBy": answer.read_by.split(",") if answer.read_by else [],
+                "readBy": [receipt.user_id for receipt in answer.read_receipt],
                 "deleted": answer.deleted,
                 "attachFiles": answer_attach_files
             }
@@ -156,7 +157,7 @@ def set_updated_subject_message_dict(message_obj: SubjectChat):
         "senderType": message_obj.sender_type,
         "fixed": message_obj.fixed,
         "deleted": message_obj.deleted,
-        "readBy": message_obj.read_by.split(",") if message_obj.read_by else [],
+        "readBy": [receipt.user_id for receipt in message_obj.read_receipt],
         "recipient": [rec.recipient_id for rec in message_obj.subject_recipient]
         if message_obj.subject_recipient else [],
         "attachFiles": attach_file,
@@ -184,7 +185,7 @@ def set_updated_subject_answer_dict(answer_obj: SubjectChatAnswer):
         "answerDatetime": answer_obj.datetime_message.strftime("%d.%m.%Y %H:%M:%S"),
         "senderId": answer_obj.sender_id,
         "senderType": answer_obj.sender_type,
-        "readBy": answer_obj.read_by.split(",") if answer_obj.read_by else [],
+        "readBy": [receipt.user_id for receipt in answer_obj.read_receipt],
         "deleted": answer_obj.deleted,
         "attachFiles": attach_file
     }
@@ -216,27 +217,27 @@ def set_subject_chat_last_answer_dict(answer_obj):
         "answerId": answer_obj[0].id,
         "answerText": answer_obj[0].message,
         "answerDatetime": answer_obj[0].datetime_message.strftime("%d.%m.%Y %H:%M:%S"),
-        "messageId": answer_obj[0].subject_chat.id,
+        "messageId": answer_obj[0].subject_chat_id,
         "senderId": answer_obj[0].sender_id,
         "senderType": answer_obj[0].sender_type,
         "deleted": answer_obj[0].deleted,
-        "readBy": answer_obj[0].read_by.split(", ") if answer_obj[0].read_by else [],
+        "readBy": [],
         "attachFiles": attach_files
     }
     return answer
 
 
-def get_data_about_latest_messages(db: Session, subject_id: int, user: User):
-    users = select_users_in_subject(db=db, subject_id=subject_id)
+async def get_data_about_latest_messages(db: AsyncSession, subject_id: int, user: Principal):
+    users = await select_users_in_subject(db=db, subject_id=subject_id)
     user_info = set_keyword_for_users_data(users=users)
-    messages_obj = get_last_messages_for_subject_chat_db(db=db, subject_id=subject_id, recipient_id=user.id)
+    messages_obj = await get_last_messages_for_subject_chat_db(db=db, subject_id=subject_id, recipient_id=user.id)
     last_messages = set_subject_chat_last_messages_dict(messages_obj=messages_obj)
     last_messages["userInfo"] = user_info
     return last_messages
 
 
-def save_message_data_to_db(db: Session, subject_id: int, data: Dict):
-    new_message = create_subject_chat_message(
+async def save_message_data_to_db(db: AsyncSession, subject_id: int, data: Dict):
+    new_message = await create_subject_chat_message(
         db=db,
         message=data.get("message"),
         message_type=data.get("messageType"),
@@ -247,14 +248,18 @@ def save_message_data_to_db(db: Session, subject_id: int, data: Dict):
     )
 
     if data.get("attachFiles") is not None:
-        create_subject_attach_file_db(db=db, attach_files=data.get("attachFiles"), subject_chat_message=new_message.id)
+        await create_subject_attach_file_db(
+            db=db,
+            attach_files=data.get("attachFiles"),
+            subject_chat_message=new_message.id
+        )
 
     if data.get("recipient") is not None:
-        create_subject_recipient_db(db=db, subject_chat_id=new_message.id, recipient=data.get("recipient"))
+        await create_subject_recipient_db(db=db, subject_chat_id=new_message.id, recipient=data.get("recipient"))
 
 
-def save_answer_data_to_db(db: Session, data: Dict):
-    new_answer = create_subject_chat_answer(
+async def save_answer_data_to_db(db: AsyncSession, data: Dict):
+    new_answer = await create_subject_chat_answer(
         db=db,
         message=data.get("message"),
         subject_chat_id=data.get("messageId"),
@@ -263,46 +268,55 @@ def save_answer_data_to_db(db: Session, data: Dict):
     )
 
     if data.get("attachFiles") is not None:
-        create_subject_attach_file_db(db=db, attach_files=data.get("attachFiles"), subject_chat_answer=new_answer.id)
+        await create_subject_attach_file_db(
+            db=db,
+            attach_files=data.get("attachFiles"),
+            subject_chat_answer=new_answer.id
+        )
 
 
-def update_message_data_to_db(db: Session, data: Dict):
-    message = select_message_by_id_db(db=db, message_id=data.get("messageId"))
+async def update_message_data_to_db(db: AsyncSession, data: Dict):
+    message = await select_message_by_id_db(db=db, message_id=data.get("messageId"))
 
     if len(message.attach_file) >= 1:
+        kept_paths = {attach_file["path"] for attach_file in data.get("attachFiles") or []}
         for attach_file in message.attach_file:
-            delete_file(file_path=attach_file.file_path)
-            delete_attached_file_db(db=db, file_id=attach_file.id)
+            file_path = attach_file.file_path
+            await delete_attached_file_db(db=db, file_id=attach_file.id)
+            if file_path not in kept_paths:
+                await delete_file(file_path=file_path)
 
     if data.get("attachFiles") is not None:
-        create_subject_attach_file_db(db=db, attach_files=data.get("attachFiles"),
-                                      subject_chat_message=data.get("messageId"))
+        await create_subject_attach_file_db(db=db, attach_files=data.get("attachFiles"),
+                                            subject_chat_message=data.get("messageId"))
 
     if data.get("message") != message.message or data.get("fixed") != message.fixed:
-        update_message_text_and_fixed_db(db=db, new_text=data.get("message"),
-                                         fixed=data.get("fixed"), message=message)
+        await update_message_text_and_fixed_db(db=db, new_text=data.get("message"),
+                                               fixed=data.get("fixed"), message=message)
 
-    if message.message_type == data.get("messageType"):
-        message_data = set_updated_subject_message_dict(message)
-        return message_data
-    else:
-        update_message_type_and_recipient_db(db=db, message_type=data.get("messageType"),
-                                             recipients=data.get("recipient"), message=message)
-        message_data = set_updated_subject_message_dict(message)
-        return message_data
+    if message.message_type != data.get("messageType"):
+        await update_message_type_and_recipient_db(db=db, message_type=data.get("messageType"),
+                                                   recipients=data.get("recipient"), message=message)
+
+    message = await select_message_by_id_db(db=db, message_id=message.id)
+    message_data = set_updated_subject_message_dict(message)
+    return message_data
 
 
-def update_answer_data_to_db(db: Session, data: Dict):
-    answer = select_answer_by_id_db(db=db, answer_id=data.get("answerId"))
+async def update_answer_data_to_db(db: AsyncSession, data: Dict):
+    answer = await select_answer_by_id_db(db=db, answer_id=data.get("answerId"))
 
     if len(answer.attach_file) >= 1:
+        kept_paths = {attach_file["path"] for attach_file in data.get("attachFiles") or []}
         for attach_file in answer.attach_file:
-            delete_file(attach_file.file_path)
-            delete_attached_file_db(db=db, file_id=attach_file.id)
+            file_path = attach_file.file_path
+            await delete_attached_file_db(db=db, file_id=attach_file.id)
+            if file_path not in kept_paths:
+                await delete_file(file_path=file_path)
 
     if data.get("attachFiles") is not None:
-        create_subject_attach_file_db(db=db, attach_files=data.get("attachFiles"),
-                                      subject_chat_answer=data.get("answerId"))
+        await create_subject_attach_file_db(db=db, attach_files=data.get("attachFiles"),
+                                            subject_chat_answer=data.get("answerId"))
 
     message = answer.subject_chat
     result = {
@@ -312,18 +326,17 @@ def update_answer_data_to_db(db: Session, data: Dict):
         if message.subject_recipient else []
     }
 
-    if answer.message == data.get("answerText"):
-        result["answerData"] = set_updated_subject_answer_dict(answer)
-        return result
-    else:
-        update_answer_text_db(db=db, answer_text=data.get("answerText"), answer=answer)
-        result["answerData"] = set_updated_subject_answer_dict(answer)
-        return result
+    if answer.message != data.get("answerText"):
+        await update_answer_text_db(db=db, answer_text=data.get("answerText"), answer=answer)
+
+    answer = await select_answer_by_id_db(db=db, answer_id=answer.id)
+    result["answerData"] = set_updated_subject_answer_dict(answer)
+    return result
 
 
-def delete_message_data_to_db(db: Session, data: Dict):
-    message = select_message_by_id_db(db=db, message_id=data.get("messageId"))
-    message = delete_message_db(db=db, message=message)
+async def delete_message_data_to_db(db: AsyncSession, data: Dict):
+    message = await select_message_by_id_db(db=db, message_id=data.get("messageId"))
+    message = await delete_message_db(db=db, message=message)
 
     if message.message_type == "everyone":
         return {"messageType": "everyone"}
@@ -332,9 +345,9 @@ def delete_message_data_to_db(db: Session, data: Dict):
                 "recipient": [recipient.recipient_id for recipient in message.subject_recipient]}
 
 
-def delete_answer_data_to_db(db: Session, data: Dict):
-    answer = select_answer_by_id_db(db=db, answer_id=data.get("answerId"))
-    answer = delete_answer_db(db=db, answer=answer)
+async def delete_answer_data_to_db(db: AsyncSession, data: Dict):
+    answer = await select_answer_by_id_db(db=db, answer_id=data.get("answerId"))
+    answer = await delete_answer_db(db=db, answer=answer)
     message = answer.subject_chat
 
     if message.message_type == "everyone":
@@ -1,7 +1,8 @@
 from typing import Dict, List
 
 from app.crud.subject_crud import select_dop_subjects
-from app.session import SessionLocal
+from app.session import AsyncSessionLocal
+from app.utils.image_derivatives import get_thumbnail_path
 
 
 def set_subjects_lessons_structure(subject_data) -> List[Dict]:
@@ -33,15 +34,16 @@ def set_subjects_lessons_structure(subject_data) -> List[Dict]:
     return modules_list
 
 
-def get_additional_subjects_for_student(student_id: int) -> List[Dict]:
-    db = SessionLocal()
+async def get_additional_subjects_for_student(student_id: int) -> List[Dict]:
+    async with AsyncSessionLocal() as db:
+        subjects = await select_dop_subjects(db=db, student_id=student_id)
 
-    subjects = select_dop_subjects(db=db, student_id=student_id)
     fields = ["id", "title", "image_path"]
     result = []
 
     for subject in subjects:
-        result.append(dict(zip(fields, subject)))
+        subject_data = dict(zip(fields, subject))
+        subject_data["image_thumbnail"] = get_thumbnail_path(subject_data["image_path"])
+        result.append(subject_data)
 
-    db.close()
     return result
@@ -0,0 +1,37 @@
+from typing import Dict, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.test_lesson_crud import (increment_test_version_db, select_test_info_db, select_test_info_for_teacher_db,
+                                       select_test_version_db)
+from app.setting import ANSWER_KEY_CACHE_TTL, TEST_INFO_CACHE_TTL
+from app.utils.memory_cache import MemoryCache
+
+answer_key_cache = MemoryCache(ttl=ANSWER_KEY_CACHE_TTL)
+test_info_cache = MemoryCache(ttl=TEST_INFO_CACHE_TTL)
+
+
+async def get_test_questions_info(
+        db: AsyncSession,
+        test_id: int,
+        version: int,
+        for_teacher: bool = False
+) -> List[Dict]:
+    key = (test_id, version, for_teacher)
+    questions_info = test_info_cache.get(key)
+    if questions_info is None:
+        cache_version = test_info_cache.version(key)
+        if for_teacher:
+            questions_info = await select_test_info_for_teacher_db(db=db, test_id=test_id)
+        else:
+            questions_info = await select_test_info_db(db=db, test_id=test_id)
+        test_info_cache.set(key, questions_info, cache_version)
+    return questions_info
+
+
+async def get_test_version(db: AsyncSession, test_id: int) -> int:
+    return await select_test_version_db(db=db, test_id=test_id) or 0
+
+
+async def invalidate_test_cache(db: AsyncSession, test_id: int):
+    await increment_test_version_db(db=db, test_id=test_id)
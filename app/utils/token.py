@@ -1,18 +1,68 @@
-from datetime import date, datetime, timedelta
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
 
 from fastapi import Depends, HTTPException, WebSocket
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 from jose.jwt import decode as jwt_decode
 from jose.jwt import encode as jwt_encode
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud.user_crud import select_user_by_username_db
+from app.crud.user_crud import USER_RELATIONS, select_user_by_username_db
+from app.enums import UserTypeOption
 from app.models import User
 from app.session import get_db
-from app.setting import ACCESS_TOKEN_EXPIRE_HOURS, ALGORITHM, SECRET_KEY
+from app.setting import ACCESS_TOKEN_EXPIRE_HOURS, ALGORITHM, AUTH_CACHE_TTL, CALENDAR_TOKEN_EXPIRE_DAYS, SECRET_KEY
+from app.utils.memory_cache import MemoryCache
+from app.utils.token_revocation import revoked_tokens, token_digest
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='api/v1/auth/token')
+principal_cache = MemoryCache(ttl=AUTH_CACHE_TTL, max_size=10000)
+
+CALENDAR_TOKEN_SCOPE = "calendar"
+CALENDAR_SECRET_KEY = f"{SECRET_KEY}:{CALENDAR_TOKEN_SCOPE}"
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    username: str
+    user_type: Optional[UserTypeOption]
+    student_id: Optional[int] = None
+    teacher_id: Optional[int] = None
+    curator_id: Optional[int] = None
+    moder_id: Optional[int] = None
+
+    @property
+    def student(self) -> bool:
+        return self.student_id is not None
+
+    @property
+    def teacher(self) -> bool:
+        return self.teacher_id is not None
+
+    @property
+    def curator(self) -> bool:
+        return self.curator_id is not None
+
+    @property
+    def moder(self) -> bool:
+        return self.moder_id is not None
+
+
+def create_principal(user: User) -> Principal:
+    return Principal(
+        id=user.id,
+        username=user.username,
+        user_type=user.user_type.type if user.user_type else None,
+        student_id=user.student[0].id if user.student else None,
+        teacher_id=user.teacher[0].id if user.teacher else None,
+        curator_id=user.curator[0].id if user.curator else None,
+        moder_id=user.moder[0].id if user.moder else None
+    )
 
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
@@ -26,7 +76,38 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     return encoded_jwt, expire
 
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+def create_calendar_token(user: Principal, version: int) -> str:
+    expire = datetime.utcnow() + timedelta(days=CALENDAR_TOKEN_EXPIRE_DAYS)
+    to_encode = {"sub": user.username, "scope": CALENDAR_TOKEN_SCOPE, "ver": version, "exp": expire}
+    return jwt_encode(to_encode, CALENDAR_SECRET_KEY, algorithm=ALGORITHM)
+
+
+async def get_calendar_user(db: AsyncSession, token: str) -> Principal:
+    try:
+        payload = jwt_decode(token, CALENDAR_SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid calendar token")
+
+    if payload.get("scope") != CALENDAR_TOKEN_SCOPE or payload.get("sub") is None:
+        raise HTTPException(status_code=401, detail="Invalid calendar token")
+
+    user = await select_user_by_username_db(db, payload["sub"])
+    if user is None:
+        raise HTTPException(status_code=401, detail="Invalid username")
+    if payload.get("ver") != user.calendar_token_version:
+        raise HTTPException(status_code=401, detail="Calendar token revoked")
+    return create_principal(user)
+
+
+async def get_current_user(db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)) -> Principal:
+    if await revoked_tokens.contains(token):
+        raise HTTPException(status_code=401, detail="Token expired")
+
+    digest = token_digest(token)
+    principal = principal_cache.get(digest)
+    if principal is not None:
+        return principal
+
     try:
         payload = jwt_decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         token_exp: int = payload.get("exp")
@@ -34,39 +115,49 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_
 
         if username is None:
             raise HTTPException(status_code=401, detail="Invalid authentication token")
-        user = select_user_by_username_db(db, username)
+        version = principal_cache.version(digest)
+        user = await select_user_by_username_db(db, username)
 
         if user is None:
             raise HTTPException(status_code=401, detail="Invalid username")
 
         if check_expire_token(user, token_exp):
-            return user
+            principal = create_principal(user)
+            principal_cache.set(digest, principal, version, ttl=token_exp - time.time())
+            return principal
         else:
-            delete_token_user(db=db, user=user)
+            await delete_token_user(db=db, user=user)
             raise HTTPException(status_code=401, detail="Token expired")
 
     except JWTError:
-        user = db.query(User).filter(User.token == token).first()
-        delete_token_user(db=db, user=user)
+        user = await get_user_by_token(db=db, token=token)
+        if user is not None:
+            await delete_token_user(db=db, user=user)
         raise HTTPException(status_code=401, detail="Token expired")
 
 
-def delete_token_user(db: Session, user: User):
-    user.is_active = False
-    user.exp_token = None
-    user.token = None
-    user.last_active = date.today()
-    db.commit()
-    db.refresh(user)
+async def revoke_token(token: str, expire_token: datetime):
+    expires_at = expire_token.replace(tzinfo=timezone.utc).timestamp() if expire_token else time.time()
+    await revoked_tokens.add(token, expires_at + 1)
+    principal_cache.invalidate(token_digest(token))
+
+
+async def delete_token_user(db: AsyncSession, user: User):
+    if user.token:
+        await revoke_token(token=user.token, expire_token=user.exp_token)
+
+    await db.execute(
+        update(User)
+        .where(User.id == user.id)
+        .values(is_active=False, exp_token=None, token=None, last_active=date.today())
+    )
+    await db.commit()
 
 
 def check_expire_token(user: User, exp_token: int):
-    expire_token = datetime.utcfromtimestamp(exp_token)
-    expire_token_str = expire_token.strftime("%Y-%m-%d %H:%M:%S")
-    user_expire_token_str = user.exp_token.strftime("%Y-%m-%d %H:%M:%S")
-    if expire_token_str == user_expire_token_str:
-        return True
-    return False
+    if user.exp_token is None or exp_token is None:
+        return False
+    return user.exp_token.replace(microsecond=0) == datetime.utcfromtimestamp(exp_token)
 
 
 def get_jwt_token(websocket: WebSocket):
@@ -76,5 +167,6 @@ def get_jwt_token(websocket: WebSocket):
     raise ValueError("Invalid JWT token")
 
 
-def get_user_by_token(db: Session, token: str):
-    return db.query(User).filter(User.token == token).first()
+async def get_user_by_token(db: AsyncSession, token: str):
+    result = await db.execute(select(User).options(*USER_RELATIONS).filter(User.token == token))
+    return result.scalars().first()
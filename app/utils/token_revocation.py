@@ -0,0 +1,50 @@
+import hashlib
+import time
+from typing import Dict
+
+from redis import asyncio as aioredis
+
+from app.setting import TOKEN_REVOCATION_URL, WEB_CONCURRENCY
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class InMemoryRevocationSet:
+    def __init__(self):
+        self.tokens: Dict[str, float] = {}
+
+    async def add(self, token: str, expires_at: float):
+        now = time.time()
+        self.tokens = {digest: expires for digest, expires in self.tokens.items() if expires > now}
+        if expires_at > now:
+            self.tokens[token_digest(token)] = expires_at
+
+    async def contains(self, token: str) -> bool:
+        expires_at = self.tokens.get(token_digest(token))
+        return expires_at is not None and expires_at > time.time()
+
+
+class RedisRevocationSet:
+    def __init__(self, url: str):
+        self.redis = aioredis.from_url(url, decode_responses=True)
+
+    async def add(self, token: str, expires_at: float):
+        ttl = int(expires_at - time.time()) + 1
+        if ttl > 0:
+            await self.redis.set(f"revoked:{token_digest(token)}", 1, ex=ttl)
+
+    async def contains(self, token: str) -> bool:
+        return bool(await self.redis.exists(f"revoked:{token_digest(token)}"))
+
+
+def create_revocation_set(url: str | None, workers: int = 1):
+    if url:
+        return RedisRevocationSet(url)
+    if workers > 1:
+        raise RuntimeError("TOKEN_REVOCATION_URL is required when running more than one worker")
+    return InMemoryRevocationSet()
+
+
+revoked_tokens = create_revocation_set(TOKEN_REVOCATION_URL, WEB_CONCURRENCY)
@@ -0,0 +1,55 @@
+"""Fan-out cost of chat connection lookups. Run with `python -m benchmarks.chat_fanout`."""
+import asyncio
+import random
+import time
+from typing import Dict, List
+
+from app.utils.connection_registry import ConnectionRegistry
+
+ROOM = "benchmark"
+ROOM_SIZE = 500
+RECIPIENTS = (1, 10, 100, 500)
+ROUNDS = 200
+
+
+class FakeWebSocket:
+    async def send_json(self, message: Dict):
+        return
+
+
+async def list_scan(connections: List[Dict], user_ids: List[int], message: Dict):
+    for connection in connections:
+        if connection["user"] in user_ids:
+            await connection["websocket"].send_json(message)
+
+
+async def registry_lookup(registry: ConnectionRegistry, user_ids: List[int], message: Dict):
+    for connection in registry.users_connections(ROOM, user_ids):
+        await connection["websocket"].send_json(message)
+
+
+async def measure(func, target, user_ids: List[int]) -> float:
+    message = {"message": "benchmark"}
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        await func(target, user_ids, message)
+    return (time.perf_counter() - start) / ROUNDS * 1_000_000
+
+
+async def main():
+    connections = [{"websocket": FakeWebSocket(), "user": user_id} for user_id in range(ROOM_SIZE)]
+    registry = ConnectionRegistry()
+    for connection in connections:
+        registry.add(ROOM, connection["user"], connection)
+
+    print(f"room of {ROOM_SIZE} sockets, mean of {ROUNDS} rounds")
+    print(f"{'recipients':>10} {'list scan, us':>15} {'registry, us':>15}")
+    for count in RECIPIENTS:
+        user_ids = random.sample(range(ROOM_SIZE), count)
+        scan = await measure(list_scan, connections, user_ids)
+        lookup = await measure(registry_lookup, registry, user_ids)
+        print(f"{count:>10} {scan:>15.1f} {lookup:>15.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
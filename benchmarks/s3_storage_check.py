@@ -0,0 +1,67 @@
+"""Round trip through S3Storage and the media routes against MinIO or any S3 endpoint.
+
+Start MinIO with `docker compose -f docker-compose.minio.yml up -d`, then run
+`STORAGE_BACKEND=s3 AWS_ENDPOINT_URL=http://localhost:9000 AWS_ACCESS_KEY_ID=minioadmin
+AWS_ACCESS_SECRET_KEY=minioadmin AWS_BUCKET_NAME=education-platform AWS_REGION=us-east-1
+python -m benchmarks.s3_storage_check`.
+"""
+import hashlib
+import os
+import tempfile
+import urllib.request
+
+from fastapi.testclient import TestClient
+
+from app.utils.file_store import BLOB_FOLDER
+from app.utils.storage import storage
+from main import app
+
+
+def check(name: str, condition: bool):
+    print(f"{'ok' if condition else 'FAILED'}  {name}")
+    if not condition:
+        raise SystemExit(1)
+
+
+def main():
+    check("storage backend is remote", storage.is_remote)
+
+    content = os.urandom(256 * 1024)
+    checksum = hashlib.sha256(content).hexdigest()
+    key = os.path.join(BLOB_FOLDER, checksum[:2], checksum[2:4], f"{checksum}.bin")
+    descriptor, local_path = tempfile.mkstemp()
+    with os.fdopen(descriptor, "wb") as f:
+        f.write(content)
+
+    client = TestClient(app)
+    try:
+        storage.put_file(local_path, key)
+        check("uploaded object exists", storage.exists(key))
+
+        with urllib.request.urlopen(storage.url(key)) as response:
+            check("presigned url returns the object", response.read() == content)
+
+        response = client.get(f"/{key}", follow_redirects=False)
+        check("/static redirects blob paths to storage", response.status_code == 307)
+        with urllib.request.urlopen(response.headers["location"]) as redirected:
+            check("/static redirect serves the object", redirected.read() == content)
+
+        response = client.get("/get_image", params={"file_path": key}, follow_redirects=False)
+        check("/get_image redirects existing blobs", response.status_code == 307)
+
+        missing_key = os.path.join(BLOB_FOLDER, "00", "00", f"{'0' * 64}.bin")
+        response = client.get("/get_image", params={"file_path": missing_key}, follow_redirects=False)
+        check("/get_image returns 404 for missing blobs", response.status_code == 404)
+
+        response = client.get("/get_image", params={"file_path": f"{BLOB_FOLDER}../../main.py"}, follow_redirects=False)
+        check("/get_image refuses keys outside the blob folder", response.status_code == 404)
+    finally:
+        if os.path.exists(local_path):
+            os.remove(local_path)
+        storage.delete(key)
+
+    check("deleted object is gone", not storage.exists(key))
+
+
+if __name__ == "__main__":
+    main()
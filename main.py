@@ -1,14 +1,16 @@
+import os
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
 
 from app.routers.group_chat_router import router as group_chat_router
 from app.routers.group_router import router as group_router
 from app.routers.lecture_router import router as lecture_router
 from app.routers.lesson_router import router as lesson_router
+from app.routers.metrics_router import router as metrics_router
 from app.routers.module_router import router as module_router
+from app.routers.schedule_router import router as schedule_router
 from app.routers.specialization_router import router as specialization_router
 from app.routers.student_router import router as student_router
 from app.routers.student_test_router import router as student_test_router
@@ -19,14 +21,12 @@ from app.routers.teacher_router import router as teacher_router
 from app.routers.test_lesson_router import router as test_router
 from app.routers.user_router import router as user_router
 from app.setting import API_PREFIX
-
-# from redis import asyncio as aioredis
-# from fastapi_cache import FastAPICache
-# from fastapi_cache.backends.redis import RedisBackend
-
+from app.utils.journal_writer import journal_writer
+from app.utils.media import stored_media_response
+from app.utils.query_counter import QueryCounterMiddleware
+from app.utils.save_images import blob_sweeper
 
 app = FastAPI()
-app.mount('/static', StaticFiles(directory='static'), name='static')
 
 app.include_router(user_router, prefix=API_PREFIX, tags=['User'])
 app.include_router(student_router, prefix=API_PREFIX, tags=['Student'])
@@ -39,13 +39,17 @@ app.include_router(subject_router, prefix=API_PREFIX, tags=['Subject'])
 app.include_router(subject_instruction_router, prefix=API_PREFIX, tags=['Subject Instruction'])
 app.include_router(module_router, prefix=API_PREFIX, tags=['Module'])
 app.include_router(lesson_router, prefix=API_PREFIX, tags=['Lesson'])
+app.include_router(schedule_router, prefix=API_PREFIX, tags=['Schedule'])
 app.include_router(lecture_router, prefix=API_PREFIX, tags=['Lecture'])
 app.include_router(test_router, prefix=API_PREFIX, tags=['Test'])
 
 app.include_router(group_chat_router, prefix=API_PREFIX, tags=['GroupChat'])
 app.include_router(subject_chat_router, prefix=API_PREFIX, tags=['SubjectChat'])
 
+app.include_router(metrics_router, prefix=API_PREFIX, tags=['Metrics'])
+
 
+app.add_middleware(QueryCounterMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -61,14 +65,24 @@ async def root():
 
 
 @app.get("/get_image")
-async def get_image(file_path: str):
-    return FileResponse(file_path)
+async def get_image(file_path: str, request: Request):
+    return await stored_media_response(request=request, file_path=file_path)
+
+
+@app.api_route("/static/{file_path:path}", methods=["GET", "HEAD"])
+async def get_static_file(file_path: str, request: Request):
+    return await stored_media_response(request=request, file_path=os.path.join("static", file_path))
+
+
+@app.on_event("startup")
+async def startup_event():
+    blob_sweeper.start()
 
 
-# @app.on_event("startup")
-# async def startup_event():
-#     redis = aioredis.from_url("redis://localhost:6379", encoding="utf8", decode_responses=True)
-#     FastAPICache.init(RedisBackend(redis=redis), prefix="fastapi-cache")
+@app.on_event("shutdown")
+async def shutdown_event():
+    blob_sweeper.stop()
+    await journal_writer.stop()
 
 
 if __name__ == "__main__":
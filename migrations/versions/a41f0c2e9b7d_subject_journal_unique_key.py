@@ -0,0 +1,36 @@
+"""subject journal unique key
+
+Revision ID: a41f0c2e9b7d
+Revises: 70d17df237bb
+Create Date: 2026-10-18 14:05:12.418233
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'a41f0c2e9b7d'
+down_revision = '70d17df237bb'
+branch_labels = None
+depends_on = None
+
+
+def delete_duplicate_rows() -> None:
+    op.get_bind().execute(sa.text(
+        "DELETE FROM subject_journal WHERE id NOT IN ("
+        "SELECT MAX(id) FROM subject_journal GROUP BY subject_id, lesson_id, student_id)"
+    ))
+
+
+def upgrade() -> None:
+    delete_duplicate_rows()
+    with op.batch_alter_table('subject_journal') as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_subject_journal_lesson_student',
+            ['subject_id', 'lesson_id', 'student_id']
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('subject_journal') as batch_op:
+        batch_op.drop_constraint('uq_subject_journal_lesson_student', type_='unique')
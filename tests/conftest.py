@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATABASE_PATH = os.path.join(tempfile.mkdtemp(), "university.db")
+shutil.copyfile(os.path.join(ROOT_DIR, "university.db"), DATABASE_PATH)
+
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_PATH}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ.setdefault("API_PREFIX", "/api/v1")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_HOURS", "1")
+os.environ["AUTH_CACHE_TTL"] = "0"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import update  # noqa: E402
+
+from app.models import User  # noqa: E402
+from app.session import SessionLocal  # noqa: E402
+from app.setting import API_PREFIX  # noqa: E402
+from app.utils.token import create_access_token  # noqa: E402
+from main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    os.chdir(ROOT_DIR)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def api():
+    return API_PREFIX
+
+
+@pytest.fixture(scope="session")
+def login():
+    headers = {}
+
+    def get_headers(username: str):
+        if username not in headers:
+            token, expire_token = create_access_token(data={"sub": username})
+            with SessionLocal() as db:
+                db.execute(
+                    update(User)
+                    .where(User.username == username)
+                    .values(token=token, exp_token=expire_token, is_active=True)
+                )
+                db.commit()
+            headers[username] = {"Authorization": f"Bearer {token}"}
+        return headers[username]
+
+    return get_headers
@@ -0,0 +1,141 @@
+import pytest
+from sqlalchemy import select
+
+from app import models
+from app.session import SessionLocal
+from app.utils.group_cache import group_students_cache
+from app.utils.query_counter import QueryBudgetExceeded, assert_query_budget, query_budget
+from app.utils.student_test import answer_key_cache
+from app.utils.subject_cache import subject_tapes_cache
+
+# get_current_user loads the user with its role relationships on every request, because AUTH_CACHE_TTL is 0 here
+AUTH_QUERIES = 6
+
+TEST_QUESTIONS = [
+    {
+        "questionText": "Single choice", "questionNumber": 1, "questionScore": 10, "questionType": "test",
+        "hided": False,
+        "questionAnswers": [{"answerText": "a", "isCorrect": True}, {"answerText": "b", "isCorrect": False}]
+    },
+    {
+        "questionText": "Multiple choice", "questionNumber": 2, "questionScore": 12, "questionType": "multiple_choice",
+        "hided": False,
+        "questionAnswers": [{"answerText": "a", "isCorrect": True}, {"answerText": "b", "isCorrect": True},
+                            {"answerText": "c", "isCorrect": False}]
+    },
+    {
+        "questionText": "Matching", "questionNumber": 3, "questionScore": 10, "questionType": "matching",
+        "hided": False,
+        "questionAnswers": [{"leftText": "l1", "rightText": "r1"}, {"leftText": "l2", "rightText": "r2"}]
+    }
+]
+
+
+@pytest.fixture(scope="module")
+def student_test_data(client, api, login):
+    with SessionLocal() as db:
+        test_id = db.execute(select(models.TestLesson.id).order_by(models.TestLesson.id)).scalars().first()
+
+    response = client.post(f"{api}/test/create-data/{test_id}", headers=login("moder1"), json=TEST_QUESTIONS)
+    assert response.status_code == 200
+
+    with SessionLocal() as db:
+        questions = db.execute(
+            select(models.TestQuestion.id)
+            .filter(models.TestQuestion.test_lesson_id == test_id)
+            .order_by(models.TestQuestion.id.desc())
+            .limit(len(TEST_QUESTIONS))
+        ).scalars().all()
+        single, multiple, matching = sorted(questions)
+        answers = {
+            question_id: db.execute(
+                select(models.TestAnswer.id)
+                .filter(models.TestAnswer.question_id == question_id)
+                .order_by(models.TestAnswer.id)
+            ).scalars().all()
+            for question_id in (single, multiple)
+        }
+        pairs = db.execute(
+            select(models.TestMatchingLeft.id, models.TestMatchingLeft.right_id)
+            .filter(models.TestMatchingLeft.question_id == matching)
+            .order_by(models.TestMatchingLeft.id)
+        ).all()
+
+    return {
+        "studentId": 1,
+        "testId": test_id,
+        "studentAnswers": [
+            {"questionId": single, "questionType": "test", "answerId": answers[single][0]},
+            {"questionId": multiple, "questionType": "multiple_choice", "answersIds": answers[multiple][:2]},
+            {"questionId": matching, "questionType": "matching", "matching": [
+                {"leftOptionId": left_id, "rightOptionId": right_id} for left_id, right_id in pairs
+            ]}
+        ]
+    }
+
+
+def test_assert_query_budget_fails_when_exceeded(client, api, login):
+    response = client.get(f"{api}/student/get-register/1", headers=login("moder1"))
+
+    assert_query_budget(response, AUTH_QUERIES + 2)
+    with pytest.raises(QueryBudgetExceeded):
+        assert_query_budget(response, AUTH_QUERIES + 1)
+
+
+def test_query_budget_fails_on_repeated_statements():
+    with SessionLocal() as db:
+        with pytest.raises(QueryBudgetExceeded, match="repeated"):
+            with query_budget(max_queries=100):
+                for question_id in range(10):
+                    db.get(models.TestQuestion, question_id)
+
+
+def test_group_chat_history_budget(client, api, login):
+    response = client.get(f"{api}/next-messages/Med-23-1/1000", headers=login("felix"))
+
+    assert response.status_code == 200
+    assert response.json()
+    assert_query_budget(response, AUTH_QUERIES + 7)
+
+
+def test_subject_chat_history_budget(client, api, login):
+    response = client.get(f"{api}/subject_chat/next-messages/1/1000", headers=login("felix"))
+
+    assert response.status_code == 200
+    assert response.json()
+    assert_query_budget(response, AUTH_QUERIES + 6)
+
+
+def test_student_test_grading_budget(client, api, login, student_test_data):
+    answer_key_cache.clear()
+    response = client.post(f"{api}/student-test/create", headers=login("felix"), json=student_test_data)
+
+    assert response.status_code == 200
+    assert_query_budget(response, AUTH_QUERIES + 9)
+
+
+def test_subject_tapes_viewed_lectures_budget(client, api, login):
+    subject_tapes_cache.clear()
+    response = client.get(f"{api}/subject-tapes/1", headers=login("felix"))
+    assert response.status_code == 200
+    assert_query_budget(response, AUTH_QUERIES + 5)
+
+    response = client.get(f"{api}/subject-tapes/1", headers=login("felix"))
+    assert_query_budget(response, AUTH_QUERIES + 1)
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_student_register_budget(client, api, login, stream):
+    response = client.get(f"{api}/student/get-register/1", params={"stream": stream}, headers=login("moder1"))
+
+    assert response.status_code == 200
+    assert_query_budget(response, AUTH_QUERIES + 2)
+
+
+def test_list_members_budget(client, api, login):
+    group_students_cache.clear()
+    response = client.get(f"{api}/list-members", params={"group_id": 1, "subject_id": 1}, headers=login("moder1"))
+
+    assert response.status_code == 200
+    assert len(response.json()["students"]) == 6
+    assert_query_budget(response, AUTH_QUERIES + 3)